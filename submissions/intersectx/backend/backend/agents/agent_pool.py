@@ -0,0 +1,126 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Type
+
+from agno.agent import Agent
+from agno.models.base import Model
+from pydantic import BaseModel
+
+from backend.utils.logger import get_logger
+
+LOG = get_logger("AgentPool")
+
+
+class AgentPool:
+    """
+    Process-wide pool of agno Agents, keyed by model, agent name (which stands for
+    its instructions template), response model and construction options.
+
+    Agents keep per-run state, so one is never shared between concurrent runs: a
+    lease checks out an idle agent (or builds one), sets the per-call instructions
+    and knowledge, and resets and returns it once the run is over.
+
+    Usage:
+        with AgentPool.lease(model, "RevenueAgent", prompt) as agent:
+            response = await agent.arun(prompt)
+    """
+
+    # Idle agents kept per key; extra agents returned beyond this are dropped
+    MAX_IDLE_PER_KEY = 16
+
+    _idle: Dict[tuple, List[Agent]] = {}
+    _stats: Dict[str, int] = {"created": 0, "reused": 0, "dropped": 0}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _key(
+        model: Model,
+        name: str,
+        response_model: Optional[Type[BaseModel]],
+        options: Dict[str, Any],
+    ) -> tuple:
+        # Models are process-wide singletons (see backend.utils.llm), so their
+        # identity is a stable part of the key
+        return (id(model), name, response_model, tuple(sorted(options.items())))
+
+    @classmethod
+    def _checkout(cls, key: tuple) -> Optional[Agent]:
+        with cls._lock:
+            idle = cls._idle.get(key)
+            if idle:
+                cls._stats["reused"] += 1
+                return idle.pop()
+            cls._stats["created"] += 1
+            return None
+
+    @staticmethod
+    def _reset(agent: Agent) -> None:
+        """Drop everything a run left behind, so the next lease starts clean"""
+        agent.instructions = None
+        agent.knowledge = None
+        agent.knowledge_filters = None
+        agent.session_id = None
+        agent.memory = None
+        agent._tool_instructions = None
+        agent.reset_session_state()
+        agent.reset_run_state()
+
+    @classmethod
+    def _checkin(cls, key: tuple, agent: Agent) -> None:
+        cls._reset(agent)
+        with cls._lock:
+            idle = cls._idle.setdefault(key, [])
+            if len(idle) < cls.MAX_IDLE_PER_KEY:
+                idle.append(agent)
+            else:
+                cls._stats["dropped"] += 1
+
+    @classmethod
+    @contextmanager
+    def lease(
+        cls,
+        model: Model,
+        name: str,
+        instructions: Any,
+        response_model: Optional[Type[BaseModel]] = None,
+        knowledge: Any = None,
+        knowledge_filters: Optional[Dict[str, Any]] = None,
+        **options: Any,
+    ) -> Iterator[Agent]:
+        """
+        Lease an agent for a single run.
+
+        Args:
+            model: The (shared) model the agent runs on
+            name: Agent name, one per instructions template
+            instructions: The instructions for this run
+            response_model: Optional response model of the agent
+            knowledge: Optional knowledge base for this run
+            knowledge_filters: Optional knowledge filters for this run
+            **options: Other, hashable, Agent constructor arguments
+        """
+        key = cls._key(model, name, response_model, options)
+        agent = cls._checkout(key)
+        if agent is None:
+            LOG.debug(f"Creating pooled agent {name}")
+            agent = Agent(
+                name=name, model=model, response_model=response_model, **options
+            )
+
+        agent.instructions = instructions
+        agent.knowledge = knowledge
+        agent.knowledge_filters = knowledge_filters
+        try:
+            yield agent
+        finally:
+            cls._checkin(key, agent)
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, int]:
+        """How many agents were created, reused and dropped, and how many are idle"""
+        with cls._lock:
+            return {
+                **cls._stats,
+                "keys": len(cls._idle),
+                "idle": sum(len(agents) for agents in cls._idle.values()),
+            }
@@ -1,25 +1,27 @@
-from typing import Type
+import threading
+from typing import Any, Dict, Optional, Type
 
 from agno.models.azure import AzureOpenAI
-from pydantic import BaseModel
-from agno.agent import Agent
+from pydantic import BaseModel, ValidationError
+
+from backend.agents.agent_pool import AgentPool
+from backend.utils.logger import get_logger
+from backend.utils.output_parsing import parse_locally
+
+LOG = get_logger("LLMOutputParserAgent")
 
 
 class LLMOutputParserAgent:
     """
     Agent that takes a string (LLM output) and a response model class, and uses an LLM to convert the string into a valid instance of the response model.
-    """
 
-    def __init__(self, model: AzureOpenAI):
-        self.model = model
+    Content is parsed locally first and only sent to the LLM when that fails: content
+    that already matches the response model (e.g. from a model asked for structured
+    output), JSON blocks (repaired if needed), then markdown tables and `key: value`
+    lines. How often each path wins is counted per process.
+    """
 
-    def parse(self, content: str | dict, response_model: Type[BaseModel]) -> BaseModel:
-        """
-        Given a string and a response model class, use the LLM to convert the string into the response model structure.
-        """
-        agent = Agent(
-            model=self.model,
-            instructions="""
+    INSTRUCTIONS = """
             You are a strict output parser and a summary generator.
 
             1. Your task is to convert the given content into a valid instance of the specified Pydantic model.
@@ -29,8 +31,96 @@ class LLMOutputParserAgent:
             5. Return only the parsed result as a JSON object, which should be directly convertible into an instance of the Pydantic model.
 
             Do not include any explanations, formatting, or text outside the JSON object.
-            """,
+            """
+
+    PATHS = ("structured", "json", "repaired_json", "markdown", "llm")
+
+    _path_counts: Dict[str, int] = {path: 0 for path in PATHS}
+    _path_lock = threading.Lock()
+
+    def __init__(self, model: AzureOpenAI):
+        self.model = model
+
+    @classmethod
+    def _record(cls, path: str) -> None:
+        with cls._path_lock:
+            cls._path_counts[path] += 1
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, int]:
+        """How many parses each path (local stages or the LLM) has produced"""
+        with cls._path_lock:
+            return dict(cls._path_counts)
+
+    def _parse_locally(
+        self, content: Any, response_model: Type[BaseModel]
+    ) -> Optional[BaseModel]:
+        parsed = self.validate(content, response_model)
+        path = "structured"
+        if parsed is None and isinstance(content, str):
+            parsed, path = parse_locally(content, response_model)
+
+        if parsed is not None:
+            self._record(path)
+            LOG.debug(f"Parsed {response_model.__name__} locally ({path})")
+        return parsed
+
+    def _lease_agent(self, response_model: Type[BaseModel]):
+        return AgentPool.lease(
+            self.model,
+            "OutputParserAgent",
+            instructions=self.INSTRUCTIONS,
             response_model=response_model,
         )
-        response = agent.run(f"Parse this content: {content}")
+
+    @staticmethod
+    def validate(content: Any, response_model: Type[BaseModel]) -> Optional[BaseModel]:
+        """
+        Validate structured content (a model instance, a dict or a JSON string) against
+        the response model without calling the LLM. Returns None if it does not match.
+        """
+        if isinstance(content, response_model):
+            return content
+
+        try:
+            if isinstance(content, BaseModel):
+                return response_model.model_validate(content.model_dump())
+            if isinstance(content, dict):
+                return response_model.model_validate(content)
+            if isinstance(content, (str, bytes)):
+                return response_model.model_validate_json(content)
+        except ValidationError as e:
+            LOG.debug(
+                f"Content does not validate as {response_model.__name__}: "
+                f"{e.error_count()} errors"
+            )
+        return None
+
+    def parse(self, content: str | dict, response_model: Type[BaseModel]) -> BaseModel:
+        """
+        Given a string and a response model class, use the LLM to convert the string into the response model structure.
+        """
+        parsed = self._parse_locally(content, response_model)
+        if parsed is not None:
+            return parsed
+
+        self._record("llm")
+        with self._lease_agent(response_model) as agent:
+            response = agent.run(f"Parse this content: {content}")
+        return response.content
+
+    async def aparse(
+        self, content: str | dict, response_model: Type[BaseModel]
+    ) -> BaseModel:
+        """
+        Async version of parse, which does not block the event loop during the LLM call.
+        """
+        parsed = self._parse_locally(content, response_model)
+        if parsed is not None:
+            return parsed
+
+        LOG.info(f"Falling back to the LLM to parse {response_model.__name__}")
+        self._record("llm")
+        with self._lease_agent(response_model) as agent:
+            response = await agent.arun(f"Parse this content: {content}")
         return response.content
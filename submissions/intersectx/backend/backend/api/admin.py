@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi_utils.cbv import cbv
+
+from backend.agents.agent_pool import AgentPool
+from backend.agents.output_parser import LLMOutputParserAgent
+from backend.database.mongo import MongoClientRegistry
+from backend.dependencies import (
+    get_admin_user,
+    get_cache_service,
+    get_job_queue,
+    get_llm_usage_service,
+)
+from backend.jobs.queue import JobQueue
+from backend.models.base.exceptions import Status
+from backend.models.base.users import User
+from backend.models.response.cache import (
+    CacheInvalidationResponse,
+    CacheStatsResponse,
+)
+from backend.models.response.llm_usage import LLMUsageResponse
+from backend.services.cache import CacheService
+from backend.services.llm_usage import GROUP_FIELDS, LLMUsageService
+from backend.utils.exceptions import ServiceException
+from backend.utils.rate_limit import LLMGovernor
+
+admin_router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@cbv(admin_router)
+class AdminAPI:
+    cache_service: CacheService = Depends(get_cache_service)
+    job_queue: JobQueue = Depends(get_job_queue)
+    llm_usage_service: LLMUsageService = Depends(get_llm_usage_service)
+    user: User = Depends(get_admin_user)
+
+    @admin_router.get("/cache", response_model=CacheStatsResponse)
+    async def get_cache_stats(self) -> CacheStatsResponse:
+        """
+        Get cache hit/miss/set/stale-serve counters, lookup and compute latency
+        histograms and stored sizes per service:method
+        """
+        return CacheStatsResponse(
+            **self.cache_service.get_stats(),
+            mongo_clients=MongoClientRegistry.stats(),
+        )
+
+    @admin_router.get("/parser", response_model=dict[str, int])
+    async def get_parser_stats(self) -> dict[str, int]:
+        """
+        Get how often each output parsing path won: local validation of structured
+        output, JSON blocks, repaired JSON, markdown/key-value mapping, or the LLM
+        """
+        return LLMOutputParserAgent.get_stats()
+
+    @admin_router.get("/agents", response_model=dict[str, int])
+    async def get_agent_pool_stats(self) -> dict[str, int]:
+        """
+        Get how many pooled agents were created, reused and dropped, and how many
+        are idle
+        """
+        return AgentPool.get_stats()
+
+    @admin_router.get("/llm", response_model=dict[str, dict])
+    async def get_llm_governor_stats(self) -> dict[str, dict]:
+        """
+        Get the rate limiter state per LLM provider/deployment: admitted and queued
+        calls, 429s, token estimates against reported usage and remaining quota
+        """
+        return LLMGovernor.get_stats()
+
+    @admin_router.get("/llm/usage", response_model=LLMUsageResponse)
+    async def get_llm_usage(
+        self,
+        hours: int = Query(24, ge=1, description="Report the last `hours` hours"),
+        group_by: List[str] = Query(
+            ["service", "method"],
+            description=f"Fields to group by: {', '.join(GROUP_FIELDS)}",
+        ),
+        limit: int = Query(50, ge=1, le=500, description="Groups to return"),
+    ) -> LLMUsageResponse:
+        """
+        Get LLM calls, prompt/completion/cached tokens, estimated cost and average
+        latency, grouped by provider, model, service, method, section, company or
+        user, costliest first
+        """
+        unknown = [field for field in group_by if field not in GROUP_FIELDS]
+        if unknown:
+            raise ServiceException(
+                Status.INVALID_PARAM,
+                message=f"Cannot group LLM usage by {', '.join(unknown)}",
+                details={"allowed": list(GROUP_FIELDS)},
+            )
+
+        since = datetime.utcnow().replace(
+            minute=0, second=0, microsecond=0
+        ) - timedelta(hours=hours - 1)
+        return await self.llm_usage_service.aget_usage(since, group_by, limit)
+
+    @admin_router.get("/jobs", response_model=dict[str, int])
+    async def get_job_stats(self) -> dict[str, int]:
+        """Get how many research jobs are queued, running, succeeded and failed"""
+        return await self.job_queue.get_stats()
+
+    @admin_router.delete("/cache", response_model=CacheInvalidationResponse)
+    async def invalidate_cache(
+        self,
+        service: Optional[str] = Query(None, description="Service class name"),
+        method: Optional[str] = Query(None, description="Service method name"),
+        company: Optional[str] = Query(None, description="Company name prefix"),
+    ) -> CacheInvalidationResponse:
+        """
+        Invalidate the cache entries matching every given filter. At least one
+        filter is required. Other processes may serve their in-memory copies for up
+        to `memory_ttl_seconds` longer.
+        """
+        if not (service or method or company):
+            raise ServiceException(
+                Status.MISSING_PARAMS,
+                message="Provide at least one of service, method or company",
+            )
+
+        result = await self.cache_service.ainvalidate_matching(
+            service_name=service, method_name=method, company_prefix=company
+        )
+        return CacheInvalidationResponse(**result)
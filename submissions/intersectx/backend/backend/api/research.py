@@ -1,9 +1,21 @@
-from fastapi import APIRouter, Depends, Path
+from fastapi import APIRouter, Depends, Path, Query
 from fastapi_utils.cbv import cbv
 
-from backend.dependencies import get_research_service
+from backend.dependencies import get_job_queue, get_research_service
+from backend.jobs.queue import JobQueue, ResearchJob
+from backend.models.base.exceptions import Status
+from backend.models.requests.research import ResearchJobRequest
 from backend.services.research import ResearchService
-from backend.models.response.research import ResearchResponse
+from backend.models.response.research import (
+    ResearchJobResponse,
+    ResearchJobResultResponse,
+    ResearchJobStatus,
+    ResearchRefreshResponse,
+    ResearchResponse,
+)
+from backend.settings import AppSettings, get_app_settings
+from backend.utils.exceptions import ServiceException
+from backend.utils.streaming import StreamFormat, stream_events
 
 research_router = APIRouter(prefix="/research", tags=["research"])
 
@@ -11,6 +23,52 @@ research_router = APIRouter(prefix="/research", tags=["research"])
 @cbv(research_router)
 class ResearchAPI:
     research_service: ResearchService = Depends(get_research_service)
+    job_queue: JobQueue = Depends(get_job_queue)
+    app_settings: AppSettings = Depends(get_app_settings)
+
+    async def _get_job(self, job_id: str) -> ResearchJob:
+        job = await self.job_queue.get(job_id)
+        if job is None:
+            raise ServiceException(Status.NOT_FOUND, message=f"Job {job_id} not found")
+        return job
+
+    @research_router.post("/jobs", response_model=ResearchJobResponse, status_code=202)
+    async def submit_job(self, request: ResearchJobRequest):
+        """
+        Queue research to run in the background. Submitting the same company and
+        options while such a job is queued or running, or shortly after one
+        succeeded, returns that job instead of queueing another.
+        """
+        job = ResearchJob.from_request(
+            request, self.app_settings.jobs_config.max_attempts
+        )
+        return ResearchJobResponse.model_validate(
+            (await self.job_queue.submit(job)).model_dump()
+        )
+
+    @research_router.get("/jobs/{job_id}", response_model=ResearchJobResponse)
+    async def get_job(self, job_id: str = Path(...)):
+        return ResearchJobResponse.model_validate(
+            (await self._get_job(job_id)).model_dump()
+        )
+
+    @research_router.get(
+        "/jobs/{job_id}/result", response_model=ResearchJobResultResponse
+    )
+    async def get_job_result(self, job_id: str = Path(...)):
+        job = await self._get_job(job_id)
+        if job.status != ResearchJobStatus.SUCCEEDED or job.result is None:
+            raise ServiceException(
+                Status.NOT_PROCESSED,
+                message=f"Job {job_id} has no result yet",
+                details={"status": job.status, "error": job.error},
+            )
+        return ResearchJobResultResponse(
+            job_id=job.job_id,
+            status=job.status,
+            failed_sections=job.failed_sections,
+            result=job.result,
+        )
 
     @research_router.get("/{company_name}", response_model=ResearchResponse)
     async def get_research(self, company_name: str = Path(...)):
@@ -24,3 +82,37 @@ class ResearchAPI:
         return await self.research_service.get_research(
             company_name, use_knowledge_base=False
         )
+
+    @research_router.get("/get-basic-info/{company_name}/stream")
+    async def stream_basic_info(
+        self,
+        company_name: str = Path(...),
+        format: StreamFormat = Query(
+            StreamFormat.SSE, description="Server-sent events or NDJSON"
+        ),
+    ):
+        """
+        Stream the basic research as it completes: each field and section as soon
+        as it is ready, chart URLs as follow-up events, then the full research
+        """
+        return stream_events(
+            self.research_service.stream_research(
+                company_name, use_knowledge_base=False
+            ),
+            format,
+        )
+
+    @research_router.post(
+        "/{company_name}/refresh", response_model=ResearchRefreshResponse
+    )
+    async def refresh_research(
+        self,
+        company_name: str = Path(...),
+        force: bool = Query(False, description="Recompute every field, fresh or not"),
+    ):
+        """
+        Recompute the stale fields of the stored basic research: those older than
+        their section's freshness policy, or computed before the company's
+        documents changed. Fresh fields are returned as stored.
+        """
+        return await self.research_service.refresh_research(company_name, force=force)
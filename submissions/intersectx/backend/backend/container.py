@@ -0,0 +1,127 @@
+from backend.agents.netlify import NetlifyAgent
+from backend.database.mongo import MongoClientRegistry
+from backend.jobs.queue import get_job_queue
+from backend.services.cache import CacheService
+from backend.services.companies import CompaniesService
+from backend.services.customer_sentiment import CustomerSentimentService
+from backend.services.finance import FinanceService
+from backend.services.knowledge import KnowledgeBaseService
+from backend.services.llm_usage import LLMUsageService
+from backend.services.market_analysis import MarketAnalysisService
+from backend.services.news import NewsService
+from backend.services.partnership_network import PartnershipNetworkService
+from backend.services.regulatory_compliance import RegulatoryComplianceService
+from backend.services.research import ResearchService
+from backend.services.risk_analysis import RiskAnalysisService
+from backend.services.search_service import SearchService
+from backend.services.team import TeamService
+from backend.settings import AppSettings
+from backend.utils.llm import aclose_http_client
+from backend.utils.logger import get_logger
+
+LOG = get_logger("ServiceContainer")
+
+
+class ServiceContainer:
+    """
+    Process-scoped services, built once at startup and shared by every request.
+
+    The services keep no per-request state, so one instance of each (with its model
+    clients, vector store and cache connections) serves the whole process. The API
+    creates the container in its lifespan and stores it on `app.state.services`;
+    the dependency providers in `backend.dependencies` hand out its services.
+    """
+
+    def __init__(self, app_settings: AppSettings):
+        self.app_settings = app_settings
+
+        self.cache_service = CacheService(
+            app_settings.db_config, app_settings.cache_config
+        )
+        self.llm_usage_service = LLMUsageService(
+            app_settings.db_config, app_settings.llm_usage_config
+        )
+        self.knowledge_base_service = KnowledgeBaseService(
+            app_settings.db_config, app_settings.vector_store_config
+        )
+        self.netlify_agent = NetlifyAgent(app_settings.netlify_config)
+
+        self.company_service = self._cached(CompaniesService(app_settings.db_config))
+        self.news_service = self._cached(
+            NewsService(
+                app_settings.db_config,
+                app_settings.llm_config,
+                app_settings.sonar_config,
+            )
+        )
+        self.finance_service = self._cached(
+            FinanceService(
+                app_settings.llm_config,
+                app_settings.sonar_config,
+                self.knowledge_base_service,
+                self.netlify_agent,
+            )
+        )
+        self.market_analysis_service = self._cached(
+            MarketAnalysisService(
+                app_settings.llm_config, app_settings.sonar_config, self.netlify_agent
+            )
+        )
+        self.linkedin_team_service = self._cached(
+            TeamService(
+                app_settings.llm_config, app_settings.sonar_config, self.netlify_agent
+            )
+        )
+        self.customer_sentiment_service = self._cached(
+            CustomerSentimentService(
+                app_settings.llm_config, app_settings.sonar_config, self.netlify_agent
+            )
+        )
+        self.partnership_network_service = self._cached(
+            PartnershipNetworkService(self.netlify_agent)
+        )
+        self.regulatory_compliance_service = self._cached(
+            RegulatoryComplianceService(self.netlify_agent)
+        )
+        self.risk_analysis_service = self._cached(
+            RiskAnalysisService(self.netlify_agent)
+        )
+        self.search_service = self._cached(
+            SearchService(
+                app_settings.llm_config,
+                app_settings.sonar_config,
+                self.knowledge_base_service,
+                self.netlify_agent,
+            )
+        )
+        self.research_service = self._cached(
+            ResearchService(
+                finance_service=self.finance_service,
+                linkedin_team_service=self.linkedin_team_service,
+                market_analysis_service=self.market_analysis_service,
+                partnership_network_service=self.partnership_network_service,
+                customer_sentiment_service=self.customer_sentiment_service,
+                regulatory_compliance_service=self.regulatory_compliance_service,
+                risk_analysis_service=self.risk_analysis_service,
+                db_config=app_settings.db_config,
+                llm_config=app_settings.llm_config,
+                knowledge_base_service=self.knowledge_base_service,
+                netlify_agent=self.netlify_agent,
+                research_config=app_settings.research_config,
+            )
+        )
+        self.job_queue = get_job_queue(app_settings.jobs_config, app_settings.db_config)
+        LOG.info("Process-scoped services initialized")
+
+    def _cached(self, service):
+        service.cache_service = self.cache_service
+        return service
+
+    async def aclose(self) -> None:
+        """Store the pending LLM usage and release the connections shared by the services"""
+        try:
+            await self.llm_usage_service.aflush()
+        except Exception as e:
+            LOG.error(f"Failed to store LLM usage on shutdown: {e}")
+        MongoClientRegistry.close_all()
+        await aclose_http_client()
@@ -1,3 +1,5 @@
+import asyncio
+import threading
 from datetime import datetime
 from typing import Optional, TYPE_CHECKING
 
@@ -9,7 +11,12 @@ from backend.utils.time_utils import show_time_taken
 
 if TYPE_CHECKING:
     # Only imported for type checking
-    from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+    from motor.motor_asyncio import (
+        AsyncIOMotorClient,
+        AsyncIOMotorCollection,
+        AsyncIOMotorDatabase,
+    )
+    from pymongo import MongoClient
     from pymongo.collection import Collection
     from pymongo.synchronous.database import Database
 
@@ -27,6 +34,160 @@ class MongoIndexSpec(BaseModel):
     background: Optional[bool] = Field(
         False, description="Whether to build the index in the background."
     )
+    sparse: Optional[bool] = Field(
+        False, description="Whether to leave documents without the fields unindexed."
+    )
+    expire_after_seconds: Optional[int] = Field(
+        None,
+        description="Make this a TTL index: documents are removed this many seconds after the indexed date.",
+    )
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class MongoClientRegistry:
+    """
+    Process-wide registry of pooled Mongo clients keyed by connection URI.
+
+    A single sync (pymongo) client per URI, and a single async (motor) client per
+    URI and event loop, is lazily created and shared by every MongoDBConnector, so
+    connections are pooled instead of re-negotiated on every call. Call
+    `close_all` on shutdown.
+    """
+
+    _sync_clients: dict[str, "MongoClient"] = {}
+    # Motor clients run on the loop they were created for, so each loop gets its own
+    _async_clients: dict[tuple, "AsyncIOMotorClient"] = {}
+    _lock = threading.Lock()
+    _pool_listener = None
+
+    clients_created: int = 0
+    connections_opened: int = 0
+    connections_closed: int = 0
+
+    @classmethod
+    def _get_pool_listener(cls):
+        """Build (once) a pool listener that counts opened/closed connections"""
+        if cls._pool_listener is None:
+            from pymongo.monitoring import ConnectionPoolListener
+
+            registry = cls
+
+            class _ConnectionCounter(ConnectionPoolListener):
+                def pool_created(self, event):
+                    pass
+
+                def pool_ready(self, event):
+                    pass
+
+                def pool_cleared(self, event):
+                    pass
+
+                def pool_closed(self, event):
+                    pass
+
+                def connection_created(self, event):
+                    registry.connections_opened += 1
+
+                def connection_ready(self, event):
+                    pass
+
+                def connection_closed(self, event):
+                    registry.connections_closed += 1
+
+                def connection_check_out_started(self, event):
+                    pass
+
+                def connection_check_out_failed(self, event):
+                    pass
+
+                def connection_checked_out(self, event):
+                    pass
+
+                def connection_checked_in(self, event):
+                    pass
+
+            cls._pool_listener = _ConnectionCounter()
+        return cls._pool_listener
+
+    @classmethod
+    def get_sync_client(cls, uri: str, **client_options) -> "MongoClient":
+        client = cls._sync_clients.get(uri)
+        if client is not None:
+            return client
+
+        with cls._lock:
+            if uri not in cls._sync_clients:
+                from pymongo import MongoClient
+
+                cls._sync_clients[uri] = MongoClient(
+                    uri,
+                    event_listeners=[cls._get_pool_listener()],
+                    **client_options,
+                )
+                cls.clients_created += 1
+                LOG.info(f"Created pooled sync Mongo client with {client_options}")
+            return cls._sync_clients[uri]
+
+    @classmethod
+    def get_async_client(cls, uri: str, **client_options) -> "AsyncIOMotorClient":
+        loop = _running_loop()
+        client = cls._async_clients.get((uri, loop))
+        if client is not None:
+            return client
+
+        with cls._lock:
+            if (uri, loop) not in cls._async_clients:
+                from motor.motor_asyncio import AsyncIOMotorClient
+
+                cls._close_clients_of_closed_loops()
+                cls._async_clients[(uri, loop)] = AsyncIOMotorClient(
+                    uri,
+                    event_listeners=[cls._get_pool_listener()],
+                    **({"io_loop": loop} if loop is not None else {}),
+                    **client_options,
+                )
+                cls.clients_created += 1
+                LOG.info(f"Created pooled async Mongo client with {client_options}")
+            return cls._async_clients[(uri, loop)]
+
+    @classmethod
+    def _close_clients_of_closed_loops(cls):
+        for key, client in list(cls._async_clients.items()):
+            loop = key[1]
+            if loop is not None and loop.is_closed():
+                client.close()
+                del cls._async_clients[key]
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {
+            "sync_clients": len(cls._sync_clients),
+            "async_clients": len(cls._async_clients),
+            "clients_created": cls.clients_created,
+            "connections_opened": cls.connections_opened,
+            "connections_closed": cls.connections_closed,
+        }
+
+    @classmethod
+    def close_all(cls):
+        """Close every pooled client. Safe to call more than once."""
+        with cls._lock:
+            for client in list(cls._sync_clients.values()) + list(
+                cls._async_clients.values()
+            ):
+                try:
+                    client.close()
+                except Exception as e:
+                    LOG.info(f"Failed to close Mongo client due to {e}")
+            cls._sync_clients.clear()
+            cls._async_clients.clear()
+        LOG.info(f"Closed pooled Mongo clients: {cls.stats()}")
 
 
 class MongoDBConnector:
@@ -39,23 +200,20 @@ class MongoDBConnector:
         self._connection_details = connection_details
         self._uri = str(self._connection_details)
         self._db_name = self._connection_details.dbname
+        self._client_options = self._connection_details.get_client_options()
 
         self.log_time_taken = log_time_taken
         self.log_query = log_query
 
     # sync implementations
-    def get_collection(self, collection_name: str) -> "Collection":
-        from pymongo import MongoClient
+    def get_client(self) -> "MongoClient":
+        return MongoClientRegistry.get_sync_client(self._uri, **self._client_options)
 
-        client = MongoClient(self._uri)
-        db = client[self._db_name]
-        return db[collection_name]
+    def get_collection(self, collection_name: str) -> "Collection":
+        return self.get_database()[collection_name]
 
     def get_database(self) -> "Database":
-        from pymongo import MongoClient
-
-        client = MongoClient(self._uri)
-        return client[self._db_name]
+        return self.get_client()[self._db_name]
 
     def query(self, collection_name: str, query: dict) -> list:
         s = datetime.now()
@@ -124,11 +282,16 @@ class MongoDBConnector:
                 )
             else:
                 # Create the index if it doesn't exist
+                options = {}
+                if index_spec.expire_after_seconds is not None:
+                    options["expireAfterSeconds"] = index_spec.expire_after_seconds
                 index_name = collection_obj.create_index(
                     index_spec.keys,
                     name=index_spec.name,
                     unique=index_spec.unique,
+                    sparse=index_spec.sparse,
                     background=index_spec.background,
+                    **options,
                 )
                 created_indices.append(index_name)
                 LOG.info(f"Created index: {index_name}")
@@ -136,18 +299,15 @@ class MongoDBConnector:
         return created_indices
 
     # async implementations
-    async def aget_collection(self, collection_name: str) -> "AsyncIOMotorCollection":
-        from motor.motor_asyncio import AsyncIOMotorClient
+    def aget_client(self) -> "AsyncIOMotorClient":
+        return MongoClientRegistry.get_async_client(self._uri, **self._client_options)
 
-        client = AsyncIOMotorClient(self._uri)
-        db = client[self._db_name]
+    async def aget_collection(self, collection_name: str) -> "AsyncIOMotorCollection":
+        db = await self.aget_database()
         return db[collection_name]
 
     async def aget_database(self) -> "AsyncIOMotorDatabase":
-        from motor.motor_asyncio import AsyncIOMotorClient
-
-        client = AsyncIOMotorClient(self._uri)
-        return client[self._db_name]
+        return self.aget_client()[self._db_name]
 
     def insert_records(self, collection_name: str, records: list[dict]):
         collection_obj = self.get_collection(collection_name)
@@ -179,6 +339,24 @@ class MongoDBConnector:
 
         return result
 
+    async def afind_one(
+        self, collection_name: str, query: dict, sort: Optional[list] = None
+    ) -> Optional[dict]:
+        collection_obj = await self.aget_collection(collection_name)
+        return await collection_obj.find_one(query, sort=sort)
+
+    async def aupdate_one(
+        self,
+        collection_name: str,
+        query_filter: dict,
+        update_operation: dict,
+        upsert: bool = False,
+    ):
+        collection_obj = await self.aget_collection(collection_name)
+        return await collection_obj.update_one(
+            query_filter, update_operation, upsert=upsert
+        )
+
     async def aaggregate(self, collection_name: str, pipeline: list) -> list[dict]:
         s = datetime.now()
         collection_obj = await self.aget_collection(collection_name)
@@ -1,59 +1,62 @@
 from backend.agents.document_processing import DocumentProcessingEngine
 from backend.agents.vector_store import VectorStore
+from backend.container import ServiceContainer
+from backend.models.base.exceptions import Status
 from backend.models.base.users import User
 from backend.services.auth import AuthService
-from backend.services.cache import CacheService
-from backend.services.companies import CompaniesService
-from backend.services.news import NewsService
 from backend.services.chat import ChatService
 from backend.services.files import FilesService
 from backend.settings import get_app_settings, AppSettings
 from fastapi import Request, Depends
-from backend.services.finance import FinanceService
-from backend.services.market_analysis import MarketAnalysisService
-from backend.services.team import TeamService
-from backend.services.customer_sentiment import CustomerSentimentService
 from backend.utils.llm import get_model
-from backend.services.knowledge import KnowledgeBaseService
-from backend.services.partnership_network import PartnershipNetworkService
-from backend.services.regulatory_compliance import RegulatoryComplianceService
-from backend.services.risk_analysis import RiskAnalysisService
-from backend.services.research import ResearchService
-from backend.agents.netlify import NetlifyAgent
-from backend.services.search_service import SearchService
+from backend.utils.exceptions import ServiceException
+from backend.utils.llm_usage import tag_llm_usage_scope
 
 
 async def get_user(request: Request):
     if "user" in request.scope:
-        return request.scope["user"]
+        user = request.scope["user"]
+        tag_llm_usage_scope(user=getattr(user, "user_id", None))
+        return user
 
     return None
 
 
-def get_cache_service(app_settings: AppSettings = Depends(get_app_settings)):
-    return CacheService(app_settings.db_config)
+def get_admin_user(
+    user=Depends(get_user), app_settings: AppSettings = Depends(get_app_settings)
+):
+    if app_settings.local:
+        return user
 
+    user_id = getattr(user, "user_id", None)
+    if user_id is None or user_id not in app_settings.admin_users:
+        raise ServiceException(Status.UNAUTHORIZED, message="Admin access required")
+    return user
 
-def get_knowledge_base_service(
-    app_settings: AppSettings = Depends(get_app_settings),
-    cache_service: CacheService = Depends(get_cache_service),
-):
-    service = KnowledgeBaseService(
-        app_settings.db_config,
-        app_settings.vector_store_config,
-    )
-    return service
 
+def get_services(request: Request) -> ServiceContainer:
+    """The process-scoped services created by the app's lifespan"""
+    return request.app.state.services
 
-def get_news_service(
-    app_settings: AppSettings = Depends(get_app_settings),
-    cache_service: CacheService = Depends(get_cache_service),
-):
-    service = NewsService(
-        app_settings.db_config, app_settings.llm_config, app_settings.sonar_config
-    )
-    service.cache_service = cache_service
-    return service
+
+def get_cache_service(services: ServiceContainer = Depends(get_services)):
+    return services.cache_service
+
+
+def get_knowledge_base_service(services: ServiceContainer = Depends(get_services)):
+    return services.knowledge_base_service
+
+
+def get_llm_usage_service(services: ServiceContainer = Depends(get_services)):
+    return services.llm_usage_service
+
+
+def get_job_queue(services: ServiceContainer = Depends(get_services)):
+    return services.job_queue
+
+
+def get_news_service(services: ServiceContainer = Depends(get_services)):
+    return services.news_service
 
 
 def get_auth_service_settings(
@@ -63,16 +66,12 @@ def get_auth_service_settings(
     return service
 
 
-def get_company_service(
-    app_settings: AppSettings = Depends(get_app_settings),
-    cache_service: CacheService = Depends(get_cache_service),
-):
-    service = CompaniesService(app_settings.db_config)
-    service.cache_service = cache_service
-    return service
+def get_company_service(services: ServiceContainer = Depends(get_services)):
+    return services.company_service
 
 
 def get_chat_service(app_settings: AppSettings = Depends(get_app_settings)):
+    # Chat agents keep per-instance session memory, so this one stays per request
     return ChatService(
         app_settings.llm_config, app_settings.db_config, app_settings.mcp_url
     )
@@ -102,135 +101,50 @@ def get_files_service(
     )
 
 
-def get_netlify_agent(app_settings: AppSettings = Depends(get_app_settings)):
-    return NetlifyAgent(app_settings.netlify_config)
+def get_netlify_agent(services: ServiceContainer = Depends(get_services)):
+    return services.netlify_agent
 
 
-def get_finance_service(
-    app_settings: AppSettings = Depends(get_app_settings),
-    knowledge_base_service=Depends(get_knowledge_base_service),
-    netlify_agent=Depends(get_netlify_agent),
-    cache_service: CacheService = Depends(get_cache_service),
-):
-    service = FinanceService(
-        app_settings.llm_config,
-        app_settings.sonar_config,
-        knowledge_base_service,
-        netlify_agent,
-    )
-    service.cache_service = cache_service
-    return service
+def get_finance_service(services: ServiceContainer = Depends(get_services)):
+    return services.finance_service
 
 
-def get_market_analysis_service(
-    app_settings: AppSettings = Depends(get_app_settings),
-    netlify_agent=Depends(get_netlify_agent),
-    cache_service: CacheService = Depends(get_cache_service),
-):
-    service = MarketAnalysisService(
-        app_settings.llm_config, app_settings.sonar_config, netlify_agent
-    )
-    service.cache_service = cache_service
-    return service
+def get_market_analysis_service(services: ServiceContainer = Depends(get_services)):
+    return services.market_analysis_service
 
 
-def get_linkedin_team_service(
-    app_settings: AppSettings = Depends(get_app_settings),
-    netlify_agent=Depends(get_netlify_agent),
-    cache_service: CacheService = Depends(get_cache_service),
-):
-    service = TeamService(
-        app_settings.llm_config,
-        app_settings.sonar_config,
-        netlify_agent,
-    )
-    service.cache_service = cache_service
-    return service
+def get_linkedin_team_service(services: ServiceContainer = Depends(get_services)):
+    return services.linkedin_team_service
 
 
 def get_customer_sentiment_service(
-    app_settings: AppSettings = Depends(get_app_settings),
-    netlify_agent=Depends(get_netlify_agent),
-    cache_service: CacheService = Depends(get_cache_service),
+    services: ServiceContainer = Depends(get_services),
 ):
-    service = CustomerSentimentService(
-        app_settings.llm_config, app_settings.sonar_config, netlify_agent
-    )
-    service.cache_service = cache_service
-    return service
+    return services.customer_sentiment_service
 
 
 def get_partnership_network_service(
-    netlify_agent=Depends(get_netlify_agent),
-    cache_service: CacheService = Depends(get_cache_service),
+    services: ServiceContainer = Depends(get_services),
 ):
-    service = PartnershipNetworkService(netlify_agent)
-    service.cache_service = cache_service
-    return service
+    return services.partnership_network_service
 
 
-def get_search_service(
-    app_settings: AppSettings = Depends(get_app_settings),
-    netlify_agent=Depends(get_netlify_agent),
-    knowledge_base_service=Depends(get_knowledge_base_service),
-    cache_service: CacheService = Depends(get_cache_service),
-):
-    service = SearchService(
-        app_settings.llm_config,
-        app_settings.sonar_config,
-        knowledge_base_service,
-        netlify_agent,
-    )
-    service.cache_service = cache_service
-    return service
+def get_search_service(services: ServiceContainer = Depends(get_services)):
+    return services.search_service
 
 
 def get_regulatory_compliance_service(
-    netlify_agent=Depends(get_netlify_agent),
-    cache_service: CacheService = Depends(get_cache_service),
+    services: ServiceContainer = Depends(get_services),
 ):
-    service = RegulatoryComplianceService(netlify_agent)
-    service.cache_service = cache_service
-    return service
+    return services.regulatory_compliance_service
 
 
-def get_risk_analysis_service(
-    netlify_agent=Depends(get_netlify_agent),
-    cache_service: CacheService = Depends(get_cache_service),
-):
-    service = RiskAnalysisService(netlify_agent)
-    service.cache_service = cache_service
-    return service
+def get_risk_analysis_service(services: ServiceContainer = Depends(get_services)):
+    return services.risk_analysis_service
 
 
-def get_research_service(
-    finance_service=Depends(get_finance_service),
-    linkedin_team_service=Depends(get_linkedin_team_service),
-    market_analysis_service=Depends(get_market_analysis_service),
-    partnership_network_service=Depends(get_partnership_network_service),
-    customer_sentiment_service=Depends(get_customer_sentiment_service),
-    regulatory_compliance_service=Depends(get_regulatory_compliance_service),
-    risk_analysis_service=Depends(get_risk_analysis_service),
-    cache_service: CacheService = Depends(get_cache_service),
-    app_settings: AppSettings = Depends(get_app_settings),
-    knowledge_base_service=Depends(get_knowledge_base_service),
-    netlify_agent=Depends(get_netlify_agent),
-):
-    service = ResearchService(
-        finance_service=finance_service,
-        linkedin_team_service=linkedin_team_service,
-        market_analysis_service=market_analysis_service,
-        partnership_network_service=partnership_network_service,
-        customer_sentiment_service=customer_sentiment_service,
-        regulatory_compliance_service=regulatory_compliance_service,
-        risk_analysis_service=risk_analysis_service,
-        db_config=app_settings.db_config,
-        llm_config=app_settings.llm_config,
-        knowledge_base_service=knowledge_base_service,
-        netlify_agent=netlify_agent,
-    )
-    service.cache_service = cache_service
-    return service
+def get_research_service(services: ServiceContainer = Depends(get_services)):
+    return services.research_service
 
 
 class CommonDeps:
@@ -0,0 +1,259 @@
+import argparse
+import asyncio
+import hashlib
+from contextlib import suppress
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from backend.container import ServiceContainer
+from backend.database.mongo import MongoDBConnector, MongoIndexSpec
+from backend.services.research import ResearchService
+from backend.settings import MongoConnectionDetails, PrecomputeConfig, get_app_settings
+from backend.utils.logger import get_logger
+from backend.utils.rate_limit import LLMGovernor
+
+LOG = get_logger("ResearchPrecompute")
+
+
+def _llm_tokens_used() -> int:
+    """LLM tokens reported by every provider since the process started"""
+    return sum(
+        int(stats.get("actual_tokens", 0)) for stats in LLMGovernor.get_stats().values()
+    )
+
+
+def _failure_key(company_name: str) -> str:
+    """The checkpoint field of a company's failure; names may hold '.' or '$'"""
+    return hashlib.sha256(company_name.encode("utf-8")).hexdigest()[:16]
+
+
+class ResearchPrecompute:
+    """
+    Precomputes the basic research of every company in `company_info`, so the
+    companies users browse are warm in the cache and their research documents are
+    up to date. Each company runs `ResearchService.get_research`: cached sections
+    cost nothing, the rest are computed in the batch LLM lane and written to the
+    cache and the research document. Sections served stale are refreshed in the
+    background, and the run waits for those refreshes before it finishes.
+
+    A run is checkpointed in `precompute_runs` after every company and stops once
+    it has used `PRECOMPUTE__TOKEN_BUDGET` LLM tokens. Running it again with the
+    same run id (by default, the date) resumes with the companies it has not done.
+    The checkpoint's `failed` holds the last error of each company that failed and
+    has not been precomputed since.
+    """
+
+    COLLECTION_NAME = "precompute_runs"
+
+    _indexes_ready: bool = False
+
+    def __init__(
+        self,
+        research_service: ResearchService,
+        mongo_config: MongoConnectionDetails,
+        config: PrecomputeConfig,
+    ):
+        self.research_service = research_service
+        self.mongo_connector = MongoDBConnector(mongo_config)
+        self.config = config
+        self._setup_indexes()
+
+    def _setup_indexes(self):
+        if ResearchPrecompute._indexes_ready:
+            return
+        try:
+            self.mongo_connector.create_indexes(
+                self.COLLECTION_NAME,
+                [
+                    MongoIndexSpec(
+                        keys=[("run_id", 1)], name="run_id_index", unique=True
+                    )
+                ],
+            )
+            ResearchPrecompute._indexes_ready = True
+        except Exception as e:
+            LOG.error(f"Failed to create precompute indexes: {e}")
+
+    async def _companies(self) -> List[str]:
+        rows = await self.mongo_connector.aaggregate(
+            "company_info",
+            [
+                {"$match": {"company_name": {"$type": "string"}}},
+                {"$group": {"_id": "$company_name"}},
+                {"$sort": {"_id": 1}},
+            ],
+        )
+        return [row["_id"] for row in rows]
+
+    async def _checkpoint(self, run_id: str, update: Dict[str, Any]) -> None:
+        await self.mongo_connector.aupdate_one(
+            self.COLLECTION_NAME,
+            {"run_id": run_id},
+            {**update, "$currentDate": {"updated_at": True}},
+            upsert=True,
+        )
+
+    async def run(self, run_id: Optional[str] = None) -> dict:
+        """Run (or resume) a precompute; returns its checkpoint"""
+        run_id = run_id or datetime.utcnow().strftime("%Y-%m-%d")
+        checkpoint = (
+            await self.mongo_connector.afind_one(
+                self.COLLECTION_NAME, {"run_id": run_id}
+            )
+            or {}
+        )
+        if checkpoint.get("status") == "completed":
+            LOG.info(f"Precompute run {run_id} already completed")
+            return checkpoint
+
+        completed = set(checkpoint.get("completed") or [])
+        companies = [c for c in await self._companies() if c not in completed]
+        tokens_before = int(checkpoint.get("tokens_used", 0))
+        tokens_at_start = _llm_tokens_used()
+        budget = self.config.token_budget
+        LOG.info(
+            f"Precompute run {run_id}: {len(companies)} companies to go, "
+            f"{len(completed)} already done"
+        )
+        start_update: Dict[str, Any] = {
+            "$set": {"status": "running"},
+            "$setOnInsert": {"started_at": datetime.utcnow(), "tokens_used": 0},
+        }
+        if isinstance(checkpoint.get("failed"), list):
+            # Failures used to be a list of every attempt; they are keyed by company now
+            start_update["$unset"] = {"failed": ""}
+        await self._checkpoint(run_id, start_update)
+
+        def tokens_used() -> int:
+            return tokens_before + _llm_tokens_used() - tokens_at_start
+
+        semaphore = asyncio.Semaphore(self.config.concurrent_companies)
+        out_of_budget = asyncio.Event()
+        failures = 0
+
+        async def precompute(company_name: str) -> None:
+            nonlocal failures
+            async with semaphore:
+                if budget and tokens_used() >= budget:
+                    out_of_budget.set()
+                if out_of_budget.is_set():
+                    return
+                try:
+                    await self.research_service.get_research(company_name)
+                except Exception as e:
+                    # Left out of `completed`, so a resumed run tries it again
+                    LOG.error(f"Precompute failed for {company_name}: {e}")
+                    failures += 1
+                    await self._checkpoint(
+                        run_id,
+                        {
+                            "$set": {
+                                f"failed.{_failure_key(company_name)}": {
+                                    "company_name": company_name,
+                                    "error": str(e),
+                                    "failed_at": datetime.utcnow(),
+                                },
+                                "tokens_used": tokens_used(),
+                            },
+                        },
+                    )
+                    return
+                completed.add(company_name)
+                await self._checkpoint(
+                    run_id,
+                    {
+                        "$addToSet": {"completed": company_name},
+                        "$set": {"tokens_used": tokens_used()},
+                        "$unset": {f"failed.{_failure_key(company_name)}": ""},
+                    },
+                )
+                LOG.info(
+                    f"Precomputed research for {company_name} "
+                    f"({tokens_used()} tokens used so far)"
+                )
+
+        await asyncio.gather(*(precompute(company) for company in companies))
+        await self.research_service.cache_service.adrain_refreshes()
+
+        # Only a completed run is skipped when started again with the same run id
+        if out_of_budget.is_set():
+            status = "budget_exhausted"
+        elif failures:
+            status = "partial"
+        else:
+            status = "completed"
+        await self._checkpoint(
+            run_id,
+            {
+                "$set": {
+                    "status": status,
+                    "finished_at": datetime.utcnow(),
+                    "tokens_used": tokens_used(),
+                }
+            },
+        )
+        LOG.info(
+            f"Precompute run {run_id} {status}: {len(completed)} companies done, "
+            f"{tokens_used()} tokens used"
+        )
+        return await self.mongo_connector.afind_one(
+            self.COLLECTION_NAME, {"run_id": run_id}
+        )
+
+    async def run_nightly(self) -> None:
+        """Run the precompute every day at `PRECOMPUTE__RUN_AT_HOUR` (UTC), until cancelled"""
+        while True:
+            now = datetime.utcnow()
+            next_run = now.replace(
+                hour=self.config.run_at_hour, minute=0, second=0, microsecond=0
+            )
+            if next_run <= now:
+                next_run += timedelta(days=1)
+            LOG.info(f"Next research precompute at {next_run.isoformat()}")
+            await asyncio.sleep((next_run - now).total_seconds())
+            try:
+                await self.run()
+            except Exception as e:
+                LOG.error(f"Precompute run failed: {e}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Precompute the basic research of every company"
+    )
+    parser.add_argument(
+        "--run-id", help="Run to start or resume (defaults to today's date)"
+    )
+    parser.add_argument(
+        "--schedule",
+        action="store_true",
+        help="Keep running, starting a precompute every night",
+    )
+    args = parser.parse_args()
+
+    load_dotenv()
+    app_settings = get_app_settings()
+    services = ServiceContainer(app_settings)
+    precompute = ResearchPrecompute(
+        services.research_service,
+        app_settings.db_config,
+        app_settings.precompute_config,
+    )
+    usage_flusher = asyncio.create_task(services.llm_usage_service.arun_flusher())
+    try:
+        if args.schedule:
+            await precompute.run_nightly()
+        else:
+            await precompute.run(args.run_id)
+    finally:
+        usage_flusher.cancel()
+        with suppress(asyncio.CancelledError):
+            await usage_flusher
+        # Stores the usage counted since the last flush
+        await services.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
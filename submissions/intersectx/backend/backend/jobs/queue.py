@@ -0,0 +1,455 @@
+import asyncio
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from backend.database.mongo import MongoDBConnector, MongoIndexSpec
+from backend.models.requests.research import ResearchJobKind, ResearchJobRequest
+from backend.models.response.research import ResearchJobStatus
+from backend.settings import JobsConfig, MongoConnectionDetails
+from backend.utils.cache_keys import hash_args, normalize_company_name
+from backend.utils.logger import get_logger
+
+LOG = get_logger("JobQueue")
+
+ACTIVE_STATUSES = [ResearchJobStatus.QUEUED, ResearchJobStatus.RUNNING]
+
+
+class ResearchJob(BaseModel):
+    job_id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    kind: ResearchJobKind
+    company_name: str
+    options: Dict[str, Any] = Field(default_factory=dict)
+    idempotency_key: str
+    status: ResearchJobStatus = ResearchJobStatus.QUEUED
+    attempts: int = 0
+    max_attempts: int
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    available_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    worker_id: Optional[str] = None
+    lease_until: Optional[datetime] = None
+    failed_sections: List[str] = Field(default_factory=list)
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_request(
+        cls, request: ResearchJobRequest, max_attempts: int
+    ) -> "ResearchJob":
+        options = {
+            "use_knowledge_base": request.use_knowledge_base,
+            "force": request.force,
+        }
+        # Equivalent submissions (company names compared like cache keys) share a key
+        idempotency_key = hash_args(
+            {
+                "kind": request.kind.value,
+                "company_name": normalize_company_name(request.company_name),
+                **options,
+            }
+        )
+        return cls(
+            kind=request.kind,
+            company_name=request.company_name,
+            options=options,
+            idempotency_key=idempotency_key,
+            max_attempts=max_attempts,
+        )
+
+
+class JobQueue(ABC):
+    """
+    A queue of research jobs. Submissions are idempotent: while a job for the same
+    company and options is queued or running, or finished successfully within the
+    idempotency window, submitting again returns that job.
+
+    Workers `claim` a job, which holds it for `lease` (renewed with `heartbeat`);
+    a running job whose lease ran out (its worker died) can be claimed again,
+    until it has used up its attempts. Such a job (e.g. one that keeps getting its
+    worker killed) is marked failed instead, by the sweep each claim starts with.
+    """
+
+    def __init__(self, config: JobsConfig):
+        self.config = config
+        self.idempotency_window = timedelta(seconds=config.idempotency_window_seconds)
+
+    @abstractmethod
+    async def submit(self, job: ResearchJob) -> ResearchJob: ...
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[ResearchJob]: ...
+
+    @abstractmethod
+    async def claim(self, worker_id: str, lease: timedelta) -> Optional[ResearchJob]:
+        """Take the next job that is due, if any"""
+
+    @abstractmethod
+    async def heartbeat(self, job_id: str, worker_id: str, lease: timedelta) -> None:
+        """Extend the lease of a running job"""
+
+    @abstractmethod
+    async def finish(
+        self,
+        job_id: str,
+        worker_id: str,
+        status: ResearchJobStatus,
+        result: Optional[Dict[str, Any]] = None,
+        failed_sections: Optional[List[str]] = None,
+        error: Optional[str] = None,
+        retry_after: Optional[timedelta] = None,
+    ) -> None:
+        """
+        Record the outcome of an attempt. A QUEUED status puts the job back on the
+        queue to be retried after `retry_after`.
+        """
+
+    @abstractmethod
+    async def get_stats(self) -> Dict[str, int]:
+        """Jobs per status"""
+
+    def _finish_update(
+        self,
+        status: ResearchJobStatus,
+        result: Optional[Dict[str, Any]],
+        failed_sections: Optional[List[str]],
+        error: Optional[str],
+        retry_after: Optional[timedelta],
+    ) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        update: Dict[str, Any] = {
+            "status": status,
+            "updated_at": now,
+            "failed_sections": failed_sections or [],
+            "error": error,
+            "worker_id": None,
+            "lease_until": None,
+        }
+        if result is not None:
+            update["result"] = result
+        if status == ResearchJobStatus.QUEUED:
+            update["available_at"] = now + (retry_after or timedelta())
+        else:
+            update["finished_at"] = now
+        return update
+
+    @staticmethod
+    def _abandoned_update(job: ResearchJob, now: datetime) -> Dict[str, Any]:
+        return {
+            "status": ResearchJobStatus.FAILED,
+            "error": (
+                f"Abandoned after {job.attempts} attempts: the worker stopped "
+                f"renewing its lease"
+            ),
+            "updated_at": now,
+            "finished_at": now,
+            "worker_id": None,
+            "lease_until": None,
+        }
+
+    def _reusable(self, job: ResearchJob, now: datetime) -> bool:
+        """Whether an existing job answers a new submission with its key"""
+        if job.status in ACTIVE_STATUSES:
+            return True
+        return (
+            job.status == ResearchJobStatus.SUCCEEDED
+            and job.finished_at is not None
+            and now - job.finished_at <= self.idempotency_window
+        )
+
+
+class InMemoryJobQueue(JobQueue):
+    """A job queue in process memory, for tests and single-process runs"""
+
+    def __init__(self, config: JobsConfig):
+        super().__init__(config)
+        self._jobs: Dict[str, ResearchJob] = {}
+        self._lock = asyncio.Lock()
+
+    async def submit(self, job: ResearchJob) -> ResearchJob:
+        async with self._lock:
+            now = datetime.utcnow()
+            for existing in self._jobs.values():
+                if existing.idempotency_key == job.idempotency_key and self._reusable(
+                    existing, now
+                ):
+                    return existing.model_copy()
+            self._jobs[job.job_id] = job
+            LOG.info(f"Queued {job.kind} job {job.job_id} for {job.company_name}")
+            return job.model_copy()
+
+    async def get(self, job_id: str) -> Optional[ResearchJob]:
+        job = self._jobs.get(job_id)
+        return job.model_copy() if job else None
+
+    async def claim(self, worker_id: str, lease: timedelta) -> Optional[ResearchJob]:
+        async with self._lock:
+            now = datetime.utcnow()
+            expired = [
+                job
+                for job in self._jobs.values()
+                if job.status == ResearchJobStatus.RUNNING
+                and job.lease_until is not None
+                and job.lease_until < now
+            ]
+            for job in expired:
+                if job.attempts >= job.max_attempts:
+                    LOG.error(
+                        f"Job {job.job_id} abandoned after {job.attempts} attempts"
+                    )
+                    self._jobs[job.job_id] = job.model_copy(
+                        update=self._abandoned_update(job, now)
+                    )
+            due = [
+                job
+                for job in self._jobs.values()
+                if (job.status == ResearchJobStatus.QUEUED and job.available_at <= now)
+                or (
+                    job.status == ResearchJobStatus.RUNNING
+                    and job.lease_until is not None
+                    and job.lease_until < now
+                    and job.attempts < job.max_attempts
+                )
+            ]
+            if not due:
+                return None
+            job = min(due, key=lambda j: j.available_at)
+            job.status = ResearchJobStatus.RUNNING
+            job.worker_id = worker_id
+            job.lease_until = now + lease
+            job.started_at = job.updated_at = now
+            job.attempts += 1
+            return job.model_copy()
+
+    async def heartbeat(self, job_id: str, worker_id: str, lease: timedelta) -> None:
+        job = self._jobs.get(job_id)
+        if job is not None and job.worker_id == worker_id:
+            job.lease_until = datetime.utcnow() + lease
+
+    async def finish(
+        self,
+        job_id: str,
+        worker_id: str,
+        status: ResearchJobStatus,
+        result: Optional[Dict[str, Any]] = None,
+        failed_sections: Optional[List[str]] = None,
+        error: Optional[str] = None,
+        retry_after: Optional[timedelta] = None,
+    ) -> None:
+        async with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.worker_id != worker_id:
+                return
+            update = self._finish_update(
+                status, result, failed_sections, error, retry_after
+            )
+            self._jobs[job_id] = job.model_copy(update=update)
+
+    async def get_stats(self) -> Dict[str, int]:
+        stats = {status.value: 0 for status in ResearchJobStatus}
+        for job in self._jobs.values():
+            stats[job.status.value] += 1
+        return stats
+
+
+class MongoJobQueue(JobQueue):
+    """
+    A job queue in MongoDB, shared by the API and the worker processes. Finished
+    jobs are removed by a TTL index after `JOBS__RETENTION_SECONDS`.
+
+    Queued and running jobs carry their idempotency key in `active_key` too, under
+    a unique sparse index, so concurrent submissions can't both queue a job.
+    """
+
+    COLLECTION_NAME = "research_jobs"
+
+    _indexes_ready: bool = False
+
+    def __init__(self, config: JobsConfig, mongo_config: MongoConnectionDetails):
+        super().__init__(config)
+        self.mongo_connector = MongoDBConnector(mongo_config, log_time_taken=False)
+        self._setup_indexes()
+
+    def _setup_indexes(self):
+        """Setup the job collection's indexes, once per process"""
+        if MongoJobQueue._indexes_ready:
+            return
+        try:
+            self.mongo_connector.create_indexes(
+                self.COLLECTION_NAME,
+                [
+                    MongoIndexSpec(
+                        keys=[("job_id", 1)], name="job_id_index", unique=True
+                    ),
+                    MongoIndexSpec(
+                        keys=[("active_key", 1)],
+                        name="active_key_index",
+                        unique=True,
+                        sparse=True,
+                    ),
+                    MongoIndexSpec(
+                        keys=[("idempotency_key", 1), ("finished_at", -1)],
+                        name="idempotency_key_index",
+                    ),
+                    MongoIndexSpec(
+                        keys=[("status", 1), ("available_at", 1)],
+                        name="status_available_at_index",
+                    ),
+                    MongoIndexSpec(
+                        keys=[("finished_at", 1)],
+                        name="retention_index",
+                        expire_after_seconds=self.config.retention_seconds,
+                    ),
+                ],
+            )
+            MongoJobQueue._indexes_ready = True
+        except Exception as e:
+            LOG.error(f"Failed to create job indexes: {e}")
+
+    @staticmethod
+    def _to_job(document: Optional[dict]) -> Optional[ResearchJob]:
+        return ResearchJob.model_validate(document) if document else None
+
+    async def submit(self, job: ResearchJob) -> ResearchJob:
+        from pymongo.errors import DuplicateKeyError
+
+        collection = await self.mongo_connector.aget_collection(self.COLLECTION_NAME)
+        now = datetime.utcnow()
+        existing = await collection.find_one(
+            {
+                "idempotency_key": job.idempotency_key,
+                "$or": [
+                    {"status": {"$in": ACTIVE_STATUSES}},
+                    {
+                        "status": ResearchJobStatus.SUCCEEDED,
+                        "finished_at": {"$gte": now - self.idempotency_window},
+                    },
+                ],
+            },
+            sort=[("created_at", -1)],
+        )
+        if existing:
+            return self._to_job(existing)
+
+        try:
+            await collection.insert_one(
+                {**job.model_dump(), "active_key": job.idempotency_key}
+            )
+        except DuplicateKeyError:
+            # A concurrent submission queued the same job first
+            return self._to_job(
+                await collection.find_one({"active_key": job.idempotency_key})
+            )
+        LOG.info(f"Queued {job.kind} job {job.job_id} for {job.company_name}")
+        return job
+
+    async def get(self, job_id: str) -> Optional[ResearchJob]:
+        return self._to_job(
+            await self.mongo_connector.afind_one(
+                self.COLLECTION_NAME, {"job_id": job_id}
+            )
+        )
+
+    async def claim(self, worker_id: str, lease: timedelta) -> Optional[ResearchJob]:
+        from pymongo import ReturnDocument
+
+        collection = await self.mongo_connector.aget_collection(self.COLLECTION_NAME)
+        now = datetime.utcnow()
+        await self._fail_abandoned(collection, now)
+        document = await collection.find_one_and_update(
+            {
+                "$or": [
+                    {
+                        "status": ResearchJobStatus.QUEUED,
+                        "available_at": {"$lte": now},
+                    },
+                    {
+                        "status": ResearchJobStatus.RUNNING,
+                        "lease_until": {"$lt": now},
+                        "$expr": {"$lt": ["$attempts", "$max_attempts"]},
+                    },
+                ]
+            },
+            {
+                "$set": {
+                    "status": ResearchJobStatus.RUNNING,
+                    "worker_id": worker_id,
+                    "lease_until": now + lease,
+                    "started_at": now,
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("available_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        return self._to_job(document)
+
+    async def _fail_abandoned(self, collection, now: datetime) -> None:
+        """Fail the expired running jobs that have no attempts left"""
+        abandoned = collection.find(
+            {
+                "status": ResearchJobStatus.RUNNING,
+                "lease_until": {"$lt": now},
+                "$expr": {"$gte": ["$attempts", "$max_attempts"]},
+            }
+        )
+        async for document in abandoned:
+            job = self._to_job(document)
+            LOG.error(f"Job {job.job_id} abandoned after {job.attempts} attempts")
+            # Matching the lease too, so a job renewed meanwhile is left alone
+            await collection.update_one(
+                {"job_id": job.job_id, "lease_until": job.lease_until},
+                {
+                    "$set": self._abandoned_update(job, now),
+                    "$unset": {"active_key": ""},
+                },
+            )
+
+    async def heartbeat(self, job_id: str, worker_id: str, lease: timedelta) -> None:
+        await self.mongo_connector.aupdate_one(
+            self.COLLECTION_NAME,
+            {"job_id": job_id, "worker_id": worker_id},
+            {"$set": {"lease_until": datetime.utcnow() + lease}},
+        )
+
+    async def finish(
+        self,
+        job_id: str,
+        worker_id: str,
+        status: ResearchJobStatus,
+        result: Optional[Dict[str, Any]] = None,
+        failed_sections: Optional[List[str]] = None,
+        error: Optional[str] = None,
+        retry_after: Optional[timedelta] = None,
+    ) -> None:
+        update: Dict[str, Any] = {
+            "$set": self._finish_update(
+                status, result, failed_sections, error, retry_after
+            )
+        }
+        if status not in ACTIVE_STATUSES:
+            # Let a new submission with this key queue a job again
+            update["$unset"] = {"active_key": ""}
+        await self.mongo_connector.aupdate_one(
+            self.COLLECTION_NAME, {"job_id": job_id, "worker_id": worker_id}, update
+        )
+
+    async def get_stats(self) -> Dict[str, int]:
+        counts = await self.mongo_connector.aaggregate(
+            self.COLLECTION_NAME, [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+        )
+        stats = {status.value: 0 for status in ResearchJobStatus}
+        stats.update({row["_id"]: row["count"] for row in counts})
+        return stats
+
+
+def get_job_queue(config: JobsConfig, mongo_config: MongoConnectionDetails) -> JobQueue:
+    if config.backend == "memory":
+        return InMemoryJobQueue(config)
+    return MongoJobQueue(config, mongo_config)
@@ -0,0 +1,195 @@
+import asyncio
+import os
+import signal
+import socket
+import uuid
+from contextlib import suppress
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from backend.container import ServiceContainer
+from backend.jobs.queue import JobQueue, ResearchJob
+from backend.models.requests.research import ResearchJobKind
+from backend.models.response.research import ResearchJobStatus, ResearchResponse
+from backend.services.research import ResearchService
+from backend.settings import JobsConfig, get_app_settings
+from backend.utils.cache_decorator import CLIENT_ERROR_STATUSES
+from backend.utils.logger import get_logger
+
+LOG = get_logger("JobWorker")
+
+
+class ResearchJobWorkerPool:
+    """
+    Runs queued research jobs, `JOBS__WORKERS` at a time, until stopped.
+
+    `research` jobs bring the stored basic research up to date, recomputing only
+    stale fields, so a retry recomputes just the fields the previous attempt could
+    not. A `research` job with failed fields, or any job whose run failed, is
+    queued again with an exponential backoff until `JOBS__MAX_ATTEMPTS`; a job that
+    is still missing fields then succeeds with them listed in `failed_sections`.
+    A run that failed with a client error (e.g. an unknown company) fails at once,
+    as a retry would fail the same way.
+    Deep research is cached as a whole, so its failed fields are only reported.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        research_service: ResearchService,
+        config: JobsConfig,
+    ):
+        self.queue = queue
+        self.research_service = research_service
+        self.config = config
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.lease = timedelta(seconds=config.lease_seconds)
+        self._tasks: List[asyncio.Task] = []
+
+    async def _execute(self, job: ResearchJob) -> Tuple[Dict[str, Any], List[str]]:
+        """Run a job, returning its result and the fields that failed"""
+        options = job.options
+        if job.kind == ResearchJobKind.DEEP_RESEARCH:
+            research: ResearchResponse = await self.research_service.get_deep_research(
+                job.company_name,
+                use_knowledge_base=options.get("use_knowledge_base", False),
+            )
+            failed = [
+                f"{section}.{field}"
+                for section in self.research_service.SECTION_MODELS
+                for field, value in (getattr(research, section) or {})
+                if value is None
+            ]
+            return research.model_dump(mode="json"), failed
+
+        refresh = await self.research_service.refresh_research(
+            job.company_name,
+            use_knowledge_base=options.get("use_knowledge_base", False),
+            # A forced job recomputes every field not stored since it was queued,
+            # so a retry (even of an attempt that died with its worker) keeps the
+            # fields earlier attempts stored and redoes only the rest
+            refreshed_since=job.created_at if options.get("force") else None,
+        )
+        return refresh.model_dump(mode="json"), refresh.failed
+
+    def _retry_after(self, job: ResearchJob) -> Optional[timedelta]:
+        """The backoff before the next attempt, or None if the job is out of attempts"""
+        if job.attempts >= job.max_attempts:
+            return None
+        return timedelta(
+            seconds=self.config.retry_backoff_seconds * 2 ** (job.attempts - 1)
+        )
+
+    async def _heartbeat(self, job: ResearchJob) -> None:
+        while True:
+            await asyncio.sleep(self.lease.total_seconds() / 3)
+            try:
+                await self.queue.heartbeat(job.job_id, self.worker_id, self.lease)
+            except Exception as e:
+                LOG.error(f"Heartbeat for job {job.job_id} failed: {e}")
+
+    async def run_job(self, job: ResearchJob) -> None:
+        LOG.info(
+            f"Running {job.kind} job {job.job_id} for {job.company_name} "
+            f"(attempt {job.attempts}/{job.max_attempts})"
+        )
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            result, failed = await self._execute(job)
+        except Exception as e:
+            client_error = getattr(e, "status", None) in CLIENT_ERROR_STATUSES
+            retry_after = None if client_error else self._retry_after(job)
+            LOG.error(f"Job {job.job_id} failed: {e}")
+            await self.queue.finish(
+                job.job_id,
+                self.worker_id,
+                ResearchJobStatus.QUEUED if retry_after else ResearchJobStatus.FAILED,
+                error=getattr(e, "message", None) or str(e),
+                retry_after=retry_after,
+            )
+            return
+        finally:
+            heartbeat.cancel()
+            with suppress(asyncio.CancelledError):
+                await heartbeat
+
+        retries_fields = job.kind == ResearchJobKind.RESEARCH
+        retry_after = self._retry_after(job) if failed and retries_fields else None
+        if retry_after:
+            LOG.warning(
+                f"Job {job.job_id} left {len(failed)} fields failed, retrying in "
+                f"{retry_after.total_seconds():.0f}s"
+            )
+        await self.queue.finish(
+            job.job_id,
+            self.worker_id,
+            ResearchJobStatus.QUEUED if retry_after else ResearchJobStatus.SUCCEEDED,
+            result=result,
+            failed_sections=failed,
+            retry_after=retry_after,
+        )
+
+    async def _work(self, slot: int) -> None:
+        while True:
+            try:
+                job = await self.queue.claim(self.worker_id, self.lease)
+            except Exception as e:
+                LOG.error(f"Worker {slot} failed to claim a job: {e}")
+                job = None
+            if job is None:
+                await asyncio.sleep(self.config.poll_interval_seconds)
+                continue
+            try:
+                await self.run_job(job)
+            except Exception as e:
+                # The job's lease runs out and another attempt picks it up
+                LOG.error(f"Worker {slot} failed to record job {job.job_id}: {e}")
+
+    def start(self) -> None:
+        LOG.info(f"Starting {self.config.workers} research job workers")
+        self._tasks = [
+            asyncio.create_task(self._work(slot)) for slot in range(self.config.workers)
+        ]
+
+    async def stop(self) -> None:
+        """
+        Cancel the workers. Jobs they were running stay claimed until their lease
+        runs out, then another worker picks them up.
+        """
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+
+
+async def main() -> None:
+    load_dotenv()
+    app_settings = get_app_settings()
+    services = ServiceContainer(app_settings)
+    pool = ResearchJobWorkerPool(
+        services.job_queue, services.research_service, app_settings.jobs_config
+    )
+
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopped.set)
+
+    pool.start()
+    usage_flusher = asyncio.create_task(services.llm_usage_service.arun_flusher())
+    try:
+        await stopped.wait()
+    finally:
+        await pool.stop()
+        usage_flusher.cancel()
+        with suppress(asyncio.CancelledError):
+            await usage_flusher
+        await services.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
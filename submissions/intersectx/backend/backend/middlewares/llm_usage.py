@@ -0,0 +1,39 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.utils.llm_usage import llm_usage_scope
+
+# Streamed bodies do their LLM work after the headers are sent
+STREAMING_MEDIA_TYPES = ("text/event-stream", "application/x-ndjson")
+
+
+class LLMUsageMiddleware:
+    """
+    Totals the LLM usage of each HTTP request, across the whole app call, and
+    reports it in `X-LLM-*` response headers.
+
+    A pure ASGI middleware, so requests (SSE and NDJSON streams included) pay no
+    BaseHTTPMiddleware overhead. Streamed responses get no usage headers: they are
+    sent before the body runs its LLM calls. Those calls, and background cache
+    refreshes, are still counted in the stored usage.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with llm_usage_scope() as usage:
+
+            async def send_with_usage(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    content_type = headers.get("content-type", "")
+                    if not content_type.startswith(STREAMING_MEDIA_TYPES):
+                        headers.update(usage.headers())
+                await send(message)
+
+            await self.app(scope, receive, send_with_usage)
@@ -1,5 +1,26 @@
-from pydantic import BaseModel
+from enum import StrEnum
+
+from pydantic import BaseModel, Field
 
 
 class ResearchRequest(BaseModel):
     company_name: str
+
+
+class ResearchJobKind(StrEnum):
+    RESEARCH = "research"
+    DEEP_RESEARCH = "deep_research"
+
+
+class ResearchJobRequest(BaseModel):
+    company_name: str = Field(..., description="The full name of the company.")
+    kind: ResearchJobKind = Field(
+        ResearchJobKind.RESEARCH,
+        description="`research` brings the stored basic research up to date; `deep_research` runs the knowledge base field agents.",
+    )
+    use_knowledge_base: bool = Field(
+        False, description="Whether the basic research uses the knowledge base."
+    )
+    force: bool = Field(
+        False, description="Recompute every field of the basic research, fresh or not."
+    )
@@ -0,0 +1,28 @@
+from typing import Any, Optional
+
+from pydantic import BaseModel, Field
+
+
+class CacheStatsResponse(BaseModel):
+    memory: dict[str, int] = Field(..., description="Memory tier hits, misses and size")
+    mongo: dict[str, int] = Field(..., description="MongoDB tier hits and misses")
+    expiry: Optional[dict[str, Any]] = Field(
+        None, description="Latest expired-entry report"
+    )
+    methods: dict[str, dict[str, Any]] = Field(
+        ..., description="Counters, latency histograms and sizes per service:method"
+    )
+    mongo_clients: dict[str, int] = Field(
+        ..., description="Pooled Mongo clients and connection counters"
+    )
+
+
+class CacheInvalidationResponse(BaseModel):
+    deleted: int = Field(..., description="Entries removed from MongoDB")
+    memory_deleted: int = Field(
+        ..., description="Entries removed from this process' memory tier"
+    )
+    memory_ttl_seconds: int = Field(
+        ...,
+        description="How long other processes may still serve their in-memory copies",
+    )
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class LLMUsageRow(BaseModel):
+    group: dict[str, str] = Field(
+        ..., description="Values of the grouped-by fields ('-' for untagged calls)"
+    )
+    calls: int = Field(..., description="LLM calls")
+    prompt_tokens: int = Field(..., description="Prompt tokens")
+    completion_tokens: int = Field(..., description="Completion tokens")
+    cached_tokens: int = Field(
+        ..., description="Prompt tokens served from the provider's prompt cache"
+    )
+    cached_prompt_ratio: float = Field(
+        ..., description="Share of the prompt tokens that were cached"
+    )
+    cost_usd: float = Field(..., description="Estimated cost in USD")
+    avg_latency_seconds: float = Field(..., description="Average call latency")
+
+
+class LLMUsageResponse(BaseModel):
+    since: datetime = Field(..., description="Start of the reported period (UTC)")
+    group_by: list[str] = Field(..., description="Fields the usage is grouped by")
+    rows: list[LLMUsageRow] = Field(..., description="Usage per group, costliest first")
+    total: LLMUsageRow = Field(..., description="Usage over the whole period")
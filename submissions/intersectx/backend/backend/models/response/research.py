@@ -1,5 +1,10 @@
+from datetime import datetime
+from enum import StrEnum
+
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Literal, Optional
+
+from backend.models.requests.research import ResearchJobKind
 
 from backend.models.response.finance import (
     RevenueAnalysisResponse,
@@ -175,3 +180,87 @@ class ResearchResponseWithSummary(ResearchResponse):
         ...,
         description="A summary of the company's financial, organizational, and market-level information.",
     )
+
+
+class ResearchStreamEvent(BaseModel):
+    event: Literal["field", "section", "chart", "error", "done"] = Field(
+        ...,
+        description="`field` when a field is ready, `section` once all of a section's fields are, `chart` when a field's chart is uploaded, `error` for a failed field and `done` at the end.",
+    )
+    company_name: str = Field(..., description="The full name of the company.")
+    section: Optional[str] = Field(
+        None,
+        description="Section of the research response (finance, linkedin_team or market_analysis).",
+    )
+    field: Optional[str] = Field(None, description="Field within the section.")
+    data: Optional[Any] = Field(
+        None, description="The field or section response, or the full research."
+    )
+    iframe_url: Optional[str] = Field(None, description="URL of the field's chart.")
+    message: Optional[str] = Field(None, description="Why the field failed.")
+
+
+class ResearchRefreshResponse(BaseModel):
+    company_name: str = Field(..., description="The full name of the company.")
+    refreshed: list[str] = Field(
+        default_factory=list,
+        description="Fields (as section.field) that were stale and recomputed.",
+    )
+    failed: list[str] = Field(
+        default_factory=list,
+        description="Stale fields whose recomputation failed; they keep their previous data and are retried on the next refresh.",
+    )
+    fresh: list[str] = Field(
+        default_factory=list,
+        description="Fields still within their section's freshness policy, left as they were.",
+    )
+    research: ResearchResponse = Field(
+        ..., description="The stored research after the refresh."
+    )
+
+
+class ResearchJobStatus(StrEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class ResearchJobResponse(BaseModel):
+    job_id: str = Field(..., description="Identifier of the job.")
+    kind: ResearchJobKind = Field(..., description="What the job computes.")
+    company_name: str = Field(..., description="The full name of the company.")
+    options: dict[str, Any] = Field(
+        default_factory=dict, description="Options the job was submitted with."
+    )
+    status: ResearchJobStatus = Field(..., description="Where the job is.")
+    attempts: int = Field(0, description="Attempts started so far.")
+    max_attempts: int = Field(..., description="Attempts allowed before giving up.")
+    created_at: datetime = Field(..., description="When the job was submitted.")
+    started_at: Optional[datetime] = Field(
+        None, description="When the latest attempt started."
+    )
+    finished_at: Optional[datetime] = Field(
+        None, description="When the job succeeded or finally failed."
+    )
+    available_at: Optional[datetime] = Field(
+        None, description="When a queued job (or its retry) may start."
+    )
+    failed_sections: list[str] = Field(
+        default_factory=list,
+        description="Fields (as section.field) that failed in the latest attempt; queued jobs retry them.",
+    )
+    error: Optional[str] = Field(None, description="Why the latest attempt failed.")
+
+
+class ResearchJobResultResponse(BaseModel):
+    job_id: str = Field(..., description="Identifier of the job.")
+    status: ResearchJobStatus = Field(..., description="Where the job is.")
+    failed_sections: list[str] = Field(
+        default_factory=list,
+        description="Fields (as section.field) that could not be computed.",
+    )
+    result: dict[str, Any] = Field(
+        ...,
+        description="The research refresh (for `research` jobs) or the deep research.",
+    )
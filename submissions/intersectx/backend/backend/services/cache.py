@@ -1,11 +1,35 @@
+import asyncio
+import re
+import time
 from datetime import datetime, timedelta
-from typing import Any, Optional, TypeVar, Generic, Dict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    NamedTuple,
+    Optional,
+    TypeVar,
+)
 
 from pydantic import BaseModel
 
-from backend.settings import MongoConnectionDetails
+from backend.settings import CacheConfig, MongoConnectionDetails
 from backend.database.mongo import MongoDBConnector
+from backend.utils.cache_keys import hash_args, normalize_company_name
+from backend.utils.cache_metrics import CacheMetrics
+from backend.utils.cache_policy import CacheTTLPolicyRegistry
+from backend.utils.cache_codecs import (
+    describe_model_type,
+    get_codec,
+    model_type_path,
+    resolve_model_type,
+)
 from backend.utils.logger import get_logger
+from backend.utils.memory_cache import MemoryCache
+from backend.utils.rate_limit import Priority, llm_priority
 
 LOG = get_logger("CacheService")
 
@@ -14,112 +38,400 @@ T = TypeVar("T")
 
 class CacheEntry(BaseModel, Generic[T]):
     key: str
-    data: T
+    service: Optional[str] = None
+    method: Optional[str] = None
+    args: Optional[Dict[str, Any]] = None
+    data: Optional[T] = None
+    payload: Optional[bytes] = None
+    codec: Optional[str] = None
+    model_type: Optional[str] = None
+    model_is_list: bool = False
     expires_at: datetime
+    fresh_until: Optional[datetime] = None
+    refreshed_at: Optional[datetime] = None
+
+
+class CacheWrite(NamedTuple):
+    """A single entry to store with `CacheService.aset_many`"""
+
+    service_name: str
+    method_name: str
+    args: Dict[str, Any]
+    data: Any
+    ttl: Optional[timedelta] = None
+    stale_ttl: Optional[timedelta] = None
 
 
 class CacheService:
     """
-    A service for caching data with MongoDB as the backend storage.
+    A two-tier cache: a bounded in-process LRU (memory) in front of MongoDB.
     Provides both sync and async methods for cache operations.
+
+    The memory tier, the background refresh limiter, the per-tier hit/miss
+    counters and the per-method metrics are shared by every CacheService instance
+    in the process.
     """
 
     COLLECTION_NAME = "cache_entries"
+    LEASE_COLLECTION_NAME = "cache_leases"
     DEFAULT_TTL = timedelta(days=1)  # Default time-to-live is 1 day
 
-    def __init__(self, mongo_config: MongoConnectionDetails):
+    _indexes_ready: bool = False
+    _memory_tier: Optional[MemoryCache] = None
+    _max_concurrent_refreshes: int = 1
+    # One limiter per event loop, as a semaphore is bound to the loop it waits on
+    _refresh_semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+    _refreshing_keys: set = set()
+    _refresh_tasks: set = set()
+    _refresh_failures: Dict[str, tuple[int, datetime]] = {}
+    _last_expiry_report: Optional[Dict[str, Any]] = None
+    _metrics = CacheMetrics()
+    _tier_stats: Dict[str, Dict[str, int]] = {
+        "memory": {"hits": 0, "misses": 0},
+        "mongo": {"hits": 0, "misses": 0},
+    }
+
+    def __init__(
+        self,
+        mongo_config: MongoConnectionDetails,
+        cache_config: Optional[CacheConfig] = None,
+    ):
         self.mongo_connector = MongoDBConnector(mongo_config)
+        cache_config = cache_config or CacheConfig()
+        self.key_prefix = f"{cache_config.key_namespace}:v{cache_config.key_version}"
+        if CacheService._memory_tier is None:
+            CacheService._memory_tier = MemoryCache(
+                max_entries=cache_config.memory_max_entries,
+                max_ttl=timedelta(seconds=cache_config.memory_ttl_seconds),
+            )
+        self.codec = get_codec(cache_config.codec)
+        CacheService._max_concurrent_refreshes = cache_config.max_concurrent_refreshes
+        self.memory_tier = CacheService._memory_tier
+        self.metrics = CacheService._metrics
+        self.ttl_policies = CacheTTLPolicyRegistry(cache_config.ttl_policies)
+        self.negative_ttl = timedelta(seconds=cache_config.negative_ttl_seconds)
+        self.negative_max_ttl = timedelta(seconds=cache_config.negative_max_ttl_seconds)
+        self.negative_reset = timedelta(seconds=cache_config.negative_reset_seconds)
         # Ensure indexes are created
         self._setup_indexes()
 
     def _setup_indexes(self):
-        """Setup necessary indexes for the cache collection"""
+        """
+        Setup necessary indexes for the cache and lease collections, once per process.
+        Both collections have a TTL index on `expires_at`, so MongoDB removes expired
+        documents itself.
+        """
         from backend.database.mongo import MongoIndexSpec
 
-        # Check if collection exists and has our indexes
-        collection = self.mongo_connector.get_collection(self.COLLECTION_NAME)
-        existing_indexes = collection.index_information()
-
-        # If the key_index already exists, we don't need to create indexes
-        if "key_index" in existing_indexes:
-            LOG.debug("Cache collection indexes already exist")
+        if CacheService._indexes_ready:
             return
 
-        LOG.info(f"Creating indexes for collection: {self.COLLECTION_NAME}")
-        indexes = [
-            MongoIndexSpec(keys=[("key", 1)], name="key_index", unique=True),
-            MongoIndexSpec(keys=[("expires_at", 1)], name="expiry_index"),
-        ]
-        self.mongo_connector.create_indexes(self.COLLECTION_NAME, indexes)
+        ttl_index = MongoIndexSpec(
+            keys=[("expires_at", 1)], name="expiry_index", expire_after_seconds=0
+        )
+        key_index = MongoIndexSpec(keys=[("key", 1)], name="key_index", unique=True)
+        collection_indexes = {
+            # Leases rely on the unique key index to guarantee a single holder
+            self.LEASE_COLLECTION_NAME: [key_index, ttl_index],
+            # service_method_index backs targeted invalidation
+            self.COLLECTION_NAME: [
+                key_index,
+                ttl_index,
+                MongoIndexSpec(
+                    keys=[("service", 1), ("method", 1)], name="service_method_index"
+                ),
+            ],
+        }
+        for collection_name, indexes in collection_indexes.items():
+            collection = self.mongo_connector.get_collection(collection_name)
+            existing_indexes = collection.index_information()
+
+            # Replace the plain expiry index created before expiry moved to MongoDB
+            expiry_index = existing_indexes.get("expiry_index")
+            if expiry_index and "expireAfterSeconds" not in expiry_index:
+                LOG.info(
+                    f"Replacing expiry_index on {collection_name} with a TTL index"
+                )
+                collection.drop_index("expiry_index")
+                existing_indexes.pop("expiry_index")
+
+            if {index.name for index in indexes} <= existing_indexes.keys():
+                LOG.debug(f"{collection_name} indexes already exist")
+                continue
+
+            self.mongo_connector.create_indexes(collection_name, indexes)
+
+        CacheService._indexes_ready = True
 
     def _generate_key(
         self, service_name: str, method_name: str, args: Dict[str, Any]
     ) -> str:
-        """Generate a unique cache key based on service, method and arguments"""
-        args_str = "&".join(f"{k}={v}" for k, v in sorted(args.items()))
-        return f"{service_name}:{method_name}:{args_str}"
+        """
+        Generate a unique cache key based on service, method and arguments.
+        Keys look like `<namespace>:v<version>:<service>:<method>:<args digest>`;
+        bumping the version retires every existing entry.
+        """
+        return f"{self.key_prefix}:{service_name}:{method_name}:{hash_args(args)}"
+
+    def resolve_ttl(
+        self,
+        service_name: str,
+        method_name: str,
+        args: Dict[str, Any],
+        ttl: Optional[timedelta] = None,
+        stale_ttl: Optional[timedelta] = None,
+    ) -> tuple[Optional[timedelta], Optional[timedelta]]:
+        """
+        The (ttl, stale_ttl) to use for a call: the matching TTL policy's values,
+        falling back to the given ones for anything the policy leaves unset
+        """
+        policy = self.ttl_policies.resolve(service_name, method_name, args)
+        if policy is None:
+            return ttl, stale_ttl
+        return (
+            policy.ttl if policy.ttl is not None else ttl,
+            policy.stale_ttl if policy.stale_ttl is not None else stale_ttl,
+        )
+
+    def _record(self, tier: str, outcome: str) -> None:
+        self._tier_stats[tier][outcome] += 1
+
+    def _metric_name_from_key(self, key: str) -> str:
+        """`service:method` of a key built by `_generate_key`"""
+        service_name, method_name = key[len(self.key_prefix) + 1 :].split(":")[:2]
+        return self.metrics.name(service_name, method_name)
+
+    @staticmethod
+    def _entry_size(entry: dict) -> int:
+        """Stored size in bytes of an entry's cached value"""
+        if entry.get("payload") is not None:
+            return len(entry["payload"])
+
+        import bson
+
+        try:
+            return len(bson.encode({"data": entry.get("data")}))
+        except Exception:
+            return 0
 
-    def _serialize_for_mongodb(self, data: Any) -> Any:
-        """Convert data to MongoDB-compatible format"""
-        if data is None:
+    def _record_set(self, entry: dict) -> None:
+        self.metrics.record_set(
+            self.metrics.name(entry["service"], entry["method"]),
+            self._entry_size(entry),
+        )
+
+    def _get_from_memory(self, key: str) -> Optional[dict]:
+        entry = self.memory_tier.get(key)
+        if entry is None:
+            self._record("memory", "misses")
             return None
 
-        # Handle Pydantic models
-        if hasattr(data, "model_dump"):
-            try:
-                return data.model_dump()
-            except Exception as e:
-                LOG.error(f"Error serializing Pydantic model: {e}")
-                # Fallback to dict
-                try:
-                    return dict(data)
-                except Exception:
-                    LOG.error(
-                        f"Failed to convert Pydantic model to dict for {type(data)}"
-                    )
-                    # Return just the string representation as a last resort
-                    return str(data)
-
-        # Handle lists
-        elif isinstance(data, list):
-            return [self._serialize_for_mongodb(item) for item in data]
-
-        # Handle dictionaries
-        elif isinstance(data, dict):
-            return {k: self._serialize_for_mongodb(v) for k, v in data.items()}
-
-        # Handle datetimes
-        elif hasattr(data, "isoformat"):
-            return data.isoformat()
-
-        # Handle any objects with __dict__
-        elif hasattr(data, "__dict__"):
+        self._record("memory", "hits")
+        LOG.info(f"Cache hit (memory) for {key}")
+        return entry
+
+    def _store_in_memory(self, entry: dict) -> None:
+        self.memory_tier.set(entry["key"], entry, entry["expires_at"])
+
+    def _build_entry(
+        self,
+        key: str,
+        service_name: str,
+        method_name: str,
+        args: Dict[str, Any],
+        data: Any,
+        ttl: Optional[timedelta] = None,
+        stale_ttl: Optional[timedelta] = None,
+    ) -> dict:
+        """
+        Build the stored document. `fresh_until` marks when the entry should be
+        refreshed, while `expires_at` (fresh_until + stale_ttl) is when it can no
+        longer be served at all.
+        """
+        now = datetime.utcnow()
+        fresh_until = now + (ttl or self.DEFAULT_TTL)
+        model_cls, is_list = describe_model_type(data)
+        return {
+            "key": key,
+            "service": service_name,
+            "method": method_name,
+            "args": args,
+            **self.codec.encode(data, model_cls, is_list),
+            "codec": self.codec.name,
+            "model_type": model_type_path(model_cls),
+            "model_is_list": is_list,
+            "fresh_until": fresh_until,
+            "expires_at": fresh_until + (stale_ttl or timedelta(0)),
+            "refreshed_at": now,
+        }
+
+    def negative_backoff(self, failures: int) -> timedelta:
+        """Exponential backoff after `failures` consecutive failures"""
+        return min(self.negative_ttl * 2 ** max(failures - 1, 0), self.negative_max_ttl)
+
+    def _build_negative_entry(
+        self,
+        key: str,
+        service_name: str,
+        method_name: str,
+        args: Dict[str, Any],
+        error: Dict[str, Any],
+        failures: int,
+    ) -> dict:
+        """
+        Build a negative entry recording a failed computation. Callers are refused
+        until `fresh_until` (the backoff); after that the entry is stale and the next
+        call retries. It is kept until `expires_at` so the failure count survives.
+        """
+        now = datetime.utcnow()
+        backoff = self.negative_backoff(failures)
+        return {
+            "key": key,
+            "service": service_name,
+            "method": method_name,
+            "args": args,
+            "negative": True,
+            "error": error,
+            "failures": failures,
+            "fresh_until": now + backoff,
+            "expires_at": now + max(backoff, self.negative_reset),
+            "refreshed_at": now,
+        }
+
+    def _decode_entry(self, entry: dict) -> Optional[dict]:
+        """
+        Decode a stored document into an entry whose `data` is the cached value,
+        rehydrated into its recorded Pydantic model when there is one. Entries that
+        can no longer be decoded (e.g. the model changed shape) count as misses.
+        """
+        codec_name = entry.get("codec")
+        if codec_name is None:
+            # Negative entries, or written before codecs existed: returned as stored
+            return entry
+
+        try:
+            model_cls = resolve_model_type(entry.get("model_type"))
+            data = get_codec(codec_name).decode(
+                entry, model_cls, entry.get("model_is_list", False)
+            )
+        except Exception as e:
+            LOG.warning(f"Failed to decode cache entry for {entry['key']}: {e}")
+            return None
+
+        decoded = {k: v for k, v in entry.items() if k != "payload"}
+        decoded["data"] = data
+        return decoded
+
+    @staticmethod
+    def is_stale(entry: dict, refresh_ahead: Optional[timedelta] = None) -> bool:
+        """Whether an entry is past (or within `refresh_ahead` of) its fresh window"""
+        fresh_until = entry.get("fresh_until") or entry["expires_at"]
+        return datetime.utcnow() >= fresh_until - (refresh_ahead or timedelta(0))
+
+    @classmethod
+    def _refresh_semaphore(cls) -> asyncio.Semaphore:
+        """The background refresh limiter of the running event loop"""
+        loop = asyncio.get_running_loop()
+        semaphore = cls._refresh_semaphores.get(loop)
+        if semaphore is None:
+            for other in [
+                other for other in cls._refresh_semaphores if other.is_closed()
+            ]:
+                del cls._refresh_semaphores[other]
+            semaphore = cls._refresh_semaphores[loop] = asyncio.Semaphore(
+                cls._max_concurrent_refreshes
+            )
+        return semaphore
+
+    def schedule_refresh(self, key: str, refresh: Callable[[], Awaitable[Any]]):
+        """
+        Run `refresh` in the background, at most once per key and with no more than
+        `max_concurrent_refreshes` running at a time.
+        """
+        if key in self._refreshing_keys:
+            return
+
+        # Back off refreshes that keep failing instead of retrying on every hit
+        failures, retry_at = self._refresh_failures.get(key, (0, None))
+        if retry_at is not None and datetime.utcnow() < retry_at:
+            return
+
+        async def run():
             try:
-                return self._serialize_for_mongodb(data.__dict__)
+                async with self._refresh_semaphore():
+                    LOG.info(f"Refreshing stale cache entry for {key}")
+                    # Nobody waits on a refresh, so its LLM calls go in the batch lane
+                    with llm_priority(Priority.BATCH):
+                        await refresh()
+                self._refresh_failures.pop(key, None)
             except Exception as e:
-                LOG.error(f"Error serializing object with __dict__: {e}")
-                return str(data)
-
-        # Handle other types that MongoDB can store directly
-        return data
+                retry_at = datetime.utcnow() + self.negative_backoff(failures + 1)
+                self._refresh_failures[key] = (failures + 1, retry_at)
+                LOG.error(
+                    f"Background refresh failed for {key}: {e}; "
+                    f"next attempt after {retry_at}"
+                )
+            finally:
+                self._refreshing_keys.discard(key)
+
+        self._refreshing_keys.add(key)
+        task = asyncio.ensure_future(run())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def adrain_refreshes(self) -> None:
+        """Wait for the scheduled background refreshes to finish"""
+        while self._refresh_tasks:
+            await asyncio.gather(*list(self._refresh_tasks), return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Per-tier hit/miss counters, the current size of the memory tier, the latest
+        expiry report and per `service:method` metrics
+        """
+        stats = {tier: dict(counts) for tier, counts in self._tier_stats.items()}
+        stats["memory"]["entries"] = len(self.memory_tier)
+        stats["expiry"] = self._last_expiry_report
+        stats["methods"] = self.metrics.snapshot()
+        return stats
+
+    def get_entry(
+        self, service_name: str, method_name: str, args: Dict[str, Any]
+    ) -> Optional[dict]:
+        """Get the cached entry (data plus freshness metadata) if it is not expired"""
+        started = time.perf_counter()
+        key = self._generate_key(service_name, method_name, args)
+        metric_name = self.metrics.name(service_name, method_name)
+
+        entry = self._get_from_memory(key)
+        if entry is None:
+            # Query for unexpired cache entry
+            now = datetime.utcnow()
+            query = {"key": key, "expires_at": {"$gt": now}}
+
+            results = self.mongo_connector.query(self.COLLECTION_NAME, query)
+            if results and len(results) > 0:
+                self._record("mongo", "hits")
+                self._store_in_memory(results[0])
+                LOG.info(f"Cache hit for {key}")
+                entry = results[0]
+            else:
+                self._record("mongo", "misses")
+                LOG.info(f"Cache miss for {key}")
+
+        decoded = self._decode_entry(entry) if entry is not None else None
+        self.metrics.record_lookup(
+            metric_name, decoded is not None, time.perf_counter() - started
+        )
+        return decoded
 
     def get(
         self, service_name: str, method_name: str, args: Dict[str, Any]
     ) -> Optional[Any]:
         """Get cached data if it exists and is not expired"""
-        key = self._generate_key(service_name, method_name, args)
-
-        # Query for unexpired cache entry
-        now = datetime.utcnow()
-        query = {"key": key, "expires_at": {"$gt": now}}
-
-        results = self.mongo_connector.query(self.COLLECTION_NAME, query)
-        if results and len(results) > 0:
-            LOG.info(f"Cache hit for {key}")
-            return results[0]["data"]
-
-        LOG.info(f"Cache miss for {key}")
-        return None
+        entry = self.get_entry(service_name, method_name, args)
+        # Negative entries carry no data and read as a miss
+        return entry.get("data") if entry is not None else None
 
     def set(
         self,
@@ -128,38 +440,42 @@ class CacheService:
         args: Dict[str, Any],
         data: Any,
         ttl: Optional[timedelta] = None,
+        stale_ttl: Optional[timedelta] = None,
     ) -> None:
         """Store data in cache with expiration time"""
         key = self._generate_key(service_name, method_name, args)
-        expires_at = datetime.utcnow() + (ttl or self.DEFAULT_TTL)
-
-        # Serialize data for MongoDB
-        serialized_data = self._serialize_for_mongodb(data)
-
-        # Upsert the cache entry
-        query_filter = {"key": key}
-        update_operation = {"$set": {"data": serialized_data, "expires_at": expires_at}}
-
-        self.mongo_connector.update_records(
-            self.COLLECTION_NAME, query_filter, update_operation
+        entry = self._build_entry(
+            key, service_name, method_name, args, data, ttl, stale_ttl
         )
-        LOG.info(f"Cached data for {key}, expires at {expires_at}")
+
+        # Upsert the cache entry, replacing fields written by a previous codec
+        collection = self.mongo_connector.get_collection(self.COLLECTION_NAME)
+        collection.replace_one({"key": key}, entry, upsert=True)
+        self._store_in_memory(entry)
+        self._record_set(entry)
+        LOG.info(f"Cached data for {key}, expires at {entry['expires_at']}")
 
     def invalidate(
         self, service_name: str, method_name: str, args: Dict[str, Any]
     ) -> None:
-        """Invalidate a specific cache entry"""
+        """
+        Invalidate a specific cache entry. Only this process' memory tier is
+        cleared: other processes may serve their copy for up to `memory_ttl_seconds`.
+        """
         key = self._generate_key(service_name, method_name, args)
+        self.memory_tier.delete(key)
         self.mongo_connector.delete_records(self.COLLECTION_NAME, {"key": key})
         LOG.info(f"Invalidated cache for {key}")
 
     def clear_all(self) -> None:
         """Clear all cache entries"""
+        self.memory_tier.clear()
         self.mongo_connector.delete_records(self.COLLECTION_NAME, {})
         LOG.info("Cleared all cache entries")
 
     def clear_expired(self) -> None:
         """Clear all expired cache entries"""
+        self.memory_tier.clear_expired()
         now = datetime.utcnow()
         self.mongo_connector.delete_records(
             self.COLLECTION_NAME, {"expires_at": {"$lt": now}}
@@ -167,23 +483,43 @@ class CacheService:
         LOG.info("Cleared expired cache entries")
 
     # Async methods
+    async def aget_entry(
+        self, service_name: str, method_name: str, args: Dict[str, Any]
+    ) -> Optional[dict]:
+        """Async version of get_entry"""
+        started = time.perf_counter()
+        key = self._generate_key(service_name, method_name, args)
+        metric_name = self.metrics.name(service_name, method_name)
+
+        entry = self._get_from_memory(key)
+        if entry is None:
+            # Query for unexpired cache entry
+            now = datetime.utcnow()
+            query = {"key": key, "expires_at": {"$gt": now}}
+
+            results = await self.mongo_connector.aquery(self.COLLECTION_NAME, query)
+            if results and len(results) > 0:
+                self._record("mongo", "hits")
+                self._store_in_memory(results[0])
+                LOG.info(f"Cache hit for {key}")
+                entry = results[0]
+            else:
+                self._record("mongo", "misses")
+                LOG.info(f"Cache miss for {key}")
+
+        decoded = self._decode_entry(entry) if entry is not None else None
+        self.metrics.record_lookup(
+            metric_name, decoded is not None, time.perf_counter() - started
+        )
+        return decoded
+
     async def aget(
         self, service_name: str, method_name: str, args: Dict[str, Any]
     ) -> Optional[Any]:
         """Async version of get"""
-        key = self._generate_key(service_name, method_name, args)
-
-        # Query for unexpired cache entry
-        now = datetime.utcnow()
-        query = {"key": key, "expires_at": {"$gt": now}}
-
-        results = await self.mongo_connector.aquery(self.COLLECTION_NAME, query)
-        if results and len(results) > 0:
-            LOG.info(f"Cache hit for {key}")
-            return results[0]["data"]
-
-        LOG.info(f"Cache miss for {key}")
-        return None
+        entry = await self.aget_entry(service_name, method_name, args)
+        # Negative entries carry no data and read as a miss
+        return entry.get("data") if entry is not None else None
 
     async def aset(
         self,
@@ -192,40 +528,255 @@ class CacheService:
         args: Dict[str, Any],
         data: Any,
         ttl: Optional[timedelta] = None,
+        stale_ttl: Optional[timedelta] = None,
     ) -> None:
         """Async version of set"""
         key = self._generate_key(service_name, method_name, args)
-        expires_at = datetime.utcnow() + (ttl or self.DEFAULT_TTL)
+        entry = self._build_entry(
+            key, service_name, method_name, args, data, ttl, stale_ttl
+        )
+
+        # Upsert the cache entry, replacing fields written by a previous codec
+        collection = await self.mongo_connector.aget_collection(self.COLLECTION_NAME)
+        await collection.replace_one({"key": key}, entry, upsert=True)
+        self._store_in_memory(entry)
+        self._record_set(entry)
+        LOG.info(f"Cached data for {key}, expires at {entry['expires_at']}")
+
+    async def aget_many(self, keys: List[str]) -> Dict[str, dict]:
+        """
+        Get the unexpired entries for many keys at once: the memory tier first, then
+        a single `$in` query for the rest. Keys without an entry are left out.
+        """
+        started = time.perf_counter()
+        found: Dict[str, dict] = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            entry = self._get_from_memory(key)
+            if entry is not None:
+                found[key] = entry
+            else:
+                missing.append(key)
+
+        if missing:
+            now = datetime.utcnow()
+            query = {"key": {"$in": missing}, "expires_at": {"$gt": now}}
+            results = await self.mongo_connector.aquery(self.COLLECTION_NAME, query)
+            for result in results:
+                found[result["key"]] = result
+                self._store_in_memory(result)
+                self._record("mongo", "hits")
+            for _ in range(len(missing) - len(results)):
+                self._record("mongo", "misses")
+            LOG.info(
+                f"Batch cache lookup: {len(results)}/{len(missing)} hits in MongoDB"
+            )
+
+        entries = {}
+        for key, entry in found.items():
+            decoded = self._decode_entry(entry)
+            if decoded is not None:
+                entries[key] = decoded
+
+        elapsed = time.perf_counter() - started
+        for key in dict.fromkeys(keys):
+            self.metrics.record_lookup(
+                self._metric_name_from_key(key), key in entries, elapsed
+            )
+        return entries
+
+    def build_write_entry(self, write: CacheWrite) -> dict:
+        """The stored document for a deferred write"""
+        return self._build_entry(
+            self._generate_key(write.service_name, write.method_name, write.args),
+            write.service_name,
+            write.method_name,
+            write.args,
+            write.data,
+            write.ttl,
+            write.stale_ttl,
+        )
+
+    def store_in_memory(self, entries: List[dict]) -> None:
+        """Serve entries from this process' memory tier before they reach MongoDB"""
+        for entry in entries:
+            self._store_in_memory(entry)
+
+    async def awrite_entries(self, entries: List[dict]) -> None:
+        """Store built entries with a single unordered `bulk_write` of upserts"""
+        from pymongo import ReplaceOne
+
+        if not entries:
+            return
+
+        collection = await self.mongo_connector.aget_collection(self.COLLECTION_NAME)
+        await collection.bulk_write(
+            [ReplaceOne({"key": e["key"]}, e, upsert=True) for e in entries],
+            ordered=False,
+        )
+        for entry in entries:
+            self._store_in_memory(entry)
+            self._record_set(entry)
+        LOG.info(f"Cached {len(entries)} entries in one batch")
+
+    async def aset_many(self, writes: List[CacheWrite]) -> None:
+        """Store many entries with a single unordered `bulk_write` of upserts"""
+        await self.awrite_entries([self.build_write_entry(w) for w in writes])
+
+    async def aset_negative(
+        self,
+        service_name: str,
+        method_name: str,
+        args: Dict[str, Any],
+        error: Dict[str, Any],
+        failures: int,
+    ) -> Optional[dict]:
+        """
+        Record that computing this entry failed for the `failures`-th time in a row.
+        An unexpired positive entry is never replaced (stale data beats an error);
+        returns the stored negative entry, or None if one was kept.
+        """
+        from pymongo.errors import DuplicateKeyError
 
-        # Serialize data for MongoDB
-        serialized_data = self._serialize_for_mongodb(data)
+        key = self._generate_key(service_name, method_name, args)
+        entry = self._build_negative_entry(
+            key, service_name, method_name, args, error, failures
+        )
+        self.metrics.record_failure(self.metrics.name(service_name, method_name))
 
-        # Upsert the cache entry
         collection = await self.mongo_connector.aget_collection(self.COLLECTION_NAME)
-        await collection.update_one(
-            {"key": key},
-            {"$set": {"data": serialized_data, "expires_at": expires_at}},
-            upsert=True,
+        try:
+            await collection.replace_one(
+                {
+                    "key": key,
+                    "$or": [
+                        {"negative": True},
+                        {"expires_at": {"$lte": entry["refreshed_at"]}},
+                    ],
+                },
+                entry,
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return None
+
+        self._store_in_memory(entry)
+        LOG.warning(
+            f"Cached failure #{failures} for {key}, retry after {entry['fresh_until']}"
         )
-        LOG.info(f"Cached data for {key}, expires at {expires_at}")
+        return entry
 
     async def ainvalidate(
         self, service_name: str, method_name: str, args: Dict[str, Any]
     ) -> None:
-        """Async version of invalidate"""
+        """Async version of invalidate (which clears only this process' memory tier)"""
         key = self._generate_key(service_name, method_name, args)
+        self.memory_tier.delete(key)
         await self.mongo_connector.adelete_records(self.COLLECTION_NAME, {"key": key})
         LOG.info(f"Invalidated cache for {key}")
 
+    async def ainvalidate_matching(
+        self,
+        service_name: Optional[str] = None,
+        method_name: Optional[str] = None,
+        company_prefix: Optional[str] = None,
+    ) -> Dict[str, int]:
+        """
+        Invalidate every entry matching the given service, method and/or company name
+        prefix (matched like cache keys: case- and whitespace-insensitively).
+        Returns how many MongoDB and memory entries were removed.
+
+        Only this process' memory tier is cleared: other processes may serve their
+        copies for up to `memory_ttl_seconds`, which is returned too.
+        """
+        query: Dict[str, Any] = {}
+        if service_name:
+            query["service"] = service_name
+        if method_name:
+            query["method"] = method_name
+        if company_prefix:
+            company_prefix = normalize_company_name(company_prefix)
+            query["args.company_name"] = {"$regex": f"^{re.escape(company_prefix)}"}
+
+        def matches(entry: dict) -> bool:
+            company_name = (entry.get("args") or {}).get("company_name") or ""
+            return (
+                (not service_name or entry.get("service") == service_name)
+                and (not method_name or entry.get("method") == method_name)
+                and (not company_prefix or company_name.startswith(company_prefix))
+            )
+
+        memory_deleted = self.memory_tier.delete_where(matches)
+        collection = await self.mongo_connector.aget_collection(self.COLLECTION_NAME)
+        result = await collection.delete_many(query)
+        LOG.info(f"Invalidated {result.deleted_count} cache entries matching {query}")
+        return {
+            "deleted": result.deleted_count,
+            "memory_deleted": memory_deleted,
+            "memory_ttl_seconds": int(self.memory_tier.max_ttl.total_seconds()),
+        }
+
     async def aclear_all(self) -> None:
         """Async version of clear_all"""
+        self.memory_tier.clear()
         await self.mongo_connector.adelete_records(self.COLLECTION_NAME, {})
         LOG.info("Cleared all cache entries")
 
     async def aclear_expired(self) -> None:
         """Async version of clear_expired"""
+        self.memory_tier.clear_expired()
         now = datetime.utcnow()
         await self.mongo_connector.adelete_records(
             self.COLLECTION_NAME, {"expires_at": {"$lt": now}}
         )
         LOG.info("Cleared expired cache entries")
+
+    async def areport_expiry(self) -> Dict[str, Any]:
+        """
+        Drop expired entries from the memory tier and count the MongoDB entries that
+        are past `expires_at` but not yet removed by the TTL monitor (it runs about
+        once a minute). The latest report is included in `get_stats`.
+        """
+        now = datetime.utcnow()
+        collection = await self.mongo_connector.aget_collection(self.COLLECTION_NAME)
+        report = {
+            "checked_at": now,
+            "memory_expired": self.memory_tier.clear_expired(),
+            "mongo_expired": await collection.count_documents(
+                {"expires_at": {"$lte": now}}
+            ),
+            "mongo_entries": await collection.estimated_document_count(),
+        }
+        CacheService._last_expiry_report = report
+        return report
+
+    # Leases
+    async def aacquire_lease(self, key: str, owner: str, ttl: timedelta) -> bool:
+        """
+        Try to become the single process computing `key`. Returns False while
+        another owner holds an unexpired lease; an expired lease is taken over.
+        """
+        from pymongo.errors import DuplicateKeyError
+
+        now = datetime.utcnow()
+        collection = await self.mongo_connector.aget_collection(
+            self.LEASE_COLLECTION_NAME
+        )
+        try:
+            await collection.update_one(
+                {"key": key, "expires_at": {"$lte": now}},
+                {"$set": {"owner": owner, "expires_at": now + ttl}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return False
+
+        LOG.debug(f"Acquired cache lease for {key}")
+        return True
+
+    async def arelease_lease(self, key: str, owner: str) -> None:
+        """Release a lease held by `owner`"""
+        collection = await self.mongo_connector.aget_collection(
+            self.LEASE_COLLECTION_NAME
+        )
+        await collection.delete_one({"key": key, "owner": owner})
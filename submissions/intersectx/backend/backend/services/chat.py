@@ -2,7 +2,9 @@ from agno.agent import Agent, AgentMemory
 from agno.tools.mcp import MCPTools
 from backend.settings import LLMConfig, MongoConnectionDetails
 from backend.utils.llm import get_model
+from backend.utils.llm_usage import llm_usage_tags
 from backend.utils.logger import get_logger
+from backend.utils.time_utils import prompt_date
 from agno.storage.mongodb import MongoDbStorage
 from backend.database.mongo import MongoDBConnector
 from backend.models.requests.chat import SendMessageRequest
@@ -39,6 +41,7 @@ class ChatService:
         self.mcp_url = mcp_url
         self.history_runs = history_runs
         self.timeout = timeout
+        self.llm_model = get_model(llm_config)
 
         self.storage = MongoDbStorage(
             collection_name="chat_agent",
@@ -63,8 +66,9 @@ class ChatService:
 
     @staticmethod
     def system_instructions() -> str:
+        # The date goes last, so the instructions before it are a prompt prefix
+        # the provider can serve from its cache
         return dedent(f"""
-The current date is {datetime.now().isoformat()}.
 ## Purpose and Role
 
 You leverage search capabilities to find and deliver accurate information about companies, markets, and industry trends. Your goal is to provide users with relevant insights to support their business research and decision-making.
@@ -97,6 +101,8 @@ You leverage search capabilities to find and deliver accurate information about
 - Do not Include the Iframe url as in response
 
 Always prioritize delivering accurate, relevant information from Venture Insights' knowledge base in a way that's most helpful to the user's specific request.
+
+The current date is {prompt_date()}.
 """)
 
     async def _create_agent(
@@ -106,7 +112,7 @@ Always prioritize delivering accurate, relevant information from Venture Insight
             session_id=session_id,
             agent_id=session_id,
             user_id=user_id,
-            model=get_model(self.llm_config),
+            model=self.llm_model,
             tools=[mcp_tools],
             markdown=markdown,
             description=self.system_agent_prompt(),
@@ -133,7 +139,8 @@ Always prioritize delivering accurate, relevant information from Venture Insight
                 markdown=markdown,
                 mcp_tools=mcp_tools,
             )
-            return await agent.arun(user_message, stream=stream)
+            with llm_usage_tags(service="ChatService", method="process_query"):
+                return await agent.arun(user_message, stream=stream)
 
     async def run_interactive(
         self,
@@ -288,10 +295,11 @@ Always prioritize delivering accurate, relevant information from Venture Insight
                 agent = await self._create_agent(
                     user_id=message.user_id, session_id=thread_id, mcp_tools=mcp_tools
                 )
-                stream_resp = await agent.arun(message.content, stream=True)
-                async for chunk in stream_resp:
-                    text = getattr(chunk, "content", str(chunk))
-                    yield f"data: {json.dumps({'content': text})}\n\n"
+                with llm_usage_tags(service="ChatService", method="add_message"):
+                    stream_resp = await agent.arun(message.content, stream=True)
+                    async for chunk in stream_resp:
+                        text = getattr(chunk, "content", str(chunk))
+                        yield f"data: {json.dumps({'content': text})}\n\n"
                 yield "data: [DONE]\n\n"
 
         return StreamingResponse(
@@ -7,6 +7,7 @@ from backend.models.response.companies import (
 )
 from backend.utils.cache_decorator import cacheable
 from backend.database.mongo import MongoDBConnector
+from backend.services.research_store import ResearchStore
 from backend.models.response.research import (
     ResearchResponse,
 )
@@ -20,6 +21,7 @@ class CompaniesService:
     def __init__(self, mongo_config: MongoConnectionDetails):
         self.mongo_config = mongo_config
         self.mongo_db = MongoDBConnector(mongo_config)
+        self.research_store = ResearchStore(mongo_config)
         # cache_service will be injected by the dependency injection system
 
     async def get_company_analysis(self, company_name: str) -> ResearchResponse:
@@ -33,26 +35,22 @@ class CompaniesService:
             ResearchResponse: The research data for the company
         """
         try:
-            # Query MongoDB for the research data
-            collection_name = "company_info"
-            print(f">>> Querying collection: {collection_name}")
-
-            # Get the document from MongoDB
-            document = self.mongo_db.query(
-                collection_name, {"company_name": company_name}
-            )
+            # The company's research document (the latest one, should there be
+            # duplicates from before research was upserted)
+            document = await self.research_store.aget(company_name)
 
             if not document:
                 print(f">>> No research data found for {company_name}")
                 return ResearchResponse(company_name=company_name)
-            document = document[0]
-            # Convert MongoDB document to ResearchResponse
             print(f">>> Found research data for {company_name}")
-            print(document)
 
             # Create the research response from the document
-            # discard the _id field
-            document = {k: v for k, v in document.items() if k != "_id"}
+            # discard the _id field and the freshness metadata
+            document = {
+                k: v
+                for k, v in document.items()
+                if k not in ("_id", "research_meta", "research_updated_at")
+            }
             research_response = ResearchResponse(**document)
 
             return research_response
@@ -1,14 +1,15 @@
-from datetime import datetime
 from typing import Optional, List, Type, Union
 from backend.utils.cache_decorator import cacheable
 
-from agno.agent import Agent
 from pydantic import BaseModel
 
 from backend.agents.netlify import NetlifyAgent
+from backend.agents.agent_pool import AgentPool
 from backend.agents.output_parser import LLMOutputParserAgent
 from backend.plot.factory import get_builder
 from backend.settings import SonarConfig, LLMConfig
+from backend.utils.output_parsing import with_output_instruction
+from backend.utils.time_utils import prompt_date
 from backend.utils.llm import get_model, get_sonar_model
 from backend.models.response.customer_sentiment import (
     SentimentSummaryResponse,
@@ -36,7 +37,8 @@ class CustomerSentimentService:
     async def _execute_llm_analysis(
         self,
         company_name: str,
-        prompt: str,
+        instructions: str,
+        request: str,
         response_model: Type[BaseModel],
         agent_name: str = "AnalysisAgent",
         use_knowledge_base: bool = False,
@@ -50,28 +52,34 @@ class CustomerSentimentService:
         Common method to execute LLM analysis and parse the response.
 
         Args:
-            prompt: The prompt to send to the LLM
+            instructions: The agent's instructions, the same for every call
+            request: The date and parameters of this call
             response_model: The Pydantic model to parse the response into
             agent_name: Name of the agent for logging/identification
 
         Returns:
             Parsed response model instance with citations if available
         """
-        analysis_agent = Agent(
-            name=agent_name,
-            model=self.sonar_model,
-            instructions=prompt,
-        )
-
-        if use_knowledge_base:
-            analysis_agent.knowledge = self.knowledge_base
-            analysis_agent.knowledge_filters = {"company_name": company_name}
-
-        # Use the LLM to generate the content
-        content = analysis_agent.run(prompt)
+        with AgentPool.lease(
+            self.sonar_model,
+            agent_name,
+            instructions=with_output_instruction(
+                instructions, self.sonar_config.structured_output
+            ),
+            # In single-pass mode Sonar answers in the response model's JSON schema
+            response_model=response_model
+            if self.sonar_config.structured_output
+            else None,
+            knowledge=self.knowledge_base if use_knowledge_base else None,
+            knowledge_filters={"company_name": company_name}
+            if use_knowledge_base
+            else None,
+        ) as analysis_agent:
+            # Use the LLM to generate the content
+            content = await analysis_agent.arun(request)
 
         # Parse the LLM output into the response model
-        response = self.llm_output_parser.parse(content.content, response_model)
+        response = await self.llm_output_parser.aparse(content.content, response_model)
 
         # Add citations to the response if available
         if hasattr(response, "citations") and hasattr(content, "citations"):
@@ -114,15 +122,8 @@ class CustomerSentimentService:
         Returns:
             SentimentSummaryResponse: Contains sentiment score, breakdown, timeseries, summary, and sources
         """
-        prompt = f"""
-        The current date is {datetime.now().isoformat()}.
-        You are a customer sentiment analyst. Generate a detailed sentiment summary for the following company:
-        - Company Name: {company_name}
-        - Domain: {domain or "N/A"}
-        - Product: {product or "N/A"}
-        - Region: {region or "Global"}
-        - Start Date: {start_date or "N/A"}
-        - End Date: {end_date or "N/A"}
+        instructions = """
+        You are a customer sentiment analyst. Generate a detailed sentiment summary for the company described in the request.
         
         Please provide the following fields in your response:
         - company_name: The name of the company
@@ -148,13 +149,22 @@ class CustomerSentimentService:
         - citations: (This will be automatically populated, do not include in your response)
         
         Be as realistic and detailed as possible. Use plausible numbers and sources.
-        IMPORTANT: All dates and timestamps must be in ISO format strings (e.g., "2023-01-01" for dates, "{datetime.now().isoformat()}" for datetimes).
-        Output should be a detailed textual description of all these fields and their values.
+        IMPORTANT: All dates and timestamps must be in ISO format strings (e.g., "2023-01-01" for dates, "2023-01-01T00:00:00" for datetimes).
+        """
+        request = f"""
+        The current date is {prompt_date()}.
+        - Company Name: {company_name}
+        - Domain: {domain or "N/A"}
+        - Product: {product or "N/A"}
+        - Region: {region or "Global"}
+        - Start Date: {start_date or "N/A"}
+        - End Date: {end_date or "N/A"}
         """
 
         return await self._execute_llm_analysis(
             company_name=company_name,
-            prompt=prompt,
+            instructions=instructions,
+            request=request,
             response_model=SentimentSummaryResponse,
             agent_name="SentimentSummaryAgent",
             use_knowledge_base=use_knowledge_base,
@@ -185,15 +195,8 @@ class CustomerSentimentService:
         Returns:
             CustomerFeedbackResponse: Contains feedback items, summary, and sources
         """
-        prompt = f"""
-        The current date is {datetime.now().isoformat()}.
-        You are a customer feedback analyst. Generate detailed customer feedback for the following company:
-        - Company Name: {company_name}
-        - Domain: {domain or "N/A"}
-        - Product: {product or "N/A"}
-        - Region: {region or "Global"}
-        - Start Date: {start_date or "N/A"}
-        - End Date: {end_date or "N/A"}
+        instructions = """
+        You are a customer feedback analyst. Generate detailed customer feedback for the company described in the request.
         
         Please provide the following fields in your response:
         - company_name: The name of the company
@@ -213,13 +216,22 @@ class CustomerSentimentService:
         
         Include at least 5 diverse and realistic feedback items from different sources.
         Be as realistic and detailed as possible. Use plausible customer names, feedback text, and sources.
-        IMPORTANT: All dates and timestamps must be in ISO format strings (e.g., "2023-01-01" for dates, "{datetime.now().isoformat()}" for datetimes).
-        Output should be a detailed textual description of all these fields and their values.
+        IMPORTANT: All dates and timestamps must be in ISO format strings (e.g., "2023-01-01" for dates, "2023-01-01T00:00:00" for datetimes).
+        """
+        request = f"""
+        The current date is {prompt_date()}.
+        - Company Name: {company_name}
+        - Domain: {domain or "N/A"}
+        - Product: {product or "N/A"}
+        - Region: {region or "Global"}
+        - Start Date: {start_date or "N/A"}
+        - End Date: {end_date or "N/A"}
         """
 
         return await self._execute_llm_analysis(
             company_name=company_name,
-            prompt=prompt,
+            instructions=instructions,
+            request=request,
             response_model=CustomerFeedbackResponse,
             agent_name="CustomerFeedbackAgent",
             use_knowledge_base=use_knowledge_base,
@@ -248,14 +260,8 @@ class CustomerSentimentService:
         Returns:
             BrandReputationResponse: Contains reputation score, timeseries, summary, and sources
         """
-        prompt = f"""
-        The current date is {datetime.now().isoformat()}.
-        You are a brand reputation analyst. Generate detailed brand reputation data for the following company:
-        - Company Name: {company_name}
-        - Domain: {domain or "N/A"}
-        - Region: {region or "Global"}
-        - Start Date: {start_date or "N/A"}
-        - End Date: {end_date or "N/A"}
+        instructions = """
+        You are a brand reputation analyst. Generate detailed brand reputation data for the company described in the request.
         
         Please provide the following fields in your response:
         - company_name: The name of the company
@@ -273,13 +279,21 @@ class CustomerSentimentService:
         - citations: (This will be automatically populated, do not include in your response)
         
         Be as realistic and detailed as possible. Use plausible numbers and sources.
-        IMPORTANT: All dates and timestamps must be in ISO format strings (e.g., "2023-01-01" for dates, "{datetime.now().isoformat()}" for datetimes).
-        Output should be a detailed textual description of all these fields and their values.
+        IMPORTANT: All dates and timestamps must be in ISO format strings (e.g., "2023-01-01" for dates, "2023-01-01T00:00:00" for datetimes).
+        """
+        request = f"""
+        The current date is {prompt_date()}.
+        - Company Name: {company_name}
+        - Domain: {domain or "N/A"}
+        - Region: {region or "Global"}
+        - Start Date: {start_date or "N/A"}
+        - End Date: {end_date or "N/A"}
         """
 
         return await self._execute_llm_analysis(
             company_name=company_name,
-            prompt=prompt,
+            instructions=instructions,
+            request=request,
             response_model=BrandReputationResponse,
             agent_name="BrandReputationAgent",
             use_knowledge_base=use_knowledge_base,
@@ -315,16 +329,8 @@ class CustomerSentimentService:
         # Format the competitors list for the prompt
         competitors_str = ", ".join(competitors)
 
-        prompt = f"""
-        The current date is {datetime.now().isoformat()}.
-        You are a competitive sentiment analyst. Generate a detailed sentiment comparison for the following:
-        - Target Company: {company_name}
-        - Competitors: {competitors_str}
-        - Domain: {domain or "N/A"}
-        - Product: {product or "N/A"}
-        - Region: {region or "Global"}
-        - Start Date: {start_date or "N/A"}
-        - End Date: {end_date or "N/A"}
+        instructions = """
+        You are a competitive sentiment analyst. Generate a detailed sentiment comparison for the companies described in the request.
         
         Please provide the following fields in your response:
         - company_name: The name of the target company
@@ -352,13 +358,23 @@ class CustomerSentimentService:
         that would realistically apply to that company and industry. Ensure the sentiment scores have reasonable 
         variation between companies and make logical sense compared to the strengths/weaknesses listed.
         
-        IMPORTANT: All dates and timestamps must be in ISO format strings (e.g., "{datetime.now().isoformat()}").
-        Output should be a detailed textual description of all these fields and their values.
+        IMPORTANT: All dates and timestamps must be in ISO format strings (e.g., "2023-01-01T00:00:00").
+        """
+        request = f"""
+        The current date is {prompt_date()}.
+        - Target Company: {company_name}
+        - Competitors: {competitors_str}
+        - Domain: {domain or "N/A"}
+        - Product: {product or "N/A"}
+        - Region: {region or "Global"}
+        - Start Date: {start_date or "N/A"}
+        - End Date: {end_date or "N/A"}
         """
 
         return await self._execute_llm_analysis(
             company_name=company_name,
-            prompt=prompt,
+            instructions=instructions,
+            request=request,
             response_model=SentimentComparisonResponse,
             agent_name="SentimentComparisonAgent",
             use_knowledge_base=use_knowledge_base,
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Dict, Any
 import os
 from backend.models.base.exceptions import NotFoundException
@@ -30,7 +31,10 @@ class FilesService:
         with open(temp_path, "wb") as f:
             f.write(await file.read())
         cloud_url = self.doc_engine.upload_to_cloudinary(temp_path)
-        documents = self.doc_engine.extract_text(temp_path, file.filename, company_name)
+        # Text extraction makes sync LLM calls, which must not block the loop
+        documents = await asyncio.to_thread(
+            self.doc_engine.extract_text, temp_path, file.filename, company_name
+        )
         await self.vector_store.add_documents(documents, company_name)
         os.remove(temp_path)
         # Add the public URL to the company_docs collection
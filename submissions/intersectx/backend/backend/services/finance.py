@@ -1,11 +1,13 @@
-from datetime import datetime, date
+from datetime import date, timedelta
 from typing import Optional, Type, Union
 
-from agno.agent import Agent
 from pydantic import BaseModel
 
+from backend.agents.agent_pool import AgentPool
 from backend.agents.output_parser import LLMOutputParserAgent
 from backend.settings import SonarConfig, LLMConfig
+from backend.utils.output_parsing import with_output_instruction
+from backend.utils.time_utils import prompt_date
 from backend.utils.llm import get_model, get_sonar_model
 from backend.utils.cache_decorator import cacheable
 from backend.models.response.finance import (
@@ -40,7 +42,8 @@ class FinanceService:
     async def _execute_llm_analysis(
         self,
         company_name: str,
-        prompt: str,
+        instructions: str,
+        request: str,
         response_model: Type[BaseModel],
         agent_name: str = "AnalysisAgent",
         use_knowledge_base: bool = False,
@@ -55,28 +58,34 @@ class FinanceService:
         Common method to execute LLM analysis and parse the response.
 
         Args:
-            prompt: The prompt to send to the LLM
+            instructions: The agent's instructions, the same for every call
+            request: The date and parameters of this call
             response_model: The Pydantic model to parse the response into
             agent_name: Name of the agent for logging/identification
 
         Returns:
             Parsed response model instance with citations if available
         """
-        analysis_agent = Agent(
-            name=agent_name,
-            model=self.sonar_model,
-            instructions=prompt,
-        )
-
-        if use_knowledge_base:
-            analysis_agent.knowledge = self.knowledge_base
-            analysis_agent.knowledge_filters = {"company_name": company_name}
-
-        # Use the LLM to generate the content
-        content = analysis_agent.run(prompt)
+        with AgentPool.lease(
+            self.sonar_model,
+            agent_name,
+            instructions=with_output_instruction(
+                instructions, self.sonar_config.structured_output
+            ),
+            # In single-pass mode Sonar answers in the response model's JSON schema
+            response_model=response_model
+            if self.sonar_config.structured_output
+            else None,
+            knowledge=self.knowledge_base if use_knowledge_base else None,
+            knowledge_filters={"company_name": company_name}
+            if use_knowledge_base
+            else None,
+        ) as analysis_agent:
+            # Use the LLM to generate the content
+            content = await analysis_agent.arun(request)
 
         # Parse the LLM output into the response model
-        response = self.llm_output_parser.parse(content.content, response_model)
+        response = await self.llm_output_parser.aparse(content.content, response_model)
 
         # Attach citations if response is a Pydantic model and has citations
         if hasattr(response, "citations") and hasattr(content, "citations"):
@@ -96,7 +105,7 @@ class FinanceService:
 
         return response
 
-    @cacheable()
+    @cacheable(stale_ttl=timedelta(days=7))
     async def get_revenue_analysis(
         self,
         company_name: str,
@@ -120,14 +129,8 @@ class FinanceService:
         """
 
         # Compose a detailed prompt for the LLM to generate all required fields
-        prompt = f"""
-        The current date is {datetime.now().isoformat()}. 
-        You are a financial analyst. Generate a detailed revenue analysis for the following company:
-        - Company Name: {company_name}
-        - Domain: {domain or "N/A"}
-        - Start Date: {start_date or "N/A"}
-        - End Date: {end_date or "N/A"}
-        - Granularity: {granularity}
+        instructions = """
+        You are a financial analyst. Generate a detailed revenue analysis for the company described in the request.
 
         Please provide the following fields in your response:
         - company_name: The name of the company
@@ -137,18 +140,26 @@ class FinanceService:
         - last_updated: The datetime of the latest data (ISO format)
 
         Be as realistic and detailed as possible. Use plausible numbers and sources. 
-        Output should be a detailed textual description of all these fields and their values.
+        """
+        request = f"""
+        The current date is {prompt_date()}.
+        - Company Name: {company_name}
+        - Domain: {domain or "N/A"}
+        - Start Date: {start_date or "N/A"}
+        - End Date: {end_date or "N/A"}
+        - Granularity: {granularity}
         """
 
         return await self._execute_llm_analysis(
             company_name=company_name,
-            prompt=prompt,
+            instructions=instructions,
+            request=request,
             response_model=RevenueAnalysisResponse,
             agent_name="RevenueAgent",
             use_knowledge_base=use_knowledge_base,
         )
 
-    @cacheable()
+    @cacheable(stale_ttl=timedelta(days=7))
     async def get_expense_analysis(
         self,
         company_name: str,
@@ -169,13 +180,8 @@ class FinanceService:
             total expense, and last updated timestamp.
         """
 
-        prompt = f"""
-        The current date is {datetime.now().isoformat()}. 
-        You are a financial analyst. Generate a detailed expense analysis for the following company:
-        - Company Name: {company_name}
-        - Domain: {domain or "N/A"}
-        - Year: {year or "N/A"}
-        - Category: {category or "N/A"}
+        instructions = """
+        You are a financial analyst. Generate a detailed expense analysis for the company described in the request.
 
         Please provide the following fields in your response:
         - company_name: The name of the company
@@ -184,18 +190,25 @@ class FinanceService:
         - last_updated: The datetime of the latest data (ISO format)
 
         Be as realistic and detailed as possible. Use plausible numbers and sources. 
-        Output should be a detailed textual description of all these fields and their values.
+        """
+        request = f"""
+        The current date is {prompt_date()}.
+        - Company Name: {company_name}
+        - Domain: {domain or "N/A"}
+        - Year: {year or "N/A"}
+        - Category: {category or "N/A"}
         """
 
         return await self._execute_llm_analysis(
             company_name=company_name,
-            prompt=prompt,
+            instructions=instructions,
+            request=request,
             response_model=ExpenseAnalysisResponse,
             agent_name="ExpenseAgent",
             use_knowledge_base=use_knowledge_base,
         )
 
-    @cacheable()
+    @cacheable(stale_ttl=timedelta(days=7))
     async def get_profit_margins(
         self,
         company_name: str,
@@ -212,12 +225,8 @@ class FinanceService:
         Returns:
             dict: Contains company name, year, gross/operating/net margins, margin timeseries, currency, sources, and last updated timestamp.
         """
-        prompt = f"""
-        The current date is {datetime.now().isoformat()}. 
-        You are a financial analyst. Generate a detailed expense analysis for the following company:
-        - Company Name: {company_name}
-        - Domain: {domain or "N/A"}
-        - Year: {year or "N/A"}
+        instructions = """
+        You are a financial analyst. Generate a detailed expense analysis for the company described in the request.
 
         Please provide the following fields in your response:
         - company_name: The name of the company
@@ -225,18 +234,24 @@ class FinanceService:
         - last_updated: The datetime of the latest data (ISO format)
 
         Be as realistic and detailed as possible. Use plausible numbers and sources. 
-        Output should be a detailed textual description of all these fields and their values.
+        """
+        request = f"""
+        The current date is {prompt_date()}.
+        - Company Name: {company_name}
+        - Domain: {domain or "N/A"}
+        - Year: {year or "N/A"}
         """
 
         return await self._execute_llm_analysis(
             company_name=company_name,
-            prompt=prompt,
+            instructions=instructions,
+            request=request,
             response_model=ProfitMarginsResponse,
             agent_name="ProfitMarginsAgent",
             use_knowledge_base=use_knowledge_base,
         )
 
-    @cacheable()
+    @cacheable(stale_ttl=timedelta(days=7))
     async def get_valuation_estimation(
         self,
         company_name: str,
@@ -253,12 +268,8 @@ class FinanceService:
         Returns:
             ValuationEstimationResponse: Contains company name, last valuation, valuation timeseries, and last updated timestamp.
         """
-        prompt = f"""
-        The current date is {datetime.now().isoformat()}. 
-        You are a financial analyst. Generate a detailed valuation estimation for the following company:
-        - Company Name: {company_name}
-        - Domain: {domain or "N/A"}
-        - As of Date: {as_of_date or "N/A"}
+        instructions = """
+        You are a financial analyst. Generate a detailed valuation estimation for the company described in the request.
 
         Please provide the following fields in your response:
         - company_name: The name of the company
@@ -267,18 +278,24 @@ class FinanceService:
         - last_updated: The datetime of the latest data (ISO format)
 
         Be as realistic and detailed as possible. Use plausible numbers and sources. 
-        Output should be a detailed textual description of all these fields and their values.
+        """
+        request = f"""
+        The current date is {prompt_date()}.
+        - Company Name: {company_name}
+        - Domain: {domain or "N/A"}
+        - As of Date: {as_of_date or "N/A"}
         """
 
         return await self._execute_llm_analysis(
             company_name=company_name,
-            prompt=prompt,
+            instructions=instructions,
+            request=request,
             response_model=ValuationEstimationResponse,
             agent_name="ValuationEstimationAgent",
             use_knowledge_base=use_knowledge_base,
         )
 
-    @cacheable()
+    @cacheable(stale_ttl=timedelta(days=7))
     async def get_funding_history(
         self,
         company_name: str,
@@ -293,11 +310,8 @@ class FinanceService:
         Returns:
             FundingHistoryResponse: Contains company name, funding rounds, total funding, and last updated timestamp.
         """
-        prompt = f"""
-        The current date is {datetime.now().isoformat()}. 
-        You are a financial analyst. Generate a detailed funding history for the following company:
-        - Company Name: {company_name}
-        - Domain: {domain or "N/A"}
+        instructions = """
+        You are a financial analyst. Generate a detailed funding history for the company described in the request.
 
         Please provide the following fields in your response:
         - company_name: The name of the company
@@ -306,12 +320,17 @@ class FinanceService:
         - last_updated: The datetime of the latest data (ISO format)
 
         Be as realistic and detailed as possible. Use plausible numbers and sources. 
-        Output should be a detailed textual description of all these fields and their values.
+        """
+        request = f"""
+        The current date is {prompt_date()}.
+        - Company Name: {company_name}
+        - Domain: {domain or "N/A"}
         """
 
         return await self._execute_llm_analysis(
             company_name=company_name,
-            prompt=prompt,
+            instructions=instructions,
+            request=request,
             response_model=FundingHistoryResponse,
             agent_name="FundingHistoryAgent",
             use_knowledge_base=use_knowledge_base,
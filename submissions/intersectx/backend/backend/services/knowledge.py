@@ -1,7 +1,14 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from backend.database.mongo import MongoDBConnector
 from backend.settings import VectorStoreConfig, MongoConnectionDetails
 from agno.vectordb.mongodb import MongoDb
 from agno.knowledge import AgentKnowledge
 from backend.utils.llm import get_embedding_model
+from backend.utils.logger import get_logger
+
+LOG = get_logger("KnowledgeBaseService")
 
 
 class KnowledgeBaseService:
@@ -13,6 +20,8 @@ class KnowledgeBaseService:
         self.db_config = db_config
         self.vector_store_config = vector_store_config
         self.embedder = get_embedding_model(vector_store_config)
+        # The embedder builds a new client on every call unless one is set
+        self.embedder.openai_client = self.embedder.client
         self.vector_db = MongoDb(
             collection_name=vector_store_config.mongo_collection,
             embedder=self.embedder,
@@ -21,6 +30,69 @@ class KnowledgeBaseService:
             wait_until_index_ready=60,
             wait_after_insert=300,
         )
+        self.mongo_connector = MongoDBConnector(db_config)
 
     def get_knowledge_base(self):
         return AgentKnowledge(vector_db=self.vector_db)
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        """Embed several texts with a single embeddings request"""
+        response = await asyncio.to_thread(
+            self.embedder.client.embeddings.create,
+            input=texts,
+            model=self.embedder.id,
+            encoding_format="float",
+        )
+        return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+    def _vector_search_pipeline(
+        self,
+        embedding: List[float],
+        limit: int,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> list:
+        # The same pipeline the agno vector db runs for an agent's knowledge search
+        pipeline: list = [
+            {
+                "$vectorSearch": {
+                    "index": self.vector_db.search_index_name,
+                    "limit": limit,
+                    "numCandidates": min(limit * 4, 100),
+                    "queryVector": embedding,
+                    "path": "embedding",
+                }
+            },
+            {"$set": {"score": {"$meta": "vectorSearchScore"}}},
+        ]
+        if filters:
+            pipeline.append(
+                {
+                    "$match": {
+                        f"meta_data.{key}": value for key, value in filters.items()
+                    }
+                }
+            )
+        pipeline.append({"$project": {"embedding": 0}})
+        return pipeline
+
+    async def asearch_many(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[List[dict]]:
+        """
+        Vector search for several queries at once: the queries are embedded in one
+        request and the searches run concurrently. Returns the matching chunks
+        (without their embeddings) per query, best first.
+        """
+        embeddings = await self.aembed(queries)
+        return await asyncio.gather(
+            *(
+                self.mongo_connector.aaggregate(
+                    self.vector_store_config.mongo_collection,
+                    self._vector_search_pipeline(embedding, limit, filters),
+                )
+                for embedding in embeddings
+            )
+        )
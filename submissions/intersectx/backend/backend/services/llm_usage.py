@@ -0,0 +1,137 @@
+import asyncio
+from datetime import datetime
+from typing import List
+
+from backend.database.mongo import MongoDBConnector, MongoIndexSpec
+from backend.models.response.llm_usage import LLMUsageResponse, LLMUsageRow
+from backend.settings import LLMUsageConfig, MongoConnectionDetails
+from backend.utils.llm_usage import USAGE_TAGS, LLMUsageMeter
+from backend.utils.logger import get_logger
+
+LOG = get_logger("LLMUsageService")
+
+COUNTERS = (
+    "calls",
+    "prompt_tokens",
+    "completion_tokens",
+    "cached_tokens",
+    "cost",
+    "latency_seconds",
+)
+GROUP_FIELDS = ("provider", "model") + USAGE_TAGS
+
+
+class LLMUsageService:
+    """
+    Stores the LLM usage counted by the `LLMUsageMeter` in `llm_usage`: one
+    document per hour, provider, model and usage tags (service, method, section,
+    company, user), whose counters every flush increments. Documents expire
+    after `LLM_USAGE__RETENTION_DAYS`.
+    """
+
+    COLLECTION_NAME = "llm_usage"
+
+    _indexes_ready: bool = False
+
+    def __init__(self, mongo_config: MongoConnectionDetails, config: LLMUsageConfig):
+        self.mongo_connector = MongoDBConnector(mongo_config)
+        self.config = config
+        LLMUsageMeter.set_prices(config.prices)
+        self._setup_indexes()
+
+    def _setup_indexes(self):
+        if LLMUsageService._indexes_ready:
+            return
+        try:
+            self.mongo_connector.create_indexes(
+                self.COLLECTION_NAME,
+                [
+                    MongoIndexSpec(
+                        keys=[("hour", 1)] + [(field, 1) for field in GROUP_FIELDS],
+                        name="usage_key_index",
+                        unique=True,
+                    ),
+                    MongoIndexSpec(
+                        keys=[("hour", 1)],
+                        name="retention_index",
+                        expire_after_seconds=self.config.retention_days * 24 * 3600,
+                    ),
+                ],
+            )
+            LLMUsageService._indexes_ready = True
+        except Exception as e:
+            LOG.error(f"Failed to create LLM usage indexes: {e}")
+
+    async def aflush(self) -> int:
+        """Write the pending counters; returns how many usage documents were updated"""
+        drained = LLMUsageMeter.drain()
+        for i, (fields, counters) in enumerate(drained):
+            try:
+                await self.mongo_connector.aupdate_one(
+                    self.COLLECTION_NAME,
+                    fields,
+                    {"$inc": counters, "$currentDate": {"updated_at": True}},
+                    upsert=True,
+                )
+            except Exception as e:
+                LOG.error(f"Failed to store LLM usage, retrying next flush: {e}")
+                LLMUsageMeter.restore(drained[i:])
+                return i
+        return len(drained)
+
+    async def arun_flusher(self) -> None:
+        """Flush the counters every `LLM_USAGE__FLUSH_INTERVAL_SECONDS`, until cancelled"""
+        while True:
+            await asyncio.sleep(self.config.flush_interval_seconds)
+            try:
+                await self.aflush()
+            except Exception as e:
+                LOG.error(f"Error during LLM usage flush: {e}")
+
+    @staticmethod
+    def _row(group: dict, totals: dict) -> LLMUsageRow:
+        calls = int(totals.get("calls", 0))
+        prompt_tokens = int(totals.get("prompt_tokens", 0))
+        cached_tokens = int(totals.get("cached_tokens", 0))
+        return LLMUsageRow(
+            group={k: str(v) for k, v in group.items()},
+            calls=calls,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=int(totals.get("completion_tokens", 0)),
+            cached_tokens=cached_tokens,
+            cached_prompt_ratio=round(cached_tokens / prompt_tokens, 3)
+            if prompt_tokens
+            else 0.0,
+            cost_usd=round(totals.get("cost", 0.0), 6),
+            avg_latency_seconds=round(totals.get("latency_seconds", 0.0) / calls, 3)
+            if calls
+            else 0.0,
+        )
+
+    async def aget_usage(
+        self, since: datetime, group_by: List[str], limit: int = 50
+    ) -> LLMUsageResponse:
+        """The usage since `since`, grouped by `group_by`, costliest groups first"""
+        # Include what this process counted since its last flush
+        await self.aflush()
+        sums = {name: {"$sum": f"${name}"} for name in COUNTERS}
+        rows = await self.mongo_connector.aaggregate(
+            self.COLLECTION_NAME,
+            [
+                {"$match": {"hour": {"$gte": since}}},
+                {
+                    "$group": {
+                        "_id": {field: f"${field}" for field in group_by},
+                        **sums,
+                    }
+                },
+                {"$sort": {"cost": -1, "prompt_tokens": -1}},
+            ],
+        )
+        total = {name: sum(row.get(name, 0) for row in rows) for name in COUNTERS}
+        return LLMUsageResponse(
+            since=since,
+            group_by=group_by,
+            rows=[self._row(row["_id"], row) for row in rows[:limit]],
+            total=self._row({}, total),
+        )
@@ -1,7 +1,10 @@
-from datetime import datetime
+from datetime import timedelta
 from typing import Optional
 from backend.settings import LLMConfig, SonarConfig
+from backend.utils.output_parsing import with_output_instruction
+from backend.utils.time_utils import prompt_date
 from backend.utils.llm import get_model, get_sonar_model
+from backend.agents.agent_pool import AgentPool
 from backend.agents.output_parser import LLMOutputParserAgent
 from backend.models.response.market_analysis import (
     MarketTrendsResponse,
@@ -9,7 +12,6 @@ from backend.models.response.market_analysis import (
     GrowthProjectionsResponse,
     RegionalTrendsResponse,
 )
-from agno.agent import Agent
 from pydantic import BaseModel
 from typing import Type, Union
 from backend.plot.factory import get_builder
@@ -29,7 +31,8 @@ class MarketAnalysisService:
     async def _execute_llm_analysis(
         self,
         company_name: str,
-        prompt: str,
+        instructions: str,
+        request: str,
         response_model: Type[BaseModel],
         agent_name: str = "AnalysisAgent",
         use_knowledge_base: bool = False,
@@ -43,28 +46,34 @@ class MarketAnalysisService:
         Common method to execute LLM analysis and parse the response.
 
         Args:
-            prompt: The prompt to send to the LLM
+            instructions: The agent's instructions, the same for every call
+            request: The date and parameters of this call
             response_model: The Pydantic model to parse the response into
             agent_name: Name of the agent for logging/identification
 
         Returns:
             Parsed response model instance with citations if available
         """
-        analysis_agent = Agent(
-            name=agent_name,
-            model=self.sonar_model,
-            instructions=prompt,
-        )
-
-        if use_knowledge_base:
-            analysis_agent.knowledge = self.knowledge_base
-            analysis_agent.knowledge_filters = {"company_name": company_name}
-
-        # Use the LLM to generate the content
-        content = analysis_agent.run(prompt)
+        with AgentPool.lease(
+            self.sonar_model,
+            agent_name,
+            instructions=with_output_instruction(
+                instructions, self.sonar_config.structured_output
+            ),
+            # In single-pass mode Sonar answers in the response model's JSON schema
+            response_model=response_model
+            if self.sonar_config.structured_output
+            else None,
+            knowledge=self.knowledge_base if use_knowledge_base else None,
+            knowledge_filters={"company_name": company_name}
+            if use_knowledge_base
+            else None,
+        ) as analysis_agent:
+            # Use the LLM to generate the content
+            content = await analysis_agent.arun(request)
 
         # Parse the LLM output into the response model
-        response = self.llm_output_parser.parse(content.content, response_model)
+        response = await self.llm_output_parser.aparse(content.content, response_model)
 
         # Attach citations if response is a Pydantic model and has citations
         if hasattr(response, "citations") and hasattr(content, "citations"):
@@ -81,7 +90,7 @@ class MarketAnalysisService:
 
         return response
 
-    @cacheable()
+    @cacheable(stale_ttl=timedelta(days=7))
     async def get_market_trends(
         self,
         company_name: str,
@@ -103,14 +112,8 @@ class MarketAnalysisService:
             MarketTrendsResponse: Contains industry, market size, market trend summary, and last updated timestamp.
         """
 
-        prompt = f"""
-        The current date is {datetime.now().isoformat()}. 
-        You are a financial analyst with access to reputable market research sources. Generate a detailed market size trends analysis for the following company:
-        - Company Name: {company_name}
-        - Industry: {industry or "N/A"}
-        - Region: {region or "N/A"}
-        - Start Date: {start_date or "N/A"}
-        - End Date: {end_date or "N/A"}
+        instructions = """
+        You are a financial analyst with access to reputable market research sources. Generate a detailed market size trends analysis for the company described in the request.
 
         Please provide the following fields in your response:
         - market_size: A list of objects, each with industry , percentage. the different objects represent different industries and their market sizes. (as Pie Chart Data)
@@ -118,17 +121,25 @@ class MarketAnalysisService:
         - last_updated: The datetime of the latest data (ISO format)
 
         Be as realistic and detailed as possible. Use plausible numbers and sources. 
-        Output should be a detailed textual description of all these fields and their values.
+        """
+        request = f"""
+        The current date is {prompt_date()}.
+        - Company Name: {company_name}
+        - Industry: {industry or "N/A"}
+        - Region: {region or "N/A"}
+        - Start Date: {start_date or "N/A"}
+        - End Date: {end_date or "N/A"}
         """
         return await self._execute_llm_analysis(
             company_name=company_name,
-            prompt=prompt,
+            instructions=instructions,
+            request=request,
             response_model=MarketTrendsResponse,
             agent_name="MarketTrendsAgent",
             use_knowledge_base=use_knowledge_base,
         )
 
-    @cacheable()
+    @cacheable(stale_ttl=timedelta(days=7))
     async def get_competitive_analysis(
         self,
         company_name: str,
@@ -138,14 +149,8 @@ class MarketAnalysisService:
         companies_to_compare: Optional[list[str]] = None,
         use_knowledge_base: bool = False,
     ):
-        prompt = f"""
-        The current date is {datetime.now().isoformat()}. 
-        You are a financial analyst with access to reputable market research sources. Generate a detailed competitive analysis for the following company:
-        - Company Name: {company_name}
-        - Domain: {domain or "N/A"}
-        - Industry: {industry or "N/A"}
-        - Region: {region or "N/A"}
-        - Companies to Compare: {companies_to_compare or "N/A"}
+        instructions = """
+        You are a financial analyst with access to reputable market research sources. Generate a detailed competitive analysis for the company described in the request.
 
         Please provide the following fields in your response:
         - top_competitors: A list of objects, each with company_name, industry, market_share, revenue, growth_rate, strengths, weaknesses, differentiating_factors, sources, and confidence
@@ -153,17 +158,25 @@ class MarketAnalysisService:
         - last_updated: The datetime of the latest data (ISO format)
         
         Be as realistic and detailed as possible. Use plausible numbers and sources. 
-        Output should be a detailed textual description of all these fields and their values.
+        """
+        request = f"""
+        The current date is {prompt_date()}.
+        - Company Name: {company_name}
+        - Domain: {domain or "N/A"}
+        - Industry: {industry or "N/A"}
+        - Region: {region or "N/A"}
+        - Companies to Compare: {companies_to_compare or "N/A"}
         """
         return await self._execute_llm_analysis(
             company_name=company_name,
-            prompt=prompt,
+            instructions=instructions,
+            request=request,
             response_model=CompetitiveAnalysisResponse,
             agent_name="CompetitiveAnalysisAgent",
             use_knowledge_base=use_knowledge_base,
         )
 
-    @cacheable()
+    @cacheable(stale_ttl=timedelta(days=7))
     async def get_growth_projections(
         self,
         company_name: str,
@@ -173,14 +186,8 @@ class MarketAnalysisService:
         end_date: Optional[str] = None,
         use_knowledge_base: bool = False,
     ):
-        prompt = f"""
-        The current date is {datetime.now().isoformat()}. 
-        You are a financial analyst with access to reputable market research sources. Generate a detailed growth projections analysis for the following company:
-        - Company Name: {company_name}
-        - Industry: {industry or "N/A"}
-        - Region: {region or "N/A"}
-        - Start Date: {start_date or "N/A"}
-        - End Date: {end_date or "N/A"}
+        instructions = """
+        You are a financial analyst with access to reputable market research sources. Generate a detailed growth projections analysis for the company described in the request.
 
         Please provide the following fields in your response:
         - projections_timeseries: A list of objects, each with period_start, period_end, projected_value, metric, sources, and confidence
@@ -188,17 +195,25 @@ class MarketAnalysisService:
         - last_updated: The datetime of the latest data (ISO format)
         
         Be as realistic and detailed as possible. Use plausible numbers and sources. 
-        Output should be a detailed textual description of all these fields and their values.
+        """
+        request = f"""
+        The current date is {prompt_date()}.
+        - Company Name: {company_name}
+        - Industry: {industry or "N/A"}
+        - Region: {region or "N/A"}
+        - Start Date: {start_date or "N/A"}
+        - End Date: {end_date or "N/A"}
         """
         return await self._execute_llm_analysis(
             company_name=company_name,
-            prompt=prompt,
+            instructions=instructions,
+            request=request,
             response_model=GrowthProjectionsResponse,
             agent_name="GrowthProjectionsAgent",
             use_knowledge_base=use_knowledge_base,
         )
 
-    @cacheable()
+    @cacheable(stale_ttl=timedelta(days=7))
     async def get_regional_trends(
         self,
         company_name: str,
@@ -208,14 +223,8 @@ class MarketAnalysisService:
         end_date: Optional[str] = None,
         use_knowledge_base: bool = False,
     ):
-        prompt = f"""
-        The current date is {datetime.now().isoformat()}. 
-        You are a financial analyst with access to reputable market research sources. Generate a detailed regional trends analysis for the following company:
-        - Company Name: {company_name}
-        - Industry: {industry or "N/A"}
-        - Regions of Interest: {regions_of_interest or "N/A"}
-        - Start Date: {start_date or "N/A"}
-        - End Date: {end_date or "N/A"}
+        instructions = """
+        You are a financial analyst with access to reputable market research sources. Generate a detailed regional trends analysis for the company described in the request.
 
         Please provide the following fields in your response:
         - regional_trends: A list of objects, each with region, period_start, period_end, value, metric, sources, and confidence
@@ -223,11 +232,19 @@ class MarketAnalysisService:
         - last_updated: The datetime of the latest data (ISO format)
         
         Be as realistic and detailed as possible. Use plausible numbers and sources. 
-        Output should be a detailed textual description of all these fields and their values.
+        """
+        request = f"""
+        The current date is {prompt_date()}.
+        - Company Name: {company_name}
+        - Industry: {industry or "N/A"}
+        - Regions of Interest: {regions_of_interest or "N/A"}
+        - Start Date: {start_date or "N/A"}
+        - End Date: {end_date or "N/A"}
         """
         return await self._execute_llm_analysis(
             company_name=company_name,
-            prompt=prompt,
+            instructions=instructions,
+            request=request,
             response_model=RegionalTrendsResponse,
             agent_name="RegionalTrendsAgent",
             use_knowledge_base=use_knowledge_base,
@@ -3,11 +3,13 @@ from datetime import datetime
 from backend.models.response.news import NewsItem, NewsItemList
 from backend.settings import MongoConnectionDetails
 from backend.utils.api_helpers import LOG
+from backend.utils.output_parsing import with_output_instruction
+from backend.utils.time_utils import prompt_date
 from backend.utils.llm import get_model, get_sonar_model
+from backend.agents.agent_pool import AgentPool
 from backend.agents.output_parser import LLMOutputParserAgent
 from backend.settings import LLMConfig, SonarConfig
 from backend.utils.cache_decorator import cacheable
-from agno.agent import Agent
 from pydantic import BaseModel
 from typing import Type
 
@@ -29,7 +31,8 @@ class NewsService:
 
     async def _execute_llm_analysis(
         self,
-        prompt: str,
+        instructions: str,
+        request: str,
         response_model: Type[BaseModel],
         agent_name: str = "NewsAgent",
     ) -> list[NewsItem]:
@@ -37,26 +40,33 @@ class NewsService:
         Common method to execute LLM analysis and parse the response.
 
         Args:
-            prompt: The prompt to send to the LLM
+            instructions: The agent's instructions, the same for every call
+            request: The date and parameters of this call
             response_model: The Pydantic model to parse the response into
             agent_name: Name of the agent for logging/identification
 
         Returns:
             Parsed response model instance with citations if available
         """
-        analysis_agent = Agent(
-            name=agent_name,
-            model=self.sonar_model,
-            instructions=prompt,
-        )
-        s = datetime.now()
-        # Use the LLM to generate the content
-        content = analysis_agent.run(prompt)
+        with AgentPool.lease(
+            self.sonar_model,
+            agent_name,
+            instructions=with_output_instruction(
+                instructions, self.sonar_config.structured_output
+            ),
+            # In single-pass mode Sonar answers in the response model's JSON schema
+            response_model=response_model
+            if self.sonar_config.structured_output
+            else None,
+        ) as analysis_agent:
+            s = datetime.now()
+            # Use the LLM to generate the content
+            content = await analysis_agent.arun(request)
         LOG.info(f"Sonar response generated in {datetime.now() - s} seconds")
 
         # Parse the LLM output into the response model
         s = datetime.now()
-        response = self.llm_output_parser.parse(content.content, response_model)
+        response = await self.llm_output_parser.aparse(content.content, response_model)
         LOG.info(f"Chatgpt took to Response parsed in {datetime.now() - s} seconds")
         # 3) Extract actual list of NewsItem
         news_items: list[NewsItem] = response.news_items
@@ -78,12 +88,8 @@ class NewsService:
         """
 
         # Compose a detailed prompt for the LLM to generate all required fields
-        prompt = f"""
-        The current date is {datetime.now().isoformat()}.
-        you are a news analyst. Generate a detailed news description for trending
-        - Company Name: {company_name or "N/A"} if company name is not provided, generate news for Trending companies
-        - Domain: {domain or "N/A"} if domain is not provided, generate news for Trending companies
-        - Limit: {limit}
+        instructions = """
+        You are a news analyst. Generate a detailed news description for the company described in the request, or for trending companies.
         
         Please provide the following fields in your response:
         - title: The title of the news item
@@ -95,11 +101,17 @@ class NewsService:
         - citations: The citations of the news item
 
         Be as realistic and detailed as possible. Use plausible numbers and sources. 
-        Output should be a detailed textual description of all these fields and their values.
+        """
+        request = f"""
+        The current date is {prompt_date()}.
+        - Company Name: {company_name or "N/A"} if company name is not provided, generate news for Trending companies
+        - Domain: {domain or "N/A"} if domain is not provided, generate news for Trending companies
+        - Limit: {limit}
         """
 
         return await self._execute_llm_analysis(
-            prompt=prompt,
+            instructions=instructions,
+            request=request,
             response_model=NewsItemList,
             agent_name="NewsAgent",
         )
@@ -1,13 +1,19 @@
-from agno.agent import Agent
-
+from backend.agents.agent_pool import AgentPool
 from backend.agents.netlify import NetlifyAgent
 from backend.agents.output_parser import LLMOutputParserAgent
 from backend.database.mongo import MongoDBConnector
 from backend.models.base.exceptions import Status
 from backend.plot.factory import get_builder
 from backend.services.knowledge import KnowledgeBaseService
-from backend.settings import MongoConnectionDetails, LLMConfig
+from backend.services.research_store import ResearchStore
+from backend.settings import MongoConnectionDetails, LLMConfig, ResearchConfig
 import asyncio
+from collections import Counter
+from functools import partial
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, Type
+
+from pydantic import BaseModel
 
 from backend.services.finance import FinanceService
 from backend.services.team import TeamService
@@ -17,6 +23,8 @@ from backend.services.customer_sentiment import CustomerSentimentService
 from backend.services.regulatory_compliance import RegulatoryComplianceService
 from backend.services.risk_analysis import RiskAnalysisService
 from backend.models.response.research import (
+    ResearchRefreshResponse,
+    ResearchStreamEvent,
     ResearchResponse,
     FinanceResponse,
     LinkedInTeamResponse,
@@ -42,15 +50,21 @@ from backend.models.response.market_analysis import (
     GrowthProjectionsResponse,
     RegionalTrendsResponse,
 )
-from backend.utils.cache_decorator import cacheable
+from backend.utils.cache_batch import cache_batch
+from backend.utils.cache_decorator import cacheable, recompute_cached
 from backend.utils.exceptions import ServiceException
 from backend.utils.llm import get_model
+from backend.utils.llm_usage import llm_usage_tags
+from backend.utils.logger import get_logger
+from backend.utils.rate_limit import Priority, llm_priority, wait_for_unqueued
 
 # Apply OpenAI client patch to fix AttributeError during garbage collection
 from backend.utils.openai_patch import patch_openai_client
 
 patch_openai_client()
 
+LOG = get_logger("ResearchService")
+
 
 # Common base system prompt for all section/field LLMs
 def BASE_SYSTEM_PROMPT():
@@ -84,6 +98,45 @@ Below is the schema for your field:
 
 
 class ResearchService:
+    # Section of the research response -> its model
+    SECTION_MODELS = {
+        "finance": FinanceResponse,
+        "linkedin_team": LinkedInTeamResponse,
+        "market_analysis": MarketAnalysisResponse,
+    }
+
+    # Deep research fields per section: (prompt label, [(field, response model)])
+    DEEP_RESEARCH_FIELDS = {
+        "finance": (
+            "Finance",
+            [
+                ("revenue", RevenueAnalysisResponse),
+                ("expenses", ExpenseAnalysisResponse),
+                ("margins", ProfitMarginsResponse),
+                ("valuation", ValuationEstimationResponse),
+                ("funding", FundingHistoryResponse),
+            ],
+        ),
+        "linkedin_team": (
+            "Team",
+            [
+                ("team_overview", TeamOverviewResponse),
+                ("individual_performance", IndividualPerformanceResponse),
+                ("org_structure", OrgStructureResponse),
+                ("team_growth", TeamGrowthResponse),
+            ],
+        ),
+        "market_analysis": (
+            "MarketAnalysis",
+            [
+                ("market_trends", MarketTrendsResponse),
+                ("competitive_analysis", CompetitiveAnalysisResponse),
+                ("growth_projections", GrowthProjectionsResponse),
+                ("regional_trends", RegionalTrendsResponse),
+            ],
+        ),
+    }
+
     def __init__(
         self,
         finance_service: FinanceService,
@@ -97,6 +150,7 @@ class ResearchService:
         db_config: MongoConnectionDetails,
         llm_config: LLMConfig,
         netlify_agent: NetlifyAgent,
+        research_config: Optional[ResearchConfig] = None,
     ):
         self.finance_service = finance_service
         self.linkedin_team_service = linkedin_team_service
@@ -105,93 +159,255 @@ class ResearchService:
         self.customer_sentiment_service = customer_sentiment_service
         self.regulatory_compliance_service = regulatory_compliance_service
         self.risk_analysis_service = risk_analysis_service
+        self.knowledge_base_service = knowledge_base_service
         self.knowledge_base = knowledge_base_service.get_knowledge_base()
         self.db_config = db_config
         self.mongo_connector = MongoDBConnector(db_config)
+        self.research_store = ResearchStore(db_config)
         self.llm_model = get_model(llm_config)
         self.llm_output_parser = LLMOutputParserAgent(self.llm_model)
         self.netlify_agent = netlify_agent
+        self.research_config = research_config or ResearchConfig()
 
     async def _llm_field(
-        self, company: str, section_name, field_name, schema, knowledge
+        self,
+        company: str,
+        section_name,
+        field_name,
+        schema,
+        knowledge,
+        context: Optional[str] = None,
     ):
+        """
+        Run the agent for one research field. With `context` (knowledge base
+        excerpts retrieved up front), the excerpts go in the request and the agent
+        doesn't search the knowledge base itself; without it, the agent does.
+        """
         prompt = FIELD_SYSTEM_PROMPT(field_name, schema)
-        agent = Agent(
-            name=f"{section_name}_{field_name}Agent",
-            model=self.llm_model,
-            instructions=prompt,
-            response_model=schema,
-            knowledge=knowledge,
-            search_knowledge=True,
-            use_json_mode=True,
-            show_tool_calls=True,
-        )
         input_text = (
             f"Generate the {company} {field_name} field for the {section_name} section"
         )
+        if context is not None:
+            input_text += (
+                f"\n\nThe knowledge base content for {company} relevant to "
+                f"{field_name} is below. It is the whole knowledge base for this "
+                f"field: use nothing else.\n\n{context}"
+            )
         # LOG THE CONTEXT
         # print(f"\n--- LLM CONTEXT FOR {section_name.upper()} - {field_name.upper()} ---")
         # print("Prompt:\n", prompt)
         # print("Input Text:\n", input_text)
         # print("Knowledge (first 1000 chars):\n", str(knowledge)[:1000])
         # print("--- END CONTEXT ---\n")
-        response = await agent.arun(input_text)
+        search_knowledge = context is None
+        with (
+            llm_usage_tags(section=f"{section_name}.{field_name}"),
+            AgentPool.lease(
+                self.llm_model,
+                f"{section_name}_{field_name}Agent",
+                instructions=prompt,
+                response_model=schema,
+                knowledge=knowledge if search_knowledge else None,
+                search_knowledge=search_knowledge,
+                use_json_mode=True,
+                show_tool_calls=True,
+            ) as agent,
+        ):
+            response = await agent.arun(input_text)
         return response.content
 
-    async def get_research(self, company_name: str, use_knowledge_base: bool = False):
+    async def _retrieve_field_contexts(
+        self, company_name: str, fields: list[tuple[str, str]]
+    ) -> Optional[dict[str, str]]:
         """
-        Get comprehensive research data for a company by calling multiple service agents in parallel (fully concurrent, not batched).
+        One retrieval pass for all deep research fields: a query per (section label,
+        field) is embedded in a single request, the vector searches run together,
+        and each chunk is kept once, however many queries matched it. Returns the
+        knowledge base excerpts per field, or None if retrieval failed (the field
+        agents then search the knowledge base themselves).
+        """
+        queries = [
+            f"{company_name} {label} {field_name.replace('_', ' ')}"
+            for label, field_name in fields
+        ]
+        try:
+            results = await self.knowledge_base_service.asearch_many(
+                queries,
+                limit=self.research_config.retrieval_chunks_per_field,
+                filters={"company_name": company_name},
+            )
+        except Exception as e:
+            LOG.error(f"Knowledge retrieval failed for {company_name}: {e}")
+            return None
+
+        chunks: dict[str, int] = {}
+        contexts = {}
+        for (_, field_name), docs in zip(fields, results):
+            excerpts: dict[int, str] = {}
+            for doc in docs:
+                content = (doc.get("content") or "").strip()
+                if not content:
+                    continue
+                # The same chunk may be ingested more than once, so dedupe on content
+                number = chunks.setdefault(content, len(chunks) + 1)
+                excerpts.setdefault(
+                    number, f"[{number}] {doc.get('name') or ''}\n{content}".strip()
+                )
+            contexts[field_name] = (
+                "\n\n".join(excerpts.values())
+                or "No knowledge base content matched this field."
+            )
 
-        Args:
-            company_name (str): Name of the company to research
-            use_knowledge_base (bool): Whether to use the knowledge base
+        total = sum(len(docs) for docs in results)
+        LOG.info(
+            f"Retrieved {total} chunks ({len(chunks)} unique) for "
+            f"{len(fields)} deep research fields of {company_name}"
+        )
+        return contexts
 
-        Returns:
-            ResearchResponse: Comprehensive research data about the company
+    def _research_calls(
+        self, company_name: str, use_knowledge_base: bool = False
+    ) -> list[tuple[str, str, Callable[[], Awaitable[Any]]]]:
         """
-        # Prepare all service call coroutines
-        coros = [
-            self.finance_service.get_revenue_analysis(
-                company_name, use_knowledge_base=use_knowledge_base
+        The service calls behind the basic research, as (section, field, call) in
+        the order of the research response's fields
+        """
+        kb = use_knowledge_base
+        return [
+            (
+                "finance",
+                "revenue",
+                partial(
+                    self.finance_service.get_revenue_analysis,
+                    company_name,
+                    use_knowledge_base=kb,
+                ),
+            ),
+            (
+                "finance",
+                "expenses",
+                partial(
+                    self.finance_service.get_expense_analysis,
+                    company_name,
+                    use_knowledge_base=kb,
+                ),
             ),
-            self.finance_service.get_expense_analysis(
-                company_name, use_knowledge_base=use_knowledge_base
+            (
+                "finance",
+                "margins",
+                partial(
+                    self.finance_service.get_profit_margins,
+                    company_name,
+                    use_knowledge_base=kb,
+                ),
             ),
-            self.finance_service.get_profit_margins(
-                company_name, use_knowledge_base=use_knowledge_base
+            (
+                "finance",
+                "valuation",
+                partial(
+                    self.finance_service.get_valuation_estimation,
+                    company_name,
+                    use_knowledge_base=kb,
+                ),
             ),
-            self.finance_service.get_valuation_estimation(
-                company_name, use_knowledge_base=use_knowledge_base
+            (
+                "finance",
+                "funding",
+                partial(
+                    self.finance_service.get_funding_history,
+                    company_name,
+                    use_knowledge_base=kb,
+                ),
             ),
-            self.finance_service.get_funding_history(
-                company_name, use_knowledge_base=use_knowledge_base
+            (
+                "linkedin_team",
+                "team_overview",
+                partial(self.linkedin_team_service.get_team_overview, company_name),
             ),
-            self.linkedin_team_service.get_team_overview(company_name),
-            self.linkedin_team_service.get_individual_performance(
-                company_name, use_knowledge_base=use_knowledge_base
+            (
+                "linkedin_team",
+                "individual_performance",
+                partial(
+                    self.linkedin_team_service.get_individual_performance,
+                    company_name,
+                    use_knowledge_base=kb,
+                ),
             ),
-            self.linkedin_team_service.get_org_structure(
-                company_name, use_knowledge_base=use_knowledge_base
+            (
+                "linkedin_team",
+                "org_structure",
+                partial(
+                    self.linkedin_team_service.get_org_structure,
+                    company_name,
+                    use_knowledge_base=kb,
+                ),
             ),
-            self.linkedin_team_service.get_team_growth(
-                company_name, use_knowledge_base=use_knowledge_base
+            (
+                "linkedin_team",
+                "team_growth",
+                partial(
+                    self.linkedin_team_service.get_team_growth,
+                    company_name,
+                    use_knowledge_base=kb,
+                ),
             ),
-            self.market_analysis_service.get_market_trends(
-                company_name, use_knowledge_base=use_knowledge_base
+            (
+                "market_analysis",
+                "market_trends",
+                partial(
+                    self.market_analysis_service.get_market_trends,
+                    company_name,
+                    use_knowledge_base=kb,
+                ),
             ),
-            self.market_analysis_service.get_competitive_analysis(
-                company_name, use_knowledge_base=use_knowledge_base
+            (
+                "market_analysis",
+                "competitive_analysis",
+                partial(
+                    self.market_analysis_service.get_competitive_analysis,
+                    company_name,
+                    use_knowledge_base=kb,
+                ),
             ),
-            self.market_analysis_service.get_growth_projections(
-                company_name, use_knowledge_base=use_knowledge_base
+            (
+                "market_analysis",
+                "growth_projections",
+                partial(
+                    self.market_analysis_service.get_growth_projections,
+                    company_name,
+                    use_knowledge_base=kb,
+                ),
             ),
-            self.market_analysis_service.get_regional_trends(
-                company_name, use_knowledge_base=use_knowledge_base
+            (
+                "market_analysis",
+                "regional_trends",
+                partial(
+                    self.market_analysis_service.get_regional_trends,
+                    company_name,
+                    use_knowledge_base=kb,
+                ),
             ),
         ]
 
-        # Run all service calls concurrently
-        results = await asyncio.gather(*coros, return_exceptions=True)
+    async def get_research(self, company_name: str, use_knowledge_base: bool = False):
+        """
+        Get comprehensive research data for a company by calling multiple service agents in parallel (fully concurrent, not batched).
+
+        Args:
+            company_name (str): Name of the company to research
+            use_knowledge_base (bool): Whether to use the knowledge base
+
+        Returns:
+            ResearchResponse: Comprehensive research data about the company
+        """
+        calls = self._research_calls(company_name, use_knowledge_base)
+        coros = [call() for _, _, call in calls]
+
+        # Run all service calls concurrently, sharing one cache lookup and one
+        # cache write round trip. Their LLM calls queue behind interactive ones.
+        with llm_priority(Priority.BATCH):
+            async with cache_batch(self.cache_service):
+                results = await asyncio.gather(*coros, return_exceptions=True)
 
         # Unpack results
         (
@@ -210,7 +426,8 @@ class ResearchService:
             regional_trends,
         ) = results
 
-        # For each finance field, try to build the plot and set iframe_url
+        # For each finance field without a chart yet (cached sections keep theirs),
+        # try to build the plot and set iframe_url
         finance_fields = [
             (revenue, "revenue"),
             (expenses, "expenses"),
@@ -220,7 +437,11 @@ class ResearchService:
         ]
         for idx, (field_name, _) in enumerate(finance_fields):
             response = results[idx]
-            if response is not None and hasattr(response, "get_plot_data"):
+            if (
+                response is not None
+                and hasattr(response, "get_plot_data")
+                and not getattr(response, "iframe_url", None)
+            ):
                 try:
                     chart_data = response.get_plot_data()
                     builder = get_builder(chart_data.kind, self.netlify_agent)
@@ -271,15 +492,221 @@ class ResearchService:
             market_analysis=market_response,
         )
 
-        # Save to MongoDB - save research to a collection named after the company
+        await self._save_research(
+            company_name,
+            {
+                (section, field): result
+                for (section, field, _), result in zip(calls, results)
+            },
+        )
+
+        return research_response
+
+    async def _save_research(
+        self, company_name: str, results: dict[tuple[str, str], Any]
+    ) -> None:
+        """Upsert computed fields into the company's research document"""
+        fingerprint = await self.research_store.asource_fingerprint(company_name)
+        await self.research_store.asave_fields(company_name, results, fingerprint)
+
+    async def _build_chart(
+        self, response: Any, company_name: str, field_name: str
+    ) -> Optional[str]:
+        """Build and upload the chart of a field response, setting its iframe_url"""
         try:
-            research_dict = research_response.dict()
-            self.mongo_connector.insert_records("company_info", [research_dict])
-            print(f">>> SAVED research data for {company_name} to MongoDB")
+            chart_data = response.get_plot_data()
+            builder = get_builder(chart_data.kind, self.netlify_agent)
+            response.iframe_url = await builder.plot(chart_data, company_name)
         except Exception as e:
-            print(f">>> ERROR saving to MongoDB: {str(e)}")
+            LOG.error(f"Plot build failed for {field_name}: {e}")
+            response.iframe_url = None
+        return response.iframe_url
 
-        return research_response
+    async def stream_research(
+        self, company_name: str, use_knowledge_base: bool = False
+    ) -> AsyncIterator[ResearchStreamEvent]:
+        """
+        Stream the basic research of a company as its parts complete: a `field`
+        event per field, a `section` event once all fields of a section are in,
+        `chart` events as chart uploads finish (in the background, so they never
+        hold back other fields), and a final `done` event with the full research,
+        which is then saved like `get_research` does.
+        """
+        calls = self._research_calls(company_name, use_knowledge_base)
+        queue: asyncio.Queue[Optional[ResearchStreamEvent]] = asyncio.Queue()
+        results: dict[str, dict[str, Any]] = {section: {} for section, _, _ in calls}
+        pending = Counter(section for section, _, _ in calls)
+        chart_tasks: list[asyncio.Task] = []
+
+        def emit(event: str, **kwargs) -> None:
+            queue.put_nowait(
+                ResearchStreamEvent(event=event, company_name=company_name, **kwargs)
+            )
+
+        async def chart(section: str, field: str, response: Any) -> None:
+            iframe_url = await self._build_chart(response, company_name, field)
+            if iframe_url:
+                emit("chart", section=section, field=field, iframe_url=iframe_url)
+
+        async def run_field(
+            section: str, field: str, call: Callable[[], Awaitable[Any]]
+        ) -> None:
+            try:
+                response = await call()
+            except Exception as e:
+                LOG.error(f"Research field {section}.{field} failed: {e}")
+                response = None
+                emit(
+                    "error",
+                    section=section,
+                    field=field,
+                    message=getattr(e, "message", None) or str(e),
+                )
+            else:
+                emit("field", section=section, field=field, data=response)
+                if hasattr(response, "get_plot_data") and not getattr(
+                    response, "iframe_url", None
+                ):
+                    chart_tasks.append(
+                        asyncio.create_task(chart(section, field, response))
+                    )
+
+            results[section][field] = response
+            pending[section] -= 1
+            if not pending[section]:
+                emit(
+                    "section",
+                    section=section,
+                    data=self.SECTION_MODELS[section](**results[section]),
+                )
+
+        async def produce() -> None:
+            try:
+                with llm_priority(Priority.BATCH):
+                    async with cache_batch(self.cache_service):
+                        await asyncio.gather(*(run_field(*call) for call in calls))
+                await asyncio.gather(*chart_tasks)
+
+                research_response = ResearchResponse(
+                    company_name=company_name,
+                    **{
+                        section: self.SECTION_MODELS[section](**fields)
+                        for section, fields in results.items()
+                    },
+                )
+                await self._save_research(
+                    company_name,
+                    {
+                        (section, field): response
+                        for section, fields in results.items()
+                        for field, response in fields.items()
+                    },
+                )
+                emit("done", data=research_response)
+            finally:
+                queue.put_nowait(None)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while (event := await queue.get()) is not None:
+                yield event
+            await producer
+        finally:
+            # The client went away: stop the remaining work
+            producer.cancel()
+            for task in chart_tasks:
+                task.cancel()
+
+    async def refresh_research(
+        self,
+        company_name: str,
+        force: bool = False,
+        use_knowledge_base: bool = False,
+        refreshed_since: Optional[datetime] = None,
+    ) -> ResearchRefreshResponse:
+        """
+        Bring the stored basic research of a company up to date, recomputing only
+        the fields that are stale: never computed, older than their section's max
+        age (`RESEARCH__SECTION_MAX_AGE_HOURS`), or computed before the company's
+        documents changed. Stale fields bypass the service caches, so they are
+        really recomputed; `force` treats every field as stale, and
+        `refreshed_since` every field computed before that time.
+
+        Each field is stored as soon as it is computed, so a refresh that is
+        interrupted can be resumed with `refreshed_since` set to its start.
+        """
+        calls = self._research_calls(company_name, use_knowledge_base)
+        document = await self.research_store.aget(company_name)
+        fingerprint = await self.research_store.asource_fingerprint(company_name)
+        stale = set(
+            self.research_store.stale_fields(
+                None if force else document,
+                [(section, field) for section, field, _ in calls],
+                fingerprint,
+                self.research_config,
+                refreshed_since=refreshed_since,
+            )
+        )
+        stale_calls = [call for call in calls if (call[0], call[1]) in stale]
+        LOG.info(
+            f"Refreshing {len(stale_calls)} of {len(calls)} research fields "
+            f"for {company_name}"
+        )
+
+        if stale_calls and document is None:
+            # Create the document first, so the concurrent per-field saves below
+            # all update it rather than each upserting one
+            await self.research_store.asave_fields(company_name, {}, fingerprint)
+
+        refreshed: dict[tuple[str, str], Any] = {}
+        failed = []
+
+        async def refresh_field(section: str, field: str, call) -> None:
+            try:
+                result = await call()
+            except Exception as e:
+                result = e
+            if result is None or isinstance(result, Exception):
+                LOG.error(f"Refresh of {section}.{field} failed: {result}")
+                failed.append(f"{section}.{field}")
+                result = None
+            else:
+                refreshed[(section, field)] = result
+                if hasattr(result, "get_plot_data"):
+                    await self._build_chart(result, company_name, field)
+            await self.research_store.asave_fields(
+                company_name, {(section, field): result}, fingerprint
+            )
+
+        with llm_priority(Priority.BATCH), recompute_cached():
+            async with cache_batch(self.cache_service):
+                await asyncio.gather(
+                    *(refresh_field(*stale_call) for stale_call in stale_calls)
+                )
+
+        sections: dict[str, dict[str, Any]] = {}
+        for section, field, _ in calls:
+            stored = ((document or {}).get(section) or {}).get(field)
+            sections.setdefault(section, {})[field] = refreshed.get(
+                (section, field), stored
+            )
+        return ResearchRefreshResponse(
+            company_name=company_name,
+            refreshed=[f"{section}.{field}" for section, field in refreshed],
+            failed=failed,
+            fresh=[
+                f"{section}.{field}"
+                for section, field, _ in calls
+                if (section, field) not in stale
+            ],
+            research=ResearchResponse(
+                company_name=company_name,
+                **{
+                    section: self.SECTION_MODELS[section](**fields)
+                    for section, fields in sections.items()
+                },
+            ),
+        )
 
     @cacheable()
     async def get_deep_research(
@@ -293,126 +720,79 @@ class ResearchService:
                 status=Status.NOT_FOUND, message="Company not found."
             )
 
-        # Finance fields
-        finance_fields = [
-            ("revenue", RevenueAnalysisResponse),
-            ("expenses", ExpenseAnalysisResponse),
-            ("margins", ProfitMarginsResponse),
-            ("valuation", ValuationEstimationResponse),
-            ("funding", FundingHistoryResponse),
-        ]
-        finance_tasks = [
-            self._llm_field(
-                company_name, "Finance", fname, fschema, self.knowledge_base
-            )
-            for fname, fschema in finance_fields
-        ]
-        # Team fields
-        team_fields = [
-            ("team_overview", TeamOverviewResponse),
-            ("individual_performance", IndividualPerformanceResponse),
-            ("org_structure", OrgStructureResponse),
-            ("team_growth", TeamGrowthResponse),
-        ]
-        team_tasks = [
-            self._llm_field(
+        config = self.research_config
+        semaphore = asyncio.Semaphore(config.max_concurrent_fields)
+
+        async def generate_field(
+            label: str, field_name: str, schema: Type[BaseModel]
+        ) -> BaseModel:
+            response = await self._llm_field(
                 company_name,
-                "Team",
-                fname,
-                fschema,
+                label,
+                field_name,
+                schema,
                 self.knowledge_base,
+                contexts.get(field_name) if contexts else None,
             )
-            for fname, fschema in team_fields
+            if not isinstance(response, schema):
+                response = await self.llm_output_parser.aparse(response, schema)
+            return response
+
+        async def run_field(label: str, field_name: str, schema: Type[BaseModel]):
+            # Field agents run concurrently, but only a few at a time, and each is
+            # dropped (leaving its field empty) if it fails or its agent and parse
+            # run out of time. Time queued in the rate limiter doesn't count.
+            try:
+                async with semaphore:
+                    response = await wait_for_unqueued(
+                        generate_field(label, field_name, schema),
+                        config.field_timeout_seconds,
+                    )
+            except asyncio.TimeoutError:
+                LOG.error(
+                    f"Deep research field {label}.{field_name} timed out after "
+                    f"{config.field_timeout_seconds}s"
+                )
+                return None
+            except Exception as e:
+                LOG.error(f"Deep research field {label}.{field_name} failed: {e}")
+                return None
+
+            # Build the chart as soon as the field is in, outside the semaphore so
+            # uploads don't hold back the remaining field agents
+            if hasattr(response, "get_plot_data"):
+                await self._build_chart(response, company_name, field_name)
+            return response
+
+        fields = [
+            (section, label, field_name, schema)
+            for section, (label, section_fields) in self.DEEP_RESEARCH_FIELDS.items()
+            for field_name, schema in section_fields
         ]
-        # Market Analysis fields
-        market_fields = [
-            ("market_trends", MarketTrendsResponse),
-            ("competitive_analysis", CompetitiveAnalysisResponse),
-            ("growth_projections", GrowthProjectionsResponse),
-            ("regional_trends", RegionalTrendsResponse),
-        ]
-        market_tasks = [
-            self._llm_field(
-                company_name, "MarketAnalysis", fname, fschema, self.knowledge_base
+        contexts = await self._retrieve_field_contexts(
+            company_name, [(label, name) for _, label, name, _ in fields]
+        )
+        with llm_priority(Priority.BATCH):
+            results = await asyncio.gather(
+                *(run_field(label, name, schema) for _, label, name, schema in fields)
             )
-            for fname, fschema in market_fields
-        ]
-
-        # Run all field LLMs sequentially (no parallel gather)
-        finance_results = []
-        for task in finance_tasks:
-            finance_results.append(await task)
-        team_results = []
-        for task in team_tasks:
-            team_results.append(await task)
-        market_results = []
-        for task in market_tasks:
-            market_results.append(await task)
-
-        # For each finance field, try to build the plot and set iframe_url
-        for idx, (field_name, _) in enumerate(finance_fields):
-            response = finance_results[idx]
-            if response is not None and hasattr(response, "get_plot_data"):
-                try:
-                    chart_data = response.get_plot_data()
-                    builder = get_builder(chart_data.kind, self.netlify_agent)
-                    print("chart_data.kind", chart_data.kind)
-                    response.iframe_url = await builder.plot(chart_data, company_name)
-                except Exception as e:
-                    print(f"Plot build failed for {field_name}: {e}")
-                    response.iframe_url = None
 
-        # For each team field, try to build the plot and set iframe_url
-        for idx, (field_name, _) in enumerate(team_fields):
-            response = team_results[idx]
-            if response is not None and hasattr(response, "get_plot_data"):
-                try:
-                    chart_data = response.get_plot_data()
-                    builder = get_builder(chart_data.kind, self.netlify_agent)
-                    print("chart_data.kind", chart_data.kind)
-                    response.iframe_url = await builder.plot(chart_data, company_name)
-                except Exception as e:
-                    print(f"Plot build failed for {field_name}: {e}")
-                    response.iframe_url = None
-
-        # For each market analysis field, try to build the plot and set iframe_url
-        for idx, (field_name, _) in enumerate(market_fields):
-            response = market_results[idx]
-            if response is not None and hasattr(response, "get_plot_data"):
-                try:
-                    chart_data = response.get_plot_data()
-                    builder = get_builder(chart_data.kind, self.netlify_agent)
-                    print("chart_data.kind", chart_data.kind)
-                    response.iframe_url = await builder.plot(chart_data, company_name)
-                except Exception as e:
-                    print(f"Plot build failed for {field_name}: {e}")
-                    response.iframe_url = None
+        if all(result is None for result in results):
+            raise ServiceException(
+                Status.EXECUTION_ERROR,
+                message=f"Deep research could not be generated for {company_name}",
+            )
 
-        finance_response = FinanceResponse(
-            revenue=finance_results[0],
-            expenses=finance_results[1],
-            margins=finance_results[2],
-            valuation=finance_results[3],
-            funding=finance_results[4],
-        )
-        team_response = LinkedInTeamResponse(
-            team_overview=team_results[0],
-            individual_performance=team_results[1],
-            org_structure=team_results[2],
-            team_growth=team_results[3],
-        )
-        market_response = MarketAnalysisResponse(
-            market_trends=market_results[0],
-            competitive_analysis=market_results[1],
-            growth_projections=market_results[2],
-            regional_trends=market_results[3],
-        )
+        sections: dict[str, dict[str, Any]] = {section: {} for section, *_ in fields}
+        for (section, _, field_name, _), result in zip(fields, results):
+            sections[section][field_name] = result
 
         return ResearchResponse(
             company_name=company_name,
-            finance=finance_response,
-            linkedin_team=team_response,
-            market_analysis=market_response,
+            **{
+                section: self.SECTION_MODELS[section](**section_fields)
+                for section, section_fields in sections.items()
+            },
         )
 
 
@@ -0,0 +1,157 @@
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from backend.database.mongo import MongoDBConnector, MongoIndexSpec
+from backend.settings import MongoConnectionDetails, ResearchConfig
+from backend.utils.cache_keys import normalize_company_name
+from backend.utils.logger import get_logger
+
+LOG = get_logger("ResearchStore")
+
+# (section, field) of the research response, e.g. ("finance", "revenue")
+FieldKey = Tuple[str, str]
+
+
+class ResearchStore:
+    """
+    The stored research of each company: one `company_info` document per company,
+    upserted field by field. Next to the section data, `research_meta` records per
+    field when it was computed and a fingerprint of the company's source documents
+    at the time, which decide when the field is due for a refresh.
+
+    Documents are keyed by `company_key`, the normalized company name (like cache
+    keys: case- and whitespace-insensitive), so spellings of the same company share
+    one document; `company_name` keeps the name it was first stored under.
+
+    Older deployments inserted a new document on every research run; reads and
+    writes go to the most recently updated one, so those duplicates are ignored.
+    """
+
+    COLLECTION_NAME = "company_info"
+    DOCS_COLLECTION_NAME = "company_docs"
+    # Research written by this store first, then the newest legacy duplicate
+    # (legacy documents have no company_key and are matched by exact name)
+    LATEST_FIRST = [("research_updated_at", -1), ("_id", -1)]
+
+    _indexes_ready: bool = False
+
+    def __init__(self, mongo_config: MongoConnectionDetails):
+        self.mongo_connector = MongoDBConnector(mongo_config)
+        self._setup_indexes()
+
+    def _setup_indexes(self):
+        """
+        Index company keys and names (not uniquely: legacy duplicates may exist),
+        once per process
+        """
+        if ResearchStore._indexes_ready:
+            return
+        try:
+            self.mongo_connector.create_indexes(
+                self.COLLECTION_NAME,
+                [
+                    MongoIndexSpec(
+                        keys=[("company_key", 1), ("research_updated_at", -1)],
+                        name="company_key_research_updated_at_idx",
+                    ),
+                    MongoIndexSpec(
+                        keys=[("company_name", 1), ("research_updated_at", -1)],
+                        name="company_name_research_updated_at_idx",
+                    ),
+                ],
+            )
+            ResearchStore._indexes_ready = True
+        except Exception as e:
+            LOG.error(f"Failed to create research indexes: {e}")
+
+    async def aget(self, company_name: str) -> Optional[dict]:
+        """The research document of a company, if any"""
+        return await self.mongo_connector.afind_one(
+            self.COLLECTION_NAME,
+            {
+                "$or": [
+                    {"company_key": normalize_company_name(company_name)},
+                    {"company_name": company_name},
+                ]
+            },
+            sort=self.LATEST_FIRST,
+        )
+
+    async def asource_fingerprint(self, company_name: str) -> str:
+        """A digest of the documents uploaded for a company"""
+        docs = await self.mongo_connector.afind_one(
+            self.DOCS_COLLECTION_NAME, {"company_name": company_name}
+        )
+        urls = sorted((docs or {}).get("document_urls") or [])
+        return hashlib.sha256("\n".join(urls).encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def stale_fields(
+        document: Optional[dict],
+        fields: List[FieldKey],
+        fingerprint: str,
+        config: ResearchConfig,
+        now: Optional[datetime] = None,
+        refreshed_since: Optional[datetime] = None,
+    ) -> List[FieldKey]:
+        """
+        The fields due for a refresh: never computed, older than their section's
+        max age, computed before the company's source documents changed, or (with
+        `refreshed_since`) computed before that time
+        """
+        now = now or datetime.utcnow()
+        research_meta = (document or {}).get("research_meta") or {}
+        stale = []
+        for section, field in fields:
+            meta = (research_meta.get(section) or {}).get(field) or {}
+            computed_at = meta.get("computed_at")
+            if (
+                computed_at is None
+                or now - computed_at > config.max_age(section)
+                or (refreshed_since is not None and computed_at < refreshed_since)
+                or meta.get("source_fingerprint") != fingerprint
+            ):
+                stale.append((section, field))
+        return stale
+
+    async def asave_fields(
+        self,
+        company_name: str,
+        results: Dict[FieldKey, Any],
+        fingerprint: str,
+    ) -> None:
+        """
+        Store freshly computed fields. Failed fields (None or exceptions) keep their
+        previous data and only record the failure, so they stay stale.
+        """
+        now = datetime.utcnow()
+        company_key = normalize_company_name(company_name)
+        update: Dict[str, Any] = {"company_key": company_key}
+        for (section, field), result in results.items():
+            meta = f"research_meta.{section}.{field}"
+            if result is None or isinstance(result, Exception):
+                update[f"{meta}.failed_at"] = now
+                continue
+            update[f"{section}.{field}"] = (
+                result.model_dump() if isinstance(result, BaseModel) else result
+            )
+            update[f"{meta}.computed_at"] = now
+            update[f"{meta}.source_fingerprint"] = fingerprint
+            update[f"{meta}.failed_at"] = None
+        update["research_updated_at"] = now
+
+        existing = await self.aget(company_name)
+        query = {"_id": existing["_id"]} if existing else {"company_key": company_key}
+        try:
+            await self.mongo_connector.aupdate_one(
+                self.COLLECTION_NAME,
+                query,
+                {"$set": update, "$setOnInsert": {"company_name": company_name}},
+                upsert=True,
+            )
+            LOG.info(f"Saved {len(results)} research fields for {company_name}")
+        except Exception as e:
+            LOG.error(f"Failed to save research for {company_name}: {e}")
@@ -1,11 +1,12 @@
-from datetime import datetime
 from typing import Type, Union
 
-from agno.agent import Agent
 from pydantic import BaseModel
 
+from backend.agents.agent_pool import AgentPool
 from backend.agents.output_parser import LLMOutputParserAgent
 from backend.settings import SonarConfig, LLMConfig
+from backend.utils.output_parsing import with_output_instruction
+from backend.utils.time_utils import prompt_date
 from backend.utils.llm import get_model, get_sonar_model
 from backend.utils.cache_decorator import cacheable
 from backend.services.knowledge import KnowledgeBaseService
@@ -32,8 +33,8 @@ class SearchService:
 
     async def _execute_llm_analysis(
         self,
-        query: str,
-        prompt: str,
+        instructions: str,
+        request: str,
         response_model: Type[BaseModel],
         agent_name: str = "GeneralSearchKnowledgeAgent",
         use_knowledge_base: bool = False,
@@ -42,24 +43,30 @@ class SearchService:
         Common method to execute LLM analysis and parse the response.
 
         Args:
-            prompt: The prompt to send to the LLM
+            instructions: The agent's instructions, the same for every call
+            request: The date and parameters of this call
             response_model: The Pydantic model to parse the response into
             agent_name: Name of the agent for logging/identification
 
         Returns:
             Parsed response model instance with citations if available
         """
-        analysis_agent = Agent(
-            name=agent_name,
-            model=self.sonar_model,
-            instructions=prompt,
-        )
-
-        # Use the LLM to generate the content
-        content = analysis_agent.run(query)
+        with AgentPool.lease(
+            self.sonar_model,
+            agent_name,
+            instructions=with_output_instruction(
+                instructions, self.sonar_config.structured_output
+            ),
+            # In single-pass mode Sonar answers in the response model's JSON schema
+            response_model=response_model
+            if self.sonar_config.structured_output
+            else None,
+        ) as analysis_agent:
+            # Use the LLM to generate the content
+            content = await analysis_agent.arun(request)
 
         # Parse the LLM output into the response model
-        response = self.llm_output_parser.parse(content.content, response_model)
+        response = await self.llm_output_parser.aparse(content.content, response_model)
 
         # Attach citations if response is a Pydantic model and has citations
         if hasattr(response, "citations") and hasattr(content, "citations"):
@@ -83,21 +90,22 @@ class SearchService:
         """
 
         # Compose a detailed prompt for the LLM to generate all required fields
-        prompt = f"""
-        The current date is {datetime.now().isoformat()}. 
-        You are a general search knowledge agent. Generate a detailed general search knowledge for the following query:
-        - Query: {query}
+        instructions = """
+        You are a general search knowledge agent. Generate a detailed general search knowledge for the query in the request.
 
         Please provide the following fields in your response:
         - content: The content of the general search knowledge
 
         Be as realistic and detailed as possible. Use plausible numbers and sources. 
-        Output should be a detailed textual description of all these fields and their values.
+        """
+        request = f"""
+        The current date is {prompt_date()}.
+        - Query: {query}
         """
 
         return await self._execute_llm_analysis(
-            query=query,
-            prompt=prompt,
+            instructions=instructions,
+            request=request,
             response_model=GeneralSearchKnowledgeResponse,
             agent_name="GeneralSearchKnowledgeAgent",
         )
@@ -1,12 +1,14 @@
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from typing import Optional, Type, Union
 from backend.utils.cache_decorator import cacheable
 
-from agno.agent import Agent
 from pydantic import BaseModel
 
+from backend.agents.agent_pool import AgentPool
 from backend.agents.output_parser import LLMOutputParserAgent
 from backend.settings import SonarConfig, LLMConfig
+from backend.utils.output_parsing import with_output_instruction
+from backend.utils.time_utils import prompt_date
 from backend.utils.llm import get_model, get_sonar_model
 from backend.models.response.team import (
     TeamOverviewResponse,
@@ -30,7 +32,8 @@ class TeamService:
     async def _execute_llm_analysis(
         self,
         company_name: str,
-        prompt: str,
+        instructions: str,
+        request: str,
         response_model: Type[BaseModel],
         agent_name: str = "AnalysisAgent",
         use_knowledge_base: bool = False,
@@ -44,28 +47,34 @@ class TeamService:
         Common method to execute LLM analysis and parse the response.
 
         Args:
-            prompt: The prompt to send to the LLM
+            instructions: The agent's instructions, the same for every call
+            request: The date and parameters of this call
             response_model: The Pydantic model to parse the response into
             agent_name: Name of the agent for logging/identification
 
         Returns:
             Parsed response model instance with citations if available
         """
-        analysis_agent = Agent(
-            name=agent_name,
-            model=self.sonar_model,
-            instructions=prompt,
-        )
-
-        if use_knowledge_base:
-            analysis_agent.knowledge = self.knowledge_base
-            analysis_agent.knowledge_filters = {"company_name": company_name}
-
-        # Use the LLM to generate the content
-        content = analysis_agent.run(prompt)
+        with AgentPool.lease(
+            self.sonar_model,
+            agent_name,
+            instructions=with_output_instruction(
+                instructions, self.sonar_config.structured_output
+            ),
+            # In single-pass mode Sonar answers in the response model's JSON schema
+            response_model=response_model
+            if self.sonar_config.structured_output
+            else None,
+            knowledge=self.knowledge_base if use_knowledge_base else None,
+            knowledge_filters={"company_name": company_name}
+            if use_knowledge_base
+            else None,
+        ) as analysis_agent:
+            # Use the LLM to generate the content
+            content = await analysis_agent.arun(request)
 
         # Parse the LLM output into the response model
-        response = self.llm_output_parser.parse(content.content, response_model)
+        response = await self.llm_output_parser.aparse(content.content, response_model)
 
         # Ensure datetime fields are properly formatted as strings
         if hasattr(response, "last_updated") and response.last_updated is not None:
@@ -97,7 +106,7 @@ class TeamService:
 
         return response
 
-    @cacheable()
+    @cacheable(stale_ttl=timedelta(days=7))
     async def get_team_overview(self, company_name: str, domain: Optional[str] = None):
         """
         Retrieve team overview data for a company from LinkedIn.
@@ -108,11 +117,8 @@ class TeamService:
             Dict: Contains company name, total employees, roles breakdown, locations,
             and data sources.
         """
-        prompt = f"""
-        The current date is {datetime.now().isoformat()}.
-        You are a LinkedIn data specialist with access to comprehensive team data. Generate a detailed team overview for:
-        - Company Name: {company_name}
-        - Domain: {domain or "N/A"}
+        instructions = """
+        You are a LinkedIn data specialist with access to comprehensive team data. Generate a detailed team overview for the company described in the request.
 
         Please provide the following fields in your response:
         - company_name: The name of the company
@@ -129,17 +135,22 @@ class TeamService:
         
         Be as realistic, accurate, and detailed as possible. Use plausible numbers and sources. Ensure that percentages add up to 100%.
         Reference sources by their index in the main sources list when used inside nested fields.
-        Output should be a detailed textual description of all these fields and their values.
+        """
+        request = f"""
+        The current date is {prompt_date()}.
+        - Company Name: {company_name}
+        - Domain: {domain or "N/A"}
         """
 
         return await self._execute_llm_analysis(
             company_name=company_name,
-            prompt=prompt,
+            instructions=instructions,
+            request=request,
             response_model=TeamOverviewResponse,
             agent_name="LinkedInTeamOverviewAgent",
         )
 
-    @cacheable()
+    @cacheable(stale_ttl=timedelta(days=7))
     async def get_individual_performance(
         self,
         company_name: str,
@@ -157,12 +168,8 @@ class TeamService:
             Dict: Contains individual name, title, tenure, performance metrics,
             and data sources.
         """
-        prompt = f"""
-        The current date is {datetime.now().isoformat()}.
-        You are a LinkedIn data specialist with access to executive profiles and performance data. Generate a comprehensive profile for:
-        - Individual Name: {individual_name or "N/A"}
-        - Company Name: {company_name}
-        - Domain: {domain or "N/A"}
+        instructions = """
+        You are a LinkedIn data specialist with access to executive profiles and performance data. Generate a comprehensive profile for the company described in the request.
 
         Please provide the following fields in your response:
         - company_name: The name of the company
@@ -180,18 +187,24 @@ class TeamService:
 
         Be as realistic, accurate, and detailed as possible. Create a coherent professional profile that includes accomplishments and career trajectory.
         Reference sources by their index in the main sources list when used inside nested fields.
-        Output should be a detailed textual description of all these fields and their values.
+        """
+        request = f"""
+        The current date is {prompt_date()}.
+        - Individual Name: {individual_name or "N/A"}
+        - Company Name: {company_name}
+        - Domain: {domain or "N/A"}
         """
 
         return await self._execute_llm_analysis(
             company_name=company_name,
-            prompt=prompt,
+            instructions=instructions,
+            request=request,
             response_model=IndividualPerformanceResponse,
             agent_name="LinkedInIndividualPerformanceAgent",
             use_knowledge_base=use_knowledge_base,
         )
 
-    @cacheable()
+    @cacheable(stale_ttl=timedelta(days=7))
     async def get_org_structure(
         self,
         company_name: str,
@@ -206,11 +219,8 @@ class TeamService:
         Returns:
             Dict: Contains company name, org chart nodes, and data sources.
         """
-        prompt = f"""
-        The current date is {datetime.now().isoformat()}.
-        You are a LinkedIn data specialist with access to organizational hierarchies and leadership data. Generate a detailed organizational structure for:
-        - Company Name: {company_name}
-        - Domain: {domain or "N/A"}
+        instructions = """
+        You are a LinkedIn data specialist with access to organizational hierarchies and leadership data. Generate a detailed organizational structure for the company described in the request.
 
         Please provide the following fields in your response:
         - company_name: The name of the company
@@ -230,18 +240,23 @@ class TeamService:
 
         Be as realistic, accurate, and detailed as possible. Create a coherent organizational structure that makes sense for this company size and industry.
         Reference sources by their index in the main sources list when used inside nested fields.
-        Output should be a detailed textual description of all these fields and their values.
+        """
+        request = f"""
+        The current date is {prompt_date()}.
+        - Company Name: {company_name}
+        - Domain: {domain or "N/A"}
         """
 
         return await self._execute_llm_analysis(
             company_name=company_name,
-            prompt=prompt,
+            instructions=instructions,
+            request=request,
             response_model=OrgStructureResponse,
             agent_name="LinkedInOrgStructureAgent",
             use_knowledge_base=use_knowledge_base,
         )
 
-    @cacheable()
+    @cacheable(stale_ttl=timedelta(days=7))
     async def get_team_growth(
         self,
         company_name: str,
@@ -260,13 +275,8 @@ class TeamService:
         Returns:
             Dict: Contains company name, team growth timeseries, and summary metrics.
         """
-        prompt = f"""
-        The current date is {datetime.now().isoformat()}.
-        You are a LinkedIn data specialist with access to hiring trends and workforce analytics. Generate a detailed team growth analysis for:
-        - Company Name: {company_name}
-        - Domain: {domain or "N/A"}
-        - Start Date: {start_date or "N/A"}
-        - End Date: {end_date or "N/A"}
+        instructions = """
+        You are a LinkedIn data specialist with access to hiring trends and workforce analytics. Generate a detailed team growth analysis for the company described in the request.
 
         Please provide the following fields in your response:
         - company_name: The name of the company
@@ -291,12 +301,19 @@ class TeamService:
 
         Be as realistic, accurate, and detailed as possible. Use plausible numbers and ensure mathematical consistency across statistics.
         Reference sources by their index in the main sources list when used inside nested fields.
-        Output should be a detailed textual description of all these fields and their values.
+        """
+        request = f"""
+        The current date is {prompt_date()}.
+        - Company Name: {company_name}
+        - Domain: {domain or "N/A"}
+        - Start Date: {start_date or "N/A"}
+        - End Date: {end_date or "N/A"}
         """
 
         return await self._execute_llm_analysis(
             company_name=company_name,
-            prompt=prompt,
+            instructions=instructions,
+            request=request,
             response_model=TeamGrowthResponse,
             agent_name="LinkedInTeamGrowthAgent",
             use_knowledge_base=use_knowledge_base,
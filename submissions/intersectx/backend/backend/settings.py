@@ -1,9 +1,12 @@
+import importlib.util
+import json
 import os
+from datetime import timedelta
 from functools import lru_cache
 from typing import Optional
 
 import yaml
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -13,10 +16,26 @@ class MongoConnectionDetails(BaseModel):
     password: str = Field(..., description="Password to connect to the db")
     port: int = Field(..., description="Database port to use")
     dbname: str = Field(..., description="Database name")
+    max_pool_size: int = Field(
+        50, description="Maximum number of pooled connections per client"
+    )
+    min_pool_size: int = Field(
+        0, description="Minimum number of idle connections kept in the pool"
+    )
+    max_idle_time_ms: int = Field(
+        60_000, description="Idle time after which a pooled connection is closed"
+    )
 
     def get_connection_string(self):
         return f"mongodb+srv://{self.user}:{self.password}@{self.host}/"
 
+    def get_client_options(self) -> dict:
+        return {
+            "maxPoolSize": self.max_pool_size,
+            "minPoolSize": self.min_pool_size,
+            "maxIdleTimeMS": self.max_idle_time_ms,
+        }
+
     def __str__(self):
         return self.get_connection_string()
 
@@ -27,6 +46,15 @@ class StorageConfig(BaseModel):
     api_secret: str = Field(..., description="Cloudinary API secret")
 
 
+class RateLimitConfig(BaseModel):
+    requests_per_minute: int = Field(60, description="Request quota per minute")
+    tokens_per_minute: int = Field(60_000, description="Token quota per minute")
+    max_retries: int = Field(3, description="Retries of calls rejected with a 429")
+    retry_max_seconds: float = Field(
+        60, description="Longest pause after a 429, whatever its retry-after says"
+    )
+
+
 class LLMConfig(BaseModel):
     api_key: str = Field(..., description="API key for the LLM service")
     api_base: str = Field(..., description="Base URL for the LLM service")
@@ -34,6 +62,12 @@ class LLMConfig(BaseModel):
     llm_deployment_name: str = Field(
         ..., description="LLM deployment name for the LLM service"
     )
+    rate_limit: RateLimitConfig = Field(
+        default_factory=lambda: RateLimitConfig(
+            requests_per_minute=300, tokens_per_minute=50_000
+        ),
+        description="Quota of the LLM deployment",
+    )
 
 
 class VectorStoreConfig(BaseModel):
@@ -46,6 +80,100 @@ class VectorStoreConfig(BaseModel):
 class SonarConfig(BaseModel):
     base_url: str = Field(..., description="Perplexity base URL")
     api_key: str = Field(..., description="Sonar API Key")
+    structured_output: bool = Field(
+        False,
+        description="Ask Sonar for the response model's JSON schema directly and only fall back to the LLM output parser when it does not validate",
+    )
+    rate_limit: RateLimitConfig = Field(
+        default_factory=lambda: RateLimitConfig(
+            requests_per_minute=50, tokens_per_minute=200_000
+        ),
+        description="Quota of the Perplexity API key",
+    )
+
+
+class ResearchConfig(BaseModel):
+    max_concurrent_fields: int = Field(
+        4, description="Deep research field agents run at the same time per request"
+    )
+    field_timeout_seconds: float = Field(
+        180,
+        description="Time a deep research field's agent and output parsing may take before the field is dropped, not counting time queued for LLM quota",
+    )
+    retrieval_chunks_per_field: int = Field(
+        5, description="Knowledge base chunks retrieved for each deep research field"
+    )
+    default_max_age_hours: float = Field(
+        168, description="How long a stored research field stays fresh by default"
+    )
+    section_max_age_hours: dict[str, float] = Field(
+        default_factory=dict,
+        description="Freshness per research section (finance, linkedin_team, market_analysis), overriding the default",
+    )
+
+    def max_age(self, section: str) -> timedelta:
+        """How long the fields of a research section stay fresh"""
+        return timedelta(
+            hours=self.section_max_age_hours.get(section, self.default_max_age_hours)
+        )
+
+
+class JobsConfig(BaseModel):
+    backend: str = Field(
+        "mongo", description="Job queue backend: mongo, or memory for tests"
+    )
+    workers: int = Field(2, description="Jobs a worker process runs at the same time")
+    max_attempts: int = Field(
+        3, description="Attempts per job, counting retries of failed sections"
+    )
+    retry_backoff_seconds: float = Field(
+        30, description="Delay before the first retry; doubles with every attempt"
+    )
+    lease_seconds: int = Field(
+        300,
+        description="How long a running job is held without a heartbeat before another worker takes it over",
+    )
+    poll_interval_seconds: float = Field(
+        2, description="How often idle workers check the queue"
+    )
+    idempotency_window_seconds: int = Field(
+        3600,
+        description="How long a finished job answers resubmissions of the same company and options",
+    )
+    retention_seconds: int = Field(
+        7 * 24 * 3600, description="How long finished jobs are kept"
+    )
+    run_in_api: bool = Field(
+        False,
+        description="Run the worker pool inside the API process instead of a separate one",
+    )
+
+
+class PrecomputeConfig(BaseModel):
+    concurrent_companies: int = Field(
+        2, description="Companies whose research is precomputed at the same time"
+    )
+    token_budget: int = Field(
+        2_000_000,
+        description="LLM tokens a precompute run may use before it stops (0 for no limit)",
+    )
+    run_at_hour: int = Field(
+        2, description="Hour of the day (UTC) the scheduled precompute starts"
+    )
+
+
+class LLMUsageConfig(BaseModel):
+    flush_interval_seconds: int = Field(
+        60, description="How often the LLM usage counters are written to MongoDB"
+    )
+    retention_days: int = Field(90, description="How long hourly LLM usage is kept")
+    prices: dict[str, dict[str, float]] = Field(
+        default_factory=lambda: {
+            "gpt-4o": {"prompt": 2.5, "cached_prompt": 1.25, "completion": 10.0},
+            "sonar-pro": {"prompt": 3.0, "completion": 15.0},
+        },
+        description="USD per million prompt, cached prompt and completion tokens, per model id",
+    )
 
 
 class JWTConfig(BaseModel):
@@ -59,6 +187,75 @@ class NetlifyConfig(BaseModel):
     auth_token: str = Field(..., description="Netlify personal access token")
 
 
+class CacheTTLPolicy(BaseModel):
+    service: str = Field("*", description="Service class name (glob pattern)")
+    method: str = Field("*", description="Method name (glob pattern)")
+    args: dict[str, str] = Field(
+        default_factory=dict,
+        description="Argument name to glob pattern, matched against normalized values",
+    )
+    ttl_seconds: Optional[int] = Field(None, description="How long entries stay fresh")
+    stale_seconds: Optional[int] = Field(
+        None, description="How long expired entries may still be served while refreshed"
+    )
+
+    @property
+    def ttl(self) -> Optional[timedelta]:
+        return None if self.ttl_seconds is None else timedelta(seconds=self.ttl_seconds)
+
+    @property
+    def stale_ttl(self) -> Optional[timedelta]:
+        if self.stale_seconds is None:
+            return None
+        return timedelta(seconds=self.stale_seconds)
+
+
+class CacheConfig(BaseModel):
+    memory_max_entries: int = Field(
+        1024, description="Maximum entries kept in the in-process cache tier"
+    )
+    memory_ttl_seconds: int = Field(
+        300, description="Upper bound on how long an entry stays in memory"
+    )
+    max_concurrent_refreshes: int = Field(
+        4, description="Maximum stale-while-revalidate refreshes running at once"
+    )
+    codec: str = Field(
+        "zlib-json",
+        description="Codec for stored cache payloads (bson, zlib-json or zstd-json)",
+    )
+    expiry_report_interval_seconds: int = Field(
+        3600, description="How often expired cache entries are counted and logged"
+    )
+    negative_ttl_seconds: int = Field(
+        30, description="Backoff after the first failure of a cached computation"
+    )
+    negative_max_ttl_seconds: int = Field(
+        900, description="Upper bound on the exponential failure backoff"
+    )
+    negative_reset_seconds: int = Field(
+        3600, description="How long consecutive failures are remembered"
+    )
+    ttl_policies: list[CacheTTLPolicy] = Field(
+        default_factory=list,
+        description="TTL policies checked before the built-in ones; first match wins",
+    )
+    key_namespace: str = Field("vi", description="Namespace prefix of cache keys")
+    key_version: int = Field(
+        1, description="Cache key version; bump it to retire all existing entries"
+    )
+
+    @field_validator("codec")
+    @classmethod
+    def _check_codec_installed(cls, codec: str) -> str:
+        if codec == "zstd-json" and importlib.util.find_spec("zstandard") is None:
+            raise ValueError(
+                "The zstd-json cache codec requires the `zstandard` package, "
+                "installed with the backend's `zstd` extra"
+            )
+        return codec
+
+
 class AppSettings(BaseSettings):
     db_config: MongoConnectionDetails = Field(
         ..., description="MongoDB connection details"
@@ -75,7 +272,27 @@ class AppSettings(BaseSettings):
     netlify_config: NetlifyConfig = Field(
         ..., description="Netlify deployment configuration"
     )
+    cache_config: CacheConfig = Field(
+        default_factory=CacheConfig, description="Cache configuration details"
+    )
+    research_config: ResearchConfig = Field(
+        default_factory=ResearchConfig, description="Research configuration details"
+    )
+    jobs_config: JobsConfig = Field(
+        default_factory=JobsConfig, description="Background job configuration details"
+    )
+    precompute_config: PrecomputeConfig = Field(
+        default_factory=PrecomputeConfig,
+        description="Nightly research precompute configuration details",
+    )
+    llm_usage_config: LLMUsageConfig = Field(
+        default_factory=LLMUsageConfig,
+        description="LLM token and cost accounting configuration details",
+    )
     local_user_email: Optional[str] = Field(None, description="Local user mail id")
+    admin_users: list[str] = Field(
+        default_factory=list, description="User ids allowed to use the admin APIs"
+    )
     local: bool = Field(False, description="Local mode")
     mcp_url: str = Field(..., description="MCP server URL")
 
@@ -101,16 +318,30 @@ class AppSettings(BaseSettings):
                 port=os.environ.get("DB__PORT"),
                 user=os.environ.get("DB__USER"),
                 password=os.environ.get("DB__PASSWORD"),
+                max_pool_size=os.environ.get("DB__MAX_POOL_SIZE", 50),
+                min_pool_size=os.environ.get("DB__MIN_POOL_SIZE", 0),
+                max_idle_time_ms=os.environ.get("DB__MAX_IDLE_TIME_MS", 60_000),
             ),
             llm_config=LLMConfig(
                 api_key=os.environ.get("AZURE_OPENAI_API_KEY"),
                 api_base=os.environ.get("AZURE_OPENAI_API_BASE"),
                 api_version=os.environ.get("AZURE_OPENAI_API_VERSION"),
                 llm_deployment_name=os.environ.get("OPENAI_LLM_DEPLOYMENT_NAME"),
+                rate_limit=RateLimitConfig(
+                    requests_per_minute=os.environ.get("AZURE_OPENAI_RPM", 300),
+                    tokens_per_minute=os.environ.get("AZURE_OPENAI_TPM", 50_000),
+                    max_retries=os.environ.get("LLM_MAX_RETRIES", 3),
+                ),
             ),
             sonar_config=SonarConfig(
                 base_url=os.environ.get("SONAR_BASE_URL"),
                 api_key=os.environ.get("SONAR_API_KEY"),
+                structured_output=os.environ.get("SONAR_STRUCTURED_OUTPUT", False),
+                rate_limit=RateLimitConfig(
+                    requests_per_minute=os.environ.get("SONAR_RPM", 50),
+                    tokens_per_minute=os.environ.get("SONAR_TPM", 200_000),
+                    max_retries=os.environ.get("LLM_MAX_RETRIES", 3),
+                ),
             ),
             storage_config=StorageConfig(
                 cloud_name=os.environ.get("CLOUDINARY_CLOUD_NAME"),
@@ -132,7 +363,83 @@ class AppSettings(BaseSettings):
                 site_id=os.environ.get("NETLIFY_SITE_ID"),
                 auth_token=os.environ.get("NETLIFY_AUTH_TOKEN"),
             ),
+            cache_config=CacheConfig(
+                memory_max_entries=os.environ.get("CACHE__MEMORY_MAX_ENTRIES", 1024),
+                memory_ttl_seconds=os.environ.get("CACHE__MEMORY_TTL_SECONDS", 300),
+                max_concurrent_refreshes=os.environ.get(
+                    "CACHE__MAX_CONCURRENT_REFRESHES", 4
+                ),
+                codec=os.environ.get("CACHE__CODEC", "zlib-json"),
+                expiry_report_interval_seconds=os.environ.get(
+                    "CACHE__EXPIRY_REPORT_INTERVAL_SECONDS", 3600
+                ),
+                negative_ttl_seconds=os.environ.get("CACHE__NEGATIVE_TTL_SECONDS", 30),
+                negative_max_ttl_seconds=os.environ.get(
+                    "CACHE__NEGATIVE_MAX_TTL_SECONDS", 900
+                ),
+                negative_reset_seconds=os.environ.get(
+                    "CACHE__NEGATIVE_RESET_SECONDS", 3600
+                ),
+                ttl_policies=json.loads(os.environ.get("CACHE__TTL_POLICIES", "[]")),
+                key_namespace=os.environ.get("CACHE__KEY_NAMESPACE", "vi"),
+                key_version=os.environ.get("CACHE__KEY_VERSION", 1),
+            ),
+            research_config=ResearchConfig(
+                max_concurrent_fields=os.environ.get(
+                    "RESEARCH__MAX_CONCURRENT_FIELDS", 4
+                ),
+                field_timeout_seconds=os.environ.get(
+                    "RESEARCH__FIELD_TIMEOUT_SECONDS", 180
+                ),
+                retrieval_chunks_per_field=os.environ.get(
+                    "RESEARCH__RETRIEVAL_CHUNKS_PER_FIELD", 5
+                ),
+                default_max_age_hours=os.environ.get(
+                    "RESEARCH__DEFAULT_MAX_AGE_HOURS", 168
+                ),
+                section_max_age_hours=json.loads(
+                    os.environ.get("RESEARCH__SECTION_MAX_AGE_HOURS", "{}")
+                ),
+            ),
+            jobs_config=JobsConfig(
+                backend=os.environ.get("JOBS__BACKEND", "mongo"),
+                workers=os.environ.get("JOBS__WORKERS", 2),
+                max_attempts=os.environ.get("JOBS__MAX_ATTEMPTS", 3),
+                retry_backoff_seconds=os.environ.get("JOBS__RETRY_BACKOFF_SECONDS", 30),
+                lease_seconds=os.environ.get("JOBS__LEASE_SECONDS", 300),
+                poll_interval_seconds=os.environ.get("JOBS__POLL_INTERVAL_SECONDS", 2),
+                idempotency_window_seconds=os.environ.get(
+                    "JOBS__IDEMPOTENCY_WINDOW_SECONDS", 3600
+                ),
+                retention_seconds=os.environ.get(
+                    "JOBS__RETENTION_SECONDS", 7 * 24 * 3600
+                ),
+                run_in_api=os.environ.get("JOBS__RUN_IN_API", False),
+            ),
+            precompute_config=PrecomputeConfig(
+                concurrent_companies=os.environ.get(
+                    "PRECOMPUTE__CONCURRENT_COMPANIES", 2
+                ),
+                token_budget=os.environ.get("PRECOMPUTE__TOKEN_BUDGET", 2_000_000),
+                run_at_hour=os.environ.get("PRECOMPUTE__RUN_AT_HOUR", 2),
+            ),
+            llm_usage_config=LLMUsageConfig(
+                flush_interval_seconds=os.environ.get(
+                    "LLM_USAGE__FLUSH_INTERVAL_SECONDS", 60
+                ),
+                retention_days=os.environ.get("LLM_USAGE__RETENTION_DAYS", 90),
+                **(
+                    {"prices": json.loads(os.environ["LLM_USAGE__PRICES"])}
+                    if os.environ.get("LLM_USAGE__PRICES")
+                    else {}
+                ),
+            ),
             local_user_email=os.environ.get("LOCAL_USER_EMAIL"),
+            admin_users=[
+                user_id.strip()
+                for user_id in os.environ.get("ADMIN_USERS", "").split(",")
+                if user_id.strip()
+            ],
             local=os.environ.get("LOCAL"),
             mcp_url=os.environ.get("MCP_URL"),
         )
@@ -0,0 +1,131 @@
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+from backend.services.cache import CacheService, CacheWrite
+from backend.utils.logger import get_logger
+
+LOG = get_logger("CacheBatch")
+
+_current_batch: ContextVar[Optional["CacheBatch"]] = ContextVar(
+    "cache_batch", default=None
+)
+
+
+class CacheBatch:
+    """
+    Groups the cache traffic of `cacheable` methods running inside a `cache_batch()`
+    scope. Lookups issued in the same event loop iteration (e.g. by coroutines
+    started together with `asyncio.gather`) are answered by a single
+    `aget_many`. Writes are served from the memory tier as soon as they are made,
+    and the writes made in the same loop iteration go to MongoDB in a single bulk
+    write, so finished results are visible to other requests (and processes)
+    while the rest of the batch is still running. Once the scope is closed, calls
+    go straight to the cache service.
+    """
+
+    def __init__(self, cache_service: CacheService):
+        self.cache_service = cache_service
+        self.closed = False
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._writes: List[dict] = []
+        self._load_task: Optional[asyncio.Task] = None
+        self._write_task: Optional[asyncio.Task] = None
+        self._write_tasks: Set[asyncio.Task] = set()
+
+    async def aget_entry(self, key: str) -> Optional[dict]:
+        if self.closed:
+            return (await self.cache_service.aget_many([key])).get(key)
+
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+            if self._load_task is None:
+                # Runs on the next loop iteration, after every coroutine started
+                # alongside this one has registered its key
+                self._load_task = asyncio.ensure_future(self._load_pending())
+        return await asyncio.shield(future)
+
+    async def _load_pending(self) -> None:
+        pending, self._pending = self._pending, {}
+        self._load_task = None
+        try:
+            entries = await self.cache_service.aget_many(list(pending))
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key, future in pending.items():
+            if not future.done():
+                future.set_result(entries.get(key))
+
+    async def aset(self, write: CacheWrite) -> None:
+        if self.closed:
+            await self.cache_service.aset_many([write])
+            return
+
+        entry = self.cache_service.build_write_entry(write)
+        self.cache_service.store_in_memory([entry])
+        self._writes.append(entry)
+        if self._write_task is None:
+            # Runs on the next loop iteration, taking every write made meanwhile
+            self._write_task = asyncio.ensure_future(self._write_pending())
+            self._write_tasks.add(self._write_task)
+            self._write_task.add_done_callback(self._write_tasks.discard)
+
+    async def _write_pending(self) -> None:
+        writes, self._writes = self._writes, []
+        self._write_task = None
+        try:
+            await self.cache_service.awrite_entries(writes)
+        except Exception as e:
+            LOG.error(f"Failed to write {len(writes)} batched cache entries: {e}")
+
+    async def flush(self) -> None:
+        """Wait for the writes in flight and store the ones not yet written"""
+        if self._write_tasks:
+            await asyncio.gather(*self._write_tasks)
+        writes, self._writes = self._writes, []
+        if writes:
+            await self.cache_service.awrite_entries(writes)
+
+
+def current_cache_batch() -> Optional[CacheBatch]:
+    """The batch scope the current task is running in, if any"""
+    return _current_batch.get()
+
+
+@asynccontextmanager
+async def cache_batch(cache_service: CacheService) -> AsyncIterator[CacheBatch]:
+    """
+    Run a group of `cacheable` calls with batched cache reads and writes.
+
+    Usage:
+        async with cache_batch(self.cache_service):
+            results = await asyncio.gather(
+                self.finance_service.get_revenue_analysis(company_name),
+                self.team_service.get_team_overview(company_name),
+            )
+
+    Nested scopes join the outermost one.
+    """
+    batch = _current_batch.get()
+    if batch is not None and not batch.closed:
+        yield batch
+        return
+
+    batch = CacheBatch(cache_service)
+    token = _current_batch.set(batch)
+    try:
+        yield batch
+    finally:
+        _current_batch.reset(token)
+        batch.closed = True
+        try:
+            await batch.flush()
+        except Exception as e:
+            LOG.error(f"Failed to flush batched cache writes: {e}")
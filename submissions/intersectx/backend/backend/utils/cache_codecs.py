@@ -0,0 +1,209 @@
+import importlib
+import zlib
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Optional, Type
+
+import pydantic_core
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from backend.utils.logger import get_logger
+
+LOG = get_logger("CacheCodecs")
+
+# Only models defined inside the backend package can be rehydrated from the cache
+_ALLOWED_MODEL_PREFIXES = ("backend.",)
+
+
+def describe_model_type(data: Any) -> tuple[Optional[Type[BaseModel]], bool]:
+    """
+    Return the Pydantic class to record for `data` and whether it is a list of
+    that class. Anything else (dicts, mixed lists, scalars) is stored untyped.
+    """
+    if isinstance(data, BaseModel):
+        return type(data), False
+
+    if isinstance(data, list) and data:
+        first_type = type(data[0])
+        if issubclass(first_type, BaseModel) and all(
+            type(item) is first_type for item in data
+        ):
+            return first_type, True
+
+    return None, False
+
+
+def model_type_path(model_cls: Optional[Type[BaseModel]]) -> Optional[str]:
+    if model_cls is None:
+        return None
+    return f"{model_cls.__module__}:{model_cls.__qualname__}"
+
+
+def resolve_model_type(path: Optional[str]) -> Optional[Type[BaseModel]]:
+    if not path:
+        return None
+
+    module_name, _, qualname = path.partition(":")
+    if not module_name.startswith(_ALLOWED_MODEL_PREFIXES):
+        raise ValueError(f"Refusing to rehydrate cached model type {path}")
+
+    obj = importlib.import_module(module_name)
+    for part in qualname.split("."):
+        obj = getattr(obj, part)
+
+    if not (isinstance(obj, type) and issubclass(obj, BaseModel)):
+        raise ValueError(f"{path} is not a Pydantic model")
+    return obj
+
+
+@lru_cache(maxsize=256)
+def _type_adapter(model_cls: Type[BaseModel], is_list: bool) -> TypeAdapter:
+    return TypeAdapter(list[model_cls] if is_list else model_cls)
+
+
+def to_bson_compatible(data: Any) -> Any:
+    """Convert data to MongoDB-compatible format"""
+    if data is None:
+        return None
+
+    # Handle Pydantic models
+    if hasattr(data, "model_dump"):
+        try:
+            return data.model_dump()
+        except Exception as e:
+            LOG.error(f"Error serializing Pydantic model: {e}")
+            # Fallback to dict
+            try:
+                return dict(data)
+            except Exception:
+                LOG.error(f"Failed to convert Pydantic model to dict for {type(data)}")
+                # Return just the string representation as a last resort
+                return str(data)
+
+    # Handle lists
+    elif isinstance(data, list):
+        return [to_bson_compatible(item) for item in data]
+
+    # Handle dictionaries
+    elif isinstance(data, dict):
+        return {k: to_bson_compatible(v) for k, v in data.items()}
+
+    # Handle datetimes
+    elif hasattr(data, "isoformat"):
+        return data.isoformat()
+
+    # Handle any objects with __dict__
+    elif hasattr(data, "__dict__"):
+        try:
+            return to_bson_compatible(data.__dict__)
+        except Exception as e:
+            LOG.error(f"Error serializing object with __dict__: {e}")
+            return str(data)
+
+    # Handle other types that MongoDB can store directly
+    return data
+
+
+class CacheCodec(ABC):
+    """
+    Turns a cached value into the fields stored on a cache_entries document and back.
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    def encode(
+        self, data: Any, model_cls: Optional[Type[BaseModel]], is_list: bool
+    ) -> dict: ...
+
+    @abstractmethod
+    def decode(
+        self, doc: dict, model_cls: Optional[Type[BaseModel]], is_list: bool
+    ) -> Any: ...
+
+
+class BsonCodec(CacheCodec):
+    """Stores the value as nested BSON documents under `data`."""
+
+    name = "bson"
+
+    def encode(self, data, model_cls, is_list):
+        return {"data": to_bson_compatible(data)}
+
+    def decode(self, doc, model_cls, is_list):
+        data = doc.get("data")
+        if model_cls is None:
+            return data
+
+        try:
+            return _type_adapter(model_cls, is_list).validate_python(data)
+        except ValidationError:
+            # Nested BSON uses field names rather than aliases; serve it untyped
+            return data
+
+
+class CompressedJsonCodec(CacheCodec):
+    """
+    Serializes the value to JSON in one pass through pydantic-core and stores it
+    compressed under `payload`. Typed values are read back with a single
+    `validate_json` call into their recorded model.
+    """
+
+    name = "zlib-json"
+
+    def compress(self, raw: bytes) -> bytes:
+        return zlib.compress(raw, 6)
+
+    def decompress(self, payload: bytes) -> bytes:
+        return zlib.decompress(payload)
+
+    def encode(self, data, model_cls, is_list):
+        if model_cls is not None:
+            raw = _type_adapter(model_cls, is_list).dump_json(data, by_alias=True)
+        else:
+            raw = pydantic_core.to_json(data, by_alias=True)
+        return {"payload": self.compress(raw)}
+
+    def decode(self, doc, model_cls, is_list):
+        raw = self.decompress(doc["payload"])
+        if model_cls is not None:
+            return _type_adapter(model_cls, is_list).validate_json(raw)
+        return pydantic_core.from_json(raw)
+
+
+class ZstdJsonCodec(CompressedJsonCodec):
+    """Same as zlib-json but compressed with zstd. Requires the `zstandard` package."""
+
+    name = "zstd-json"
+
+    def __init__(self, level: int = 3):
+        import zstandard
+
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, raw: bytes) -> bytes:
+        return self._compressor.compress(raw)
+
+    def decompress(self, payload: bytes) -> bytes:
+        return self._decompressor.decompress(payload)
+
+
+CODECS: dict[str, Type[CacheCodec]] = {
+    BsonCodec.name: BsonCodec,
+    CompressedJsonCodec.name: CompressedJsonCodec,
+    ZstdJsonCodec.name: ZstdJsonCodec,
+}
+
+
+@lru_cache(maxsize=None)
+def get_codec(name: str) -> CacheCodec:
+    """
+    Get a (shared) codec instance by name.
+    Raises:
+        ValueError: If the codec is unknown
+        ImportError: If the codec's optional dependency is not installed
+    """
+    if name not in CODECS:
+        raise ValueError(f"Unsupported cache codec: {name}")
+    return CODECS[name]()
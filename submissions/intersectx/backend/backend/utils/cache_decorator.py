@@ -1,28 +1,184 @@
+import asyncio
 import functools
 import inspect
-from datetime import timedelta
-from typing import Any, Callable, Dict, Optional, TypeVar, cast
-
-from backend.services.cache import CacheService
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    Optional,
+    TypeVar,
+    cast,
+)
+
+from backend.models.base.exceptions import Status
+from backend.services.cache import CacheService, CacheWrite
+from backend.utils.cache_batch import current_cache_batch
+from backend.utils.cache_keys import normalize_call_args
+from backend.utils.exceptions import ServiceException
+from backend.utils.llm_usage import llm_usage_tags
+from backend.utils.logger import get_logger
+from backend.utils.single_flight import SingleFlight
+
+LOG = get_logger("CacheDecorator")
 
 T = TypeVar("T")
 
-
-def cacheable(ttl: Optional[timedelta] = None):
+# Concurrent misses on the same cache key share a single computation
+_single_flight = SingleFlight()
+
+# How often a process waiting on another process' lease re-checks the cache
+LEASE_POLL_INTERVAL = timedelta(seconds=1)
+
+_recompute: ContextVar[bool] = ContextVar("cache_recompute", default=False)
+
+# Failures caused by the call's arguments rather than by the computation. They are
+# raised as they are and never cached, so a fixed request is not held back.
+CLIENT_ERROR_STATUSES = frozenset(
+    {
+        Status.BAD_REQUEST,
+        Status.INVALID_PARAM,
+        Status.NOT_PROCESSED,
+        Status.MISSING_DATA,
+        Status.INVALID_DATA,
+        Status.MISSING_PARAMS,
+        Status.UNAUTHORIZED,
+        Status.ENTITY_NOT_FOUND,
+        Status.NOT_FOUND,
+        Status.NOT_IMPLEMENTED,
+    }
+)
+
+
+@contextmanager
+def recompute_cached() -> Iterator[None]:
+    """
+    Recompute the cacheable calls made in this scope (and the tasks it starts)
+    instead of reading their entries. The fresh results replace the stored ones.
+    """
+    token = _recompute.set(True)
+    try:
+        yield
+    finally:
+        _recompute.reset(token)
+
+
+def _is_client_error(e: Exception) -> bool:
+    return getattr(e, "status", None) in CLIENT_ERROR_STATUSES
+
+
+def _describe_error(e: Exception) -> Dict[str, Any]:
+    """What a negative entry remembers about a failure"""
+    if isinstance(e, ServiceException):
+        return {"status": e.status.value, "message": e.message}
+    return {
+        "status": Status.EXECUTION_ERROR.value,
+        "message": "The analysis could not be generated",
+        "type": type(e).__name__,
+    }
+
+
+def _failure_error(entry: dict) -> ServiceException:
+    """The structured error returned while a negative entry is backing off"""
+    error = entry.get("error") or {}
+    retry_after = entry["fresh_until"] - datetime.utcnow()
+    return ServiceException(
+        Status(error.get("status", Status.EXECUTION_ERROR.value)),
+        message=error.get("message", "The analysis could not be generated"),
+        details={
+            "service": entry.get("service"),
+            "method": entry.get("method"),
+            "failures": entry.get("failures"),
+            "retry_after_seconds": max(int(retry_after.total_seconds()), 0),
+        },
+    )
+
+
+async def _compute_with_lease(
+    cache_service: CacheService,
+    service_name: str,
+    method_name: str,
+    arg_dict: Dict[str, Any],
+    lease_ttl: timedelta,
+    compute: Callable[[], Awaitable[Any]],
+    refresh_ahead: Optional[timedelta] = None,
+) -> Any:
+    """
+    Run `compute` only while holding the Mongo lease for this key. Processes that
+    lose the race poll the cache until the holder stores the result, or take over
+    once the lease is released or expires.
+    """
+    key = cache_service._generate_key(service_name, method_name, arg_dict)
+    owner = uuid.uuid4().hex
+
+    while not await cache_service.aacquire_lease(key, owner, lease_ttl):
+        await asyncio.sleep(LEASE_POLL_INTERVAL.total_seconds())
+        cached_result = await cache_service.aget(service_name, method_name, arg_dict)
+        if cached_result is not None:
+            return cached_result
+
+    try:
+        # The previous holder may have refreshed the entry before we got the lease
+        entry = await cache_service.aget_entry(service_name, method_name, arg_dict)
+        if entry is not None and not cache_service.is_stale(entry, refresh_ahead):
+            if entry.get("negative"):
+                raise _failure_error(entry)
+            return entry["data"]
+        return await compute()
+    finally:
+        await cache_service.arelease_lease(key, owner)
+
+
+def cacheable(
+    ttl: Optional[timedelta] = None,
+    stale_ttl: Optional[timedelta] = None,
+    refresh_ahead: Optional[timedelta] = None,
+    lease_ttl: Optional[timedelta] = None,
+):
     """
     A decorator for caching service method results.
 
+    Concurrent misses on the same key within a process are coalesced: one call
+    computes the result and the others await it. Inside a `cache_batch()` scope,
+    lookups and writes are batched with those of the other cacheable calls.
+
+    TTL policies (see `backend.utils.cache_policy`) are consulted on every call and
+    take precedence over `ttl` and `stale_ttl`.
+
+    Failures are cached too: a computation that fails (other than with a client
+    error such as NOT_FOUND) raises its error and stores a short-lived negative
+    entry, and later calls for that key get a structured `ServiceException` (with
+    `retry_after_seconds`) instead of re-running it. The backoff doubles with every
+    consecutive failure, up to `CACHE__NEGATIVE_MAX_TTL_SECONDS`.
+
     Args:
         ttl: Optional time-to-live for the cache entry. If not provided, defaults to 1 day.
+        stale_ttl: Optional window after `ttl` during which the expired entry is still
+            served immediately while a background task recomputes it.
+        refresh_ahead: Optional margin before `ttl` at which a background refresh is
+            already started, so popular entries are renewed before they go stale.
+        lease_ttl: Optional lease duration. When set, misses are also coalesced across
+            processes through a short-lived lease document in MongoDB. It should
+            comfortably exceed the time the method takes to compute.
 
     Usage:
         @cacheable()
         def my_method(self, arg1, arg2, ...):
             ...
 
-        @cacheable(ttl=timedelta(hours=1))
+        @cacheable(ttl=timedelta(hours=1), lease_ttl=timedelta(minutes=3))
         async def my_async_method(self, arg1, arg2, ...):
             ...
+
+        @cacheable(stale_ttl=timedelta(days=7))
+        async def my_slow_llm_method(self, arg1, arg2, ...):
+            ...
     """
 
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
@@ -45,39 +201,112 @@ def cacheable(ttl: Optional[timedelta] = None):
             # Get method name
             method_name = func.__name__
 
-            # Create a dictionary of arguments
-            # Exclude 'self' from args
-            arg_names = list(inspect.signature(func).parameters.keys())[1:]
-            arg_dict: Dict[str, Any] = {}
-
-            # Add positional arguments
-            for i, arg_name in enumerate(arg_names):
-                if i < len(args):
-                    # If the argument is provided positionally
-                    arg_dict[arg_name] = str(args[i])
-                elif arg_name in kwargs:
-                    # If the argument is provided as a keyword
-                    arg_dict[arg_name] = str(kwargs[arg_name])
-
-            # Add keyword arguments that weren't already captured
-            for kw, value in kwargs.items():
-                if kw not in arg_dict:
-                    arg_dict[kw] = str(value)
+            # Bind and normalize the arguments so equivalent calls share a key
+            arg_dict = normalize_call_args(func, args, kwargs)
 
-            # Try to get from cache first
-            cached_result = await cache_service.aget(
-                service_name, method_name, arg_dict
+            key = cache_service._generate_key(service_name, method_name, arg_dict)
+            entry_ttl, entry_stale_ttl = cache_service.resolve_ttl(
+                service_name, method_name, arg_dict, ttl, stale_ttl
             )
-            if cached_result is not None:
-                return cached_result
-
-            # Execute the method if not cached
-            result = await func(self, *args, **kwargs)
-
-            # Cache the result
-            await cache_service.aset(service_name, method_name, arg_dict, result, ttl)
+            serves_stale = bool(entry_stale_ttl) or refresh_ahead is not None
+            metric_name = cache_service.metrics.name(service_name, method_name)
+            batch = current_cache_batch()
+            previous_failures = 0
+
+            async def compute() -> T:
+                # Execute the method if not cached, its LLM usage tagged with the call
+                started = time.perf_counter()
+                try:
+                    with llm_usage_tags(
+                        service=service_name,
+                        method=method_name,
+                        company=arg_dict.get("company_name"),
+                    ):
+                        result = await func(self, *args, **kwargs)
+                except Exception as e:
+                    if _is_client_error(e):
+                        raise
+                    LOG.error(f"{service_name}.{method_name} failed for {key}: {e}")
+                    try:
+                        await cache_service.aset_negative(
+                            service_name,
+                            method_name,
+                            arg_dict,
+                            _describe_error(e),
+                            previous_failures + 1,
+                        )
+                    except Exception as cache_error:
+                        LOG.error(f"Failed to cache failure for {key}: {cache_error}")
+                    raise
+                cache_service.metrics.record_compute(
+                    metric_name, time.perf_counter() - started
+                )
+
+                # Cache the result. Inside a batch scope the write joins the batch,
+                # unless a lease is held: then it must land before the lease is released
+                if batch is not None and lease_ttl is None:
+                    await batch.aset(
+                        CacheWrite(
+                            service_name,
+                            method_name,
+                            arg_dict,
+                            result,
+                            entry_ttl,
+                            entry_stale_ttl,
+                        )
+                    )
+                else:
+                    await cache_service.aset(
+                        service_name,
+                        method_name,
+                        arg_dict,
+                        result,
+                        entry_ttl,
+                        entry_stale_ttl,
+                    )
+                return result
+
+            async def compute_once() -> T:
+                if lease_ttl is None:
+                    return await compute()
+                return await _compute_with_lease(
+                    cache_service,
+                    service_name,
+                    method_name,
+                    arg_dict,
+                    lease_ttl,
+                    compute,
+                    refresh_ahead,
+                )
 
-            return result
+            # Try to get from cache first
+            if _recompute.get():
+                entry = None
+            elif batch is not None:
+                entry = await batch.aget_entry(key)
+            else:
+                entry = await cache_service.aget_entry(
+                    service_name, method_name, arg_dict
+                )
+            if entry is not None and entry.get("negative"):
+                if not cache_service.is_stale(entry):
+                    cache_service.metrics.record_negative_hit(metric_name)
+                    raise _failure_error(entry)
+                # The backoff is over: retry, remembering how often it failed
+                previous_failures = entry.get("failures", 0)
+                entry = None
+
+            if entry is not None:
+                if serves_stale and cache_service.is_stale(entry, refresh_ahead):
+                    cache_service.metrics.record_stale_serve(metric_name)
+                    cache_service.schedule_refresh(
+                        key, lambda: _single_flight.do(key, compute_once)
+                    )
+                return entry["data"]
+
+            if _single_flight.is_inflight(key):
+                LOG.info(f"Coalescing cache miss for {key}")
+            return await _single_flight.do(key, compute_once)
 
         @functools.wraps(func)
         def sync_wrapper(self, *args, **kwargs) -> T:
@@ -96,35 +325,33 @@ def cacheable(ttl: Optional[timedelta] = None):
             # Get method name
             method_name = func.__name__
 
-            # Create a dictionary of arguments
-            # Exclude 'self' from args
-            arg_names = list(inspect.signature(func).parameters.keys())[1:]
-            arg_dict: Dict[str, Any] = {}
-
-            # Add positional arguments
-            for i, arg_name in enumerate(arg_names):
-                if i < len(args):
-                    # If the argument is provided positionally
-                    arg_dict[arg_name] = str(args[i])
-                elif arg_name in kwargs:
-                    # If the argument is provided as a keyword
-                    arg_dict[arg_name] = str(kwargs[arg_name])
-
-            # Add keyword arguments that weren't already captured
-            for kw, value in kwargs.items():
-                if kw not in arg_dict:
-                    arg_dict[kw] = str(value)
+            # Bind and normalize the arguments so equivalent calls share a key
+            arg_dict = normalize_call_args(func, args, kwargs)
 
             # Try to get from cache first
-            cached_result = cache_service.get(service_name, method_name, arg_dict)
+            cached_result = (
+                None
+                if _recompute.get()
+                else cache_service.get(service_name, method_name, arg_dict)
+            )
             if cached_result is not None:
                 return cached_result
 
             # Execute the method if not cached
-            result = func(self, *args, **kwargs)
+            with llm_usage_tags(
+                service=service_name,
+                method=method_name,
+                company=arg_dict.get("company_name"),
+            ):
+                result = func(self, *args, **kwargs)
 
             # Cache the result
-            cache_service.set(service_name, method_name, arg_dict, result, ttl)
+            entry_ttl, entry_stale_ttl = cache_service.resolve_ttl(
+                service_name, method_name, arg_dict, ttl, stale_ttl
+            )
+            cache_service.set(
+                service_name, method_name, arg_dict, result, entry_ttl, entry_stale_ttl
+            )
 
             return result
 
@@ -0,0 +1,67 @@
+import hashlib
+import inspect
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, Dict
+
+# Arguments holding company names are matched case- and whitespace-insensitively
+COMPANY_NAME_ARGS = {"company_name"}
+
+DIGEST_LENGTH = 32
+
+
+def normalize_company_name(company_name: str) -> str:
+    return " ".join(company_name.split()).casefold()
+
+
+def _normalize_value(name: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if name in COMPANY_NAME_ARGS and isinstance(value, str):
+        return normalize_company_name(value)
+    if isinstance(value, Enum):
+        return _normalize_value(name, value.value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (bool, int, float)):
+        return value
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, (list, tuple, set)):
+        return [_normalize_value(name, v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _normalize_value(str(k), v) for k, v in value.items()}
+    return str(value)
+
+
+def normalize_call_args(func: Callable, args: tuple, kwargs: dict) -> Dict[str, Any]:
+    """
+    Bind a method call (without `self`) to its signature with defaults applied and
+    normalize every value, so equivalent calls produce the same argument dict:
+    `f("Acme")` and `f("acme ", None, None, None, "year")` are the same call.
+    """
+    signature = inspect.signature(func)
+    bound = signature.bind(None, *args, **kwargs)
+    bound.apply_defaults()
+
+    normalized: Dict[str, Any] = {}
+    for i, (name, value) in enumerate(bound.arguments.items()):
+        if i == 0:
+            # Skip 'self'
+            continue
+        param = signature.parameters[name]
+        if param.kind is inspect.Parameter.VAR_KEYWORD:
+            for kw, kw_value in value.items():
+                normalized[kw] = _normalize_value(kw, kw_value)
+        else:
+            normalized[name] = _normalize_value(name, value)
+    return normalized
+
+
+def hash_args(args: Dict[str, Any]) -> str:
+    """Fixed-length digest of a normalized argument dict"""
+    canonical = json.dumps(args, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:DIGEST_LENGTH]
@@ -0,0 +1,26 @@
+import asyncio
+from datetime import timedelta
+
+from backend.services.cache import CacheService
+from backend.utils.logger import get_logger
+
+LOG = get_logger("CacheMaintenance")
+
+
+async def report_cache_expiry(cache_service: CacheService, interval: timedelta):
+    """
+    Log how many cache entries have expired, every `interval`, until cancelled.
+    Expired entries are removed by MongoDB's TTL index, so this only reports on them.
+    """
+    while True:
+        try:
+            report = await cache_service.areport_expiry()
+            LOG.info(
+                f"Cache expiry report: {report['mongo_expired']} of "
+                f"{report['mongo_entries']} MongoDB entries awaiting TTL removal, "
+                f"{report['memory_expired']} dropped from memory"
+            )
+        except Exception as e:
+            LOG.error(f"Error during cache expiry report: {e}")
+
+        await asyncio.sleep(interval.total_seconds())
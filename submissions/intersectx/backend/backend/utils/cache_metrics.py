@@ -0,0 +1,126 @@
+import bisect
+import threading
+from typing import Any, Dict, Optional
+
+# Upper bounds (in milliseconds) of the latency histogram buckets. Lookups land in
+# the low buckets, LLM-backed computations in the high ones.
+LATENCY_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1_000, 5_000, 10_000, 30_000, 60_000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram"""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{b}ms" for b in LATENCY_BUCKETS_MS] + ["inf"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else None,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class MethodCacheStats:
+    """Cache counters for a single `service:method`"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.stale_serves = 0
+        self.failures = 0
+        self.negative_hits = 0
+        self.bytes_stored = 0
+        self.max_entry_bytes = 0
+        self.lookup_latency = LatencyHistogram()
+        self.compute_latency = LatencyHistogram()
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "sets": self.sets,
+            "stale_serves": self.stale_serves,
+            "failures": self.failures,
+            "negative_hits": self.negative_hits,
+            "avg_entry_bytes": self.bytes_stored // self.sets if self.sets else None,
+            "max_entry_bytes": self.max_entry_bytes,
+            "lookup_latency": self.lookup_latency.to_dict(),
+            "compute_latency": self.compute_latency.to_dict(),
+        }
+
+
+class CacheMetrics:
+    """
+    Thread-safe cache counters, latency histograms and stored sizes, broken down
+    per `service:method`.
+    """
+
+    def __init__(self):
+        self._methods: Dict[str, MethodCacheStats] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def name(service_name: str, method_name: str) -> str:
+        return f"{service_name}:{method_name}"
+
+    def _get(self, name: str) -> MethodCacheStats:
+        stats = self._methods.get(name)
+        if stats is None:
+            stats = self._methods.setdefault(name, MethodCacheStats())
+        return stats
+
+    def record_lookup(self, name: str, hit: bool, seconds: Optional[float] = None):
+        with self._lock:
+            stats = self._get(name)
+            if hit:
+                stats.hits += 1
+            else:
+                stats.misses += 1
+            if seconds is not None:
+                stats.lookup_latency.observe(seconds)
+
+    def record_set(self, name: str, size_bytes: int) -> None:
+        with self._lock:
+            stats = self._get(name)
+            stats.sets += 1
+            stats.bytes_stored += size_bytes
+            stats.max_entry_bytes = max(stats.max_entry_bytes, size_bytes)
+
+    def record_stale_serve(self, name: str) -> None:
+        with self._lock:
+            self._get(name).stale_serves += 1
+
+    def record_failure(self, name: str) -> None:
+        with self._lock:
+            self._get(name).failures += 1
+
+    def record_negative_hit(self, name: str) -> None:
+        with self._lock:
+            self._get(name).negative_hits += 1
+
+    def record_compute(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._get(name).compute_latency.observe(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                name: stats.to_dict() for name, stats in sorted(self._methods.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._methods.clear()
@@ -0,0 +1,56 @@
+from fnmatch import fnmatchcase
+from typing import Any, Dict, List, Optional
+
+from backend.settings import CacheTTLPolicy
+
+# Built-in policies, checked after the ones from settings. Methods without a
+# matching policy use the ttl/stale_ttl given to `cacheable`.
+DEFAULT_TTL_POLICIES = [
+    # News goes stale within hours and must never be served past its TTL
+    CacheTTLPolicy(
+        service="NewsService", method="get_news", ttl_seconds=3 * 3600, stale_seconds=0
+    ),
+    # Funding rounds change monthly at most
+    CacheTTLPolicy(
+        service="FinanceService",
+        method="get_funding_history",
+        ttl_seconds=30 * 86400,
+        stale_seconds=7 * 86400,
+    ),
+]
+
+
+class CacheTTLPolicyRegistry:
+    """
+    Ordered table of TTL policies. A policy applies when its service and method
+    patterns match and every argument pattern matches the normalized argument
+    value (so company names are compared lower-cased).
+    """
+
+    def __init__(self, policies: Optional[List[CacheTTLPolicy]] = None):
+        self.policies = list(policies or []) + DEFAULT_TTL_POLICIES
+
+    @staticmethod
+    def _matches(
+        policy: CacheTTLPolicy,
+        service_name: str,
+        method_name: str,
+        args: Dict[str, Any],
+    ) -> bool:
+        return (
+            fnmatchcase(service_name, policy.service)
+            and fnmatchcase(method_name, policy.method)
+            and all(
+                name in args and fnmatchcase(str(args[name]), pattern)
+                for name, pattern in policy.args.items()
+            )
+        )
+
+    def resolve(
+        self, service_name: str, method_name: str, args: Dict[str, Any]
+    ) -> Optional[CacheTTLPolicy]:
+        """The first policy matching this call, if any"""
+        for policy in self.policies:
+            if self._matches(policy, service_name, method_name, args):
+                return policy
+        return None
@@ -50,9 +50,9 @@ def exception_handler(request: Request, exc: ServiceException):
     )
 
     return JSONResponse(
-        status_code=exc.get_code(exc.reason.name),
+        status_code=exc.get_code(exc.status.name),
         content={
-            "http_code": exc.get_code(exc.reason.name),
+            "http_code": exc.get_code(exc.status.name),
             "status": exc.status.value,
             "message": exc.message,
             "details": exc.details if exc.details else None,
@@ -1,10 +1,29 @@
-from agno.agent import Agent
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
 from pprint import pprint
+from typing import Any, AsyncIterator, Dict, Hashable, List, Optional, Tuple
 
+import httpx
+from agno.agent import Agent
+from agno.exceptions import ModelProviderError
+from agno.models.message import Message
 from dotenv import load_dotenv
+from openai import AsyncAzureOpenAI, AsyncOpenAI, OpenAI
+from openai import AzureOpenAI as AzureOpenAIClient
 
 from backend.models.response.finance import RevenueAnalysisResponse
-from backend.settings import LLMConfig, SonarConfig, get_app_settings
+from backend.settings import LLMConfig, RateLimitConfig, SonarConfig, get_app_settings
+from backend.utils.llm_usage import LLMUsageMeter
+from backend.utils.logger import get_logger
+from backend.utils.rate_limit import (
+    LLMGovernor,
+    RateLimiter,
+    estimate_tokens,
+    jittered,
+    queued,
+)
 
 from agno.models.azure import AzureOpenAI
 from agno.models.perplexity import Perplexity
@@ -12,20 +31,342 @@ from agno.embedder.azure_openai import AzureOpenAIEmbedder
 from backend.settings import VectorStoreConfig
 
 
+LOG = get_logger("LLM")
+
+# Completion tokens reserved for calls that don't set `max_tokens`
+DEFAULT_COMPLETION_TOKENS = 1024
+
+# Keep-alive limits of the HTTP client shared by every model on an event loop
+HTTP_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=20, keepalive_expiry=60
+)
+
+# httpx connections belong to the event loop that opened them, so each loop
+# gets its own shared client (and each model its own SDK client per loop)
+_http_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+_clients_lock = threading.Lock()
+_models: Dict[Hashable, Any] = {}
+_models_lock = threading.Lock()
+
+
+def _forget_closed_loops(clients: Dict[asyncio.AbstractEventLoop, Any]) -> None:
+    for loop in [loop for loop in clients if loop.is_closed()]:
+        del clients[loop]
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """The running loop's shared async HTTP client, so LLM calls reuse warm connections"""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _http_clients.get(loop)
+        if client is None or client.is_closed:
+            _forget_closed_loops(_http_clients)
+            client = _http_clients[loop] = httpx.AsyncClient(limits=HTTP_LIMITS)
+        return client
+
+
+async def aclose_http_client() -> None:
+    """Close the running loop's shared HTTP client and the model clients using it"""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _http_clients.pop(loop, None)
+        _forget_closed_loops(_http_clients)
+    with _models_lock:
+        models = list(_models.values())
+    for model in models:
+        with _clients_lock:
+            model.async_clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+
+
+def _retry_after(error: ModelProviderError) -> Optional[float]:
+    """The retry-after (in seconds) of the provider response behind an error"""
+    headers = getattr(getattr(error.__cause__, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+
+def _usage_tokens(usage: Any) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    """Total, prompt and cached prompt tokens of an OpenAI-style usage report"""
+    if usage is None:
+        return None, None, None
+    details = getattr(usage, "prompt_tokens_details", None)
+    return (
+        getattr(usage, "total_tokens", None),
+        getattr(usage, "prompt_tokens", None),
+        getattr(details, "cached_tokens", None),
+    )
+
+
+class RateLimitedModel:
+    """
+    Mixin routing a model's calls through its provider's rate limiter (see
+    `backend.utils.rate_limit`): calls wait for quota in their priority lane, the
+    reported usage settles the token estimate (failed calls give it back), and
+    429s and server errors are retried with jittered backoff. The SDK's own
+    retries are turned off so they don't stack on top of these.
+
+    Every call's usage and latency is also counted in the `LLMUsageMeter`, under
+    the usage tags of the caller (see `backend.utils.llm_usage`).
+    """
+
+    rate_limit_key: Optional[str]
+    rate_limit: Optional[RateLimitConfig]
+
+    def _rate_limiter(self) -> Optional[RateLimiter]:
+        if self.rate_limit is None:
+            return None
+        return LLMGovernor.limiter(self.rate_limit_key or self.id, self.rate_limit)
+
+    def _estimate_tokens(self, messages: List[Message]) -> int:
+        prompt = sum(estimate_tokens(message.content) for message in messages)
+        return prompt + (self.max_tokens or DEFAULT_COMPLETION_TOKENS)
+
+    def _async_client_params(self) -> Dict[str, Any]:
+        client_params = self._get_client_params()
+        client_params["http_client"] = get_async_http_client()
+        client_params["max_retries"] = 0
+        return client_params
+
+    def _loop_async_client(self, client_class):
+        """This model's async client for the running loop, on its shared HTTP client"""
+        loop = asyncio.get_running_loop()
+        client = self.async_clients.get(loop)
+        if client is None:
+            client = client_class(**self._async_client_params())
+            with _clients_lock:
+                _forget_closed_loops(self.async_clients)
+                client = self.async_clients.setdefault(loop, client)
+        return client
+
+    def _client_params(self) -> Dict[str, Any]:
+        client_params = self._get_client_params()
+        if self.http_client is not None:
+            client_params["http_client"] = self.http_client
+        client_params["max_retries"] = 0
+        return client_params
+
+    def _record_call(self, usage: Any, started: float) -> None:
+        _, prompt_tokens, cached_tokens = _usage_tokens(usage)
+        LLMUsageMeter.record(
+            provider=self.provider or self.name,
+            model=self.id,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=getattr(usage, "completion_tokens", None),
+            cached_tokens=cached_tokens,
+            latency_seconds=time.perf_counter() - started,
+        )
+
+    def _retry_wait(
+        self, limiter: RateLimiter, error: BaseException, attempt: int
+    ) -> Optional[float]:
+        """How long to wait before retrying a failed call, or None to give up"""
+        if not isinstance(error, ModelProviderError):
+            return None
+        retryable = error.status_code == 429 or error.status_code >= 500
+        if not retryable or attempt >= limiter.config.max_retries:
+            return None
+        if error.status_code == 429:
+            return limiter.pause(_retry_after(error), attempt)
+        wait = jittered(min(2**attempt, limiter.config.retry_max_seconds))
+        LOG.warning(f"{limiter.name} call failed ({error}), retrying in {wait:.1f}s")
+        return wait
+
+    def invoke(self, messages: List[Message], *args, **kwargs) -> Any:
+        # Sync calls block their thread while waiting for quota
+        limiter = self._rate_limiter()
+        if limiter is None:
+            started = time.perf_counter()
+            response = super().invoke(messages, *args, **kwargs)
+            self._record_call(getattr(response, "usage", None), started)
+            return response
+
+        estimated = self._estimate_tokens(messages)
+        attempt = 0
+        while True:
+            limiter.acquire_blocking(estimated)
+            started = time.perf_counter()
+            try:
+                response = super().invoke(messages, *args, **kwargs)
+            except BaseException as e:
+                limiter.release(estimated)
+                wait = self._retry_wait(limiter, e, attempt)
+                if wait is None:
+                    raise
+                attempt += 1
+                time.sleep(wait)
+                continue
+
+            usage = getattr(response, "usage", None)
+            limiter.record_usage(estimated, *_usage_tokens(usage))
+            self._record_call(usage, started)
+            return response
+
+    async def ainvoke(self, messages: List[Message], *args, **kwargs) -> Any:
+        limiter = self._rate_limiter()
+        if limiter is None:
+            started = time.perf_counter()
+            response = await super().ainvoke(messages, *args, **kwargs)
+            self._record_call(getattr(response, "usage", None), started)
+            return response
+
+        estimated = self._estimate_tokens(messages)
+        attempt = 0
+        while True:
+            await limiter.acquire(estimated)
+            started = time.perf_counter()
+            try:
+                response = await super().ainvoke(messages, *args, **kwargs)
+            except BaseException as e:
+                limiter.release(estimated)
+                wait = self._retry_wait(limiter, e, attempt)
+                if wait is None:
+                    raise
+                attempt += 1
+                with queued():
+                    await asyncio.sleep(wait)
+                continue
+
+            usage = getattr(response, "usage", None)
+            limiter.record_usage(estimated, *_usage_tokens(usage))
+            self._record_call(usage, started)
+            return response
+
+    async def ainvoke_stream(
+        self, messages: List[Message], *args, **kwargs
+    ) -> AsyncIterator[Any]:
+        # Streams are retried like other calls until their first chunk is yielded
+        limiter = self._rate_limiter()
+        estimated = self._estimate_tokens(messages)
+        attempt = 0
+        while True:
+            if limiter is not None:
+                await limiter.acquire(estimated)
+            started = time.perf_counter()
+            usage = None
+            streamed = False
+            try:
+                async for chunk in super().ainvoke_stream(messages, *args, **kwargs):
+                    # With `include_usage`, the last chunk reports the usage of the stream
+                    usage = getattr(chunk, "usage", None) or usage
+                    streamed = True
+                    yield chunk
+            except BaseException as e:
+                # A stream cut off midway has used an unknown part of its estimate
+                if limiter is None or streamed:
+                    raise
+                limiter.release(estimated)
+                wait = self._retry_wait(limiter, e, attempt)
+                if wait is None:
+                    raise
+                attempt += 1
+                with queued():
+                    await asyncio.sleep(wait)
+                continue
+
+            if limiter is not None:
+                limiter.record_usage(estimated, *_usage_tokens(usage))
+            self._record_call(usage, started)
+            return
+
+
+@dataclass
+class SharedAzureOpenAI(RateLimitedModel, AzureOpenAI):
+    """
+    AzureOpenAI whose async clients (one per event loop) run on the loop's shared
+    HTTP client, and whose clients leave retries to `RateLimitedModel`
+    """
+
+    rate_limit_key: Optional[str] = None
+    rate_limit: Optional[RateLimitConfig] = None
+    async_clients: Dict[asyncio.AbstractEventLoop, AsyncAzureOpenAI] = field(
+        default_factory=dict
+    )
+
+    def get_client(self) -> AzureOpenAIClient:
+        if self.client is None or self.client.is_closed():
+            self.client = AzureOpenAIClient(**self._client_params())
+        return self.client
+
+    def get_async_client(self) -> AsyncAzureOpenAI:
+        return self._loop_async_client(AsyncAzureOpenAI)
+
+
+@dataclass
+class SharedPerplexity(RateLimitedModel, Perplexity):
+    """
+    Perplexity whose clients are created once, the async ones once per event loop
+    on the loop's shared HTTP client. The stock model builds a new client (and connection pool) for every
+    call.
+    """
+
+    client: Optional[OpenAI] = None
+    rate_limit_key: Optional[str] = None
+    rate_limit: Optional[RateLimitConfig] = None
+    async_clients: Dict[asyncio.AbstractEventLoop, AsyncOpenAI] = field(
+        default_factory=dict
+    )
+
+    def get_client(self) -> OpenAI:
+        if self.client is None or self.client.is_closed():
+            self.client = OpenAI(**self._client_params())
+        return self.client
+
+    def get_async_client(self) -> AsyncOpenAI:
+        return self._loop_async_client(AsyncOpenAI)
+
+
+def _get_or_create_model(key: Hashable, factory):
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            model = _models[key] = factory()
+        return model
+
+
 def get_model(llm_config: LLMConfig) -> AzureOpenAI:
-    return AzureOpenAI(
-        id="gpt-4o",
-        api_key=llm_config.api_key,
-        azure_endpoint=llm_config.api_base,
-        azure_deployment=llm_config.llm_deployment_name,
+    """
+    The gpt-4o model for these settings. Models pass tools and response formats
+    per call, so one instance (and its client) is shared by the whole process.
+    """
+    return _get_or_create_model(
+        (
+            "azure",
+            llm_config.api_key,
+            llm_config.api_base,
+            llm_config.llm_deployment_name,
+        ),
+        lambda: SharedAzureOpenAI(
+            id="gpt-4o",
+            api_key=llm_config.api_key,
+            azure_endpoint=llm_config.api_base,
+            azure_deployment=llm_config.llm_deployment_name,
+            rate_limit_key=f"azure:{llm_config.llm_deployment_name}",
+            rate_limit=llm_config.rate_limit,
+        ),
     )
 
 
 def get_sonar_model(sonar_config: SonarConfig) -> Perplexity:
-    return Perplexity(
-        id="sonar-pro",
-        base_url=sonar_config.base_url,
-        api_key=sonar_config.api_key,
+    """The shared sonar-pro model for these settings"""
+    return _get_or_create_model(
+        ("sonar", sonar_config.api_key, sonar_config.base_url),
+        lambda: SharedPerplexity(
+            id="sonar-pro",
+            base_url=sonar_config.base_url,
+            api_key=sonar_config.api_key,
+            rate_limit_key="perplexity:sonar-pro",
+            rate_limit=sonar_config.rate_limit,
+        ),
     )
 
 
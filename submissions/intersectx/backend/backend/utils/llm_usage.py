@@ -0,0 +1,179 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Tags an LLM call's usage is recorded under, in the order of the stored keys
+USAGE_TAGS = ("service", "method", "section", "company", "user")
+UNTAGGED = "-"
+# Response headers reporting the LLM usage of a request
+USAGE_HEADERS = (
+    "X-LLM-Calls",
+    "X-LLM-Prompt-Tokens",
+    "X-LLM-Completion-Tokens",
+    "X-LLM-Cached-Tokens",
+    "X-LLM-Cost-USD",
+)
+
+_tags: ContextVar[Dict[str, str]] = ContextVar("llm_usage_tags", default={})
+
+
+class LLMUsageScope:
+    """
+    The LLM usage of one API request, across every task it starts. Tags set on
+    the scope (e.g. the user, once authenticated) apply to all of its calls.
+    """
+
+    def __init__(self, **tags: Optional[str]):
+        self.tags: Dict[str, str] = {k: v for k, v in tags.items() if v is not None}
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.cost = 0.0
+        self.latency_seconds = 0.0
+
+    def headers(self) -> Dict[str, str]:
+        values = (
+            self.calls,
+            self.prompt_tokens,
+            self.completion_tokens,
+            self.cached_tokens,
+            f"{self.cost:.6f}",
+        )
+        return {name: str(value) for name, value in zip(USAGE_HEADERS, values)}
+
+
+_scope: ContextVar[Optional[LLMUsageScope]] = ContextVar(
+    "llm_usage_scope", default=None
+)
+
+
+@contextmanager
+def llm_usage_tags(**tags: Optional[str]) -> Iterator[None]:
+    """Tag the LLM calls made in this scope (and the tasks it starts)"""
+    token = _tags.set(
+        {**_tags.get(), **{k: v for k, v in tags.items() if v is not None}}
+    )
+    try:
+        yield
+    finally:
+        _tags.reset(token)
+
+
+@contextmanager
+def llm_usage_scope(**tags: Optional[str]) -> Iterator[LLMUsageScope]:
+    """Total the LLM usage of the calls made in this scope (and the tasks it starts)"""
+    scope = LLMUsageScope(**tags)
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+
+
+def tag_llm_usage_scope(**tags: Optional[str]) -> None:
+    """
+    Tag the calls of the current usage scope, if any. Unlike `llm_usage_tags` this
+    changes the shared scope, so it also works from dependencies FastAPI runs in
+    a copied context.
+    """
+    scope = _scope.get()
+    if scope is not None:
+        scope.tags.update({k: v for k, v in tags.items() if v is not None})
+
+
+class LLMUsageMeter:
+    """
+    Process-wide LLM usage counters, per hour and per provider, model and tags,
+    until `drain` hands them over to be stored. Costs use the per-model prices
+    (USD per million tokens) set with `set_prices`.
+    """
+
+    _pending: Dict[Tuple, Dict[str, float]] = {}
+    _prices: Dict[str, Dict[str, float]] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def set_prices(cls, prices: Dict[str, Dict[str, float]]) -> None:
+        cls._prices = prices
+
+    @classmethod
+    def cost(
+        cls, model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int
+    ) -> float:
+        prices = cls._prices.get(model)
+        if not prices:
+            return 0.0
+        prompt_price = prices.get("prompt", 0.0)
+        uncached = prompt_tokens - cached_tokens
+        return (
+            uncached * prompt_price
+            + cached_tokens * prices.get("cached_prompt", prompt_price)
+            + completion_tokens * prices.get("completion", 0.0)
+        ) / 1_000_000
+
+    @classmethod
+    def record(
+        cls,
+        provider: str,
+        model: str,
+        prompt_tokens: Optional[int],
+        completion_tokens: Optional[int],
+        cached_tokens: Optional[int],
+        latency_seconds: float,
+    ) -> None:
+        """Count one LLM call under the current tags"""
+        prompt_tokens = prompt_tokens or 0
+        completion_tokens = completion_tokens or 0
+        cached_tokens = cached_tokens or 0
+        cost = cls.cost(model, prompt_tokens, completion_tokens, cached_tokens)
+
+        scope = _scope.get()
+        tags = {**(scope.tags if scope else {}), **_tags.get()}
+        hour = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        key = (hour, provider, model) + tuple(
+            tags.get(tag, UNTAGGED) for tag in USAGE_TAGS
+        )
+        with cls._lock:
+            counters = cls._pending.setdefault(key, {})
+            for name, value in (
+                ("calls", 1),
+                ("prompt_tokens", prompt_tokens),
+                ("completion_tokens", completion_tokens),
+                ("cached_tokens", cached_tokens),
+                ("cost", cost),
+                ("latency_seconds", latency_seconds),
+            ):
+                counters[name] = counters.get(name, 0) + value
+
+        if scope is not None:
+            scope.calls += 1
+            scope.prompt_tokens += prompt_tokens
+            scope.completion_tokens += completion_tokens
+            scope.cached_tokens += cached_tokens
+            scope.cost += cost
+            scope.latency_seconds += latency_seconds
+
+    @classmethod
+    def drain(cls) -> List[Tuple[Dict[str, Any], Dict[str, float]]]:
+        """Take the pending counters, as (key fields, counters) pairs"""
+        with cls._lock:
+            pending, cls._pending = cls._pending, {}
+        return [
+            (dict(zip(("hour", "provider", "model") + USAGE_TAGS, key)), counters)
+            for key, counters in pending.items()
+        ]
+
+    @classmethod
+    def restore(cls, drained: List[Tuple[Dict[str, Any], Dict[str, float]]]) -> None:
+        """Put back counters that could not be stored, to be retried"""
+        with cls._lock:
+            for fields, counters in drained:
+                key = tuple(
+                    fields[name] for name in ("hour", "provider", "model") + USAGE_TAGS
+                )
+                pending = cls._pending.setdefault(key, {})
+                for name, value in counters.items():
+                    pending[name] = pending.get(name, 0) + value
@@ -0,0 +1,77 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+
+class MemoryCache:
+    """
+    Bounded, thread-safe in-process LRU cache.
+
+    Every entry carries its own deadline, capped at `max_ttl` from the moment it was
+    stored, so a local copy never outlives the entry it mirrors.
+    """
+
+    def __init__(
+        self, max_entries: int = 1024, max_ttl: timedelta = timedelta(minutes=5)
+    ):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[str, tuple[datetime, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        now = datetime.utcnow()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+
+            expires_at, value = item
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, expires_at: Optional[datetime] = None) -> None:
+        if self.max_entries <= 0:
+            return
+
+        local_expiry = datetime.utcnow() + self.max_ttl
+        if expires_at is not None:
+            local_expiry = min(local_expiry, expires_at)
+
+        with self._lock:
+            self._entries[key] = (local_expiry, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[Any], bool]) -> int:
+        """Delete every entry whose value matches `predicate`"""
+        with self._lock:
+            keys = [k for k, (_, value) in self._entries.items() if predicate(value)]
+            for k in keys:
+                del self._entries[k]
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def clear_expired(self) -> int:
+        now = datetime.utcnow()
+        with self._lock:
+            keys = [k for k, (exp, _) in self._entries.items() if exp <= now]
+            for k in keys:
+                del self._entries[k]
+        return len(keys)
@@ -0,0 +1,288 @@
+import json
+import re
+import types
+from typing import Any, Optional, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel, ValidationError
+
+from backend.utils.logger import get_logger
+
+LOG = get_logger("OutputParsing")
+
+_FENCED_BLOCK = re.compile(r"```(?:json|JSON)?\s*\n?(.*?)```", re.DOTALL)
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_KEY_VALUE_LINE = re.compile(
+    r"^\s*(?:[-*+]|\d+[.)])?\s*\**\s*([A-Za-z][\w \-/()]{0,60}?)\s*\**\s*:\s*\**\s*(.+?)\s*$"
+)
+_NUMBER = re.compile(
+    r"^(?P<sign>-)?\s*[$€£]?\s*(?P<num>\d[\d,]*(?:\.\d+)?)\s*(?P<suffix>[KkMmBbTt%]?)\b"
+)
+_SUFFIX_MULTIPLIERS = {"k": 1e3, "m": 1e6, "b": 1e9, "t": 1e12}
+
+# Share of the model's fields that markdown/key-value text must fill to be accepted,
+# so a few stray `key: value` lines don't beat the LLM parser with a sparse model
+MIN_MARKDOWN_FIELD_COVERAGE = 0.5
+
+# The last line of the analysis agents' instructions: free text for the output
+# parser, or the response model's JSON in single-pass (structured output) mode
+TEXT_OUTPUT_INSTRUCTION = (
+    "Output should be a detailed textual description of all these fields and "
+    "their values."
+)
+STRUCTURED_OUTPUT_INSTRUCTION = (
+    "Output only the JSON object of the response schema, with all these fields "
+    "and their values."
+)
+
+
+def with_output_instruction(instructions: str, structured_output: bool) -> str:
+    """Close an analysis agent's instructions with the output format it answers in"""
+    output = (
+        STRUCTURED_OUTPUT_INSTRUCTION if structured_output else TEXT_OUTPUT_INSTRUCTION
+    )
+    return f"{instructions.rstrip()}\n{output}"
+
+
+def extract_json_candidates(text: str) -> list[str]:
+    """
+    JSON-looking spans in LLM output: fenced code blocks first, then the text from
+    the first `{` or `[` to its last closing bracket (or to the end, if truncated).
+    """
+    candidates = [block.strip() for block in _FENCED_BLOCK.findall(text)]
+
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if starts:
+        start = min(starts)
+        end = max(text.rfind("}"), text.rfind("]"))
+        candidates.append(text[start : end + 1] if end > start else text[start:])
+
+    return [c for c in dict.fromkeys(candidates) if c]
+
+
+def repair_json(text: str) -> str:
+    """
+    Tolerantly repair common defects in LLM-written JSON: smart and single quotes,
+    Python literals, unquoted keys, trailing commas, raw newlines in strings,
+    stray closing brackets and output truncated before its closing brackets.
+    """
+    text = text.translate(_SMART_QUOTES)
+    out: list[str] = []
+    stack: list[str] = []
+    quote: Optional[str] = None
+    i, n = 0, len(text)
+
+    while i < n:
+        c = text[i]
+        if quote:
+            if c == "\\" and i + 1 < n:
+                out.append("'" if text[i + 1] == "'" else text[i : i + 2])
+                i += 2
+                continue
+            if c == quote:
+                out.append('"')
+                quote = None
+            elif c == '"':
+                out.append('\\"')
+            elif c == "\n":
+                out.append("\\n")
+            else:
+                out.append(c)
+            i += 1
+            continue
+
+        if c in "\"'":
+            quote = c
+            out.append('"')
+        elif c in "{[":
+            stack.append("}" if c == "{" else "]")
+            out.append(c)
+        elif c in "}]":
+            if stack and stack[-1] == c:
+                stack.pop()
+                out.append(c)
+        elif c.isalpha() or c == "_":
+            word = re.match(r"[A-Za-z_][\w-]*", text[i:]).group(0)
+            i += len(word)
+            if re.match(r"\s*:", text[i:]):
+                out.append(f'"{word}"')
+            else:
+                out.append(_LITERALS.get(word, word))
+            continue
+        else:
+            out.append(c)
+        i += 1
+
+    if quote:
+        out.append('"')
+
+    repaired = "".join(out).rstrip()
+    if stack:
+        # Drop a dangling key or separator left by truncation before closing up
+        repaired = re.sub(r'(,?\s*"[^"]*"\s*:|:|,)\s*$', "", repaired)
+        repaired += "".join(reversed(stack))
+    return re.sub(r",(\s*[}\]])", r"\1", repaired)
+
+
+def _normalize_key(key: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", key.strip().strip("*_`").lower()).strip("_")
+
+
+def _clean_value(value: str) -> Optional[str]:
+    """Strip markdown emphasis; placeholders like "N/A" become None"""
+    value = value.strip().strip("*_`").strip()
+    if value.lower() in ("n/a", "na", "none", "null", "-", ""):
+        return None
+    return value
+
+
+def _parse_number(value: str) -> Any:
+    """Numbers written like "$1.2B", "1,200" or "35%" as floats; anything else as is"""
+    match = _NUMBER.match(value)
+    if match and match.end() >= len(value.rstrip(".")) - 1:
+        number = float(match.group("num").replace(",", ""))
+        number *= _SUFFIX_MULTIPLIERS.get(match.group("suffix").lower(), 1)
+        return -number if match.group("sign") else number
+    return value
+
+
+def _unwrap_optional(annotation: Any) -> Any:
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def parse_markdown_tables(text: str) -> list[list[dict[str, Any]]]:
+    """Every markdown table in the text, as a list of rows keyed by normalized header"""
+    tables = []
+    lines = [line.strip() for line in text.splitlines()]
+    i = 0
+    while i < len(lines) - 1:
+        is_header = lines[i].startswith("|") and re.match(
+            r"^\|?\s*:?-{2,}", lines[i + 1]
+        )
+        if not is_header:
+            i += 1
+            continue
+
+        headers = [_normalize_key(h) for h in lines[i].strip("|").split("|")]
+        rows = []
+        i += 2
+        while i < len(lines) and lines[i].startswith("|"):
+            cells = [_clean_value(c) for c in lines[i].strip("|").split("|")]
+            rows.append(dict(zip(headers, cells)))
+            i += 1
+        tables.append(rows)
+    return tables
+
+
+def parse_key_values(text: str) -> dict[str, Any]:
+    """`key: value` lines (optionally bulleted or bold) keyed by normalized key"""
+    values = {}
+    for line in text.splitlines():
+        if line.strip().startswith("|"):
+            continue
+        match = _KEY_VALUE_LINE.match(line)
+        if match:
+            values.setdefault(
+                _normalize_key(match.group(1)), _clean_value(match.group(2))
+            )
+    return values
+
+
+def _list_item_model(annotation: Any) -> Optional[Type[BaseModel]]:
+    """The item model of `list[Model]` / `Optional[list[Model]]` annotations"""
+    if get_origin(annotation) in (Union, types.UnionType):
+        for arg in get_args(annotation):
+            item_model = _list_item_model(arg)
+            if item_model is not None:
+                return item_model
+        return None
+
+    if get_origin(annotation) is list:
+        (item,) = get_args(annotation) or (None,)
+        if isinstance(item, type) and issubclass(item, BaseModel):
+            return item
+    return None
+
+
+def _field_names(model: Type[BaseModel]) -> dict[str, str]:
+    """Normalized field name/alias -> field name"""
+    names = {}
+    for name, field in model.model_fields.items():
+        names[_normalize_key(name)] = name
+        if field.alias:
+            names[_normalize_key(field.alias)] = name
+    return names
+
+
+def _map_values(values: dict[str, Any], model: Type[BaseModel]) -> dict[str, Any]:
+    """Values keyed by normalized key, mapped onto the model's fields"""
+    names = _field_names(model)
+    data = {}
+    for key, value in values.items():
+        if key not in names or value is None:
+            continue
+        name = names[key]
+        if _unwrap_optional(model.model_fields[name].annotation) in (int, float):
+            value = _parse_number(value)
+        data[name] = value
+    return data
+
+
+def map_text_to_model(text: str, response_model: Type[BaseModel]) -> dict[str, Any]:
+    """
+    Map markdown tables and `key: value` lines onto the response model's fields:
+    scalar fields from matching keys, `list[Model]` fields from the table whose
+    headers best match the item model.
+    """
+    data = _map_values(parse_key_values(text), response_model)
+
+    tables = [rows for rows in parse_markdown_tables(text) if rows]
+    for name, field in response_model.model_fields.items():
+        item_model = _list_item_model(field.annotation)
+        if item_model is None or not tables:
+            continue
+
+        item_names = set(_field_names(item_model))
+        best = max(tables, key=lambda rows: len(set(rows[0]) & item_names))
+        if set(best[0]) & item_names:
+            data[name] = [_map_values(row, item_model) for row in best]
+    return data
+
+
+def _validate(data: Any, response_model: Type[BaseModel]) -> Optional[BaseModel]:
+    try:
+        return response_model.model_validate(data)
+    except ValidationError:
+        return None
+
+
+def parse_locally(
+    text: str, response_model: Type[BaseModel]
+) -> tuple[Optional[BaseModel], Optional[str]]:
+    """
+    Try to build the response model from LLM output without calling an LLM.
+    Returns the parsed model and the path that produced it (`json`,
+    `repaired_json` or `markdown`), or (None, None).
+    """
+    for candidate in extract_json_candidates(text):
+        for path, raw in (("json", candidate), ("repaired_json", None)):
+            try:
+                data = json.loads(raw if raw is not None else repair_json(candidate))
+            except ValueError:
+                continue
+            parsed = _validate(data, response_model)
+            if parsed is not None:
+                return parsed, path
+
+    data = map_text_to_model(text, response_model)
+    coverage = len(data) / max(len(response_model.model_fields), 1)
+    if coverage >= MIN_MARKDOWN_FIELD_COVERAGE:
+        parsed = _validate(data, response_model)
+        if parsed is not None:
+            return parsed, "markdown"
+
+    return None, None
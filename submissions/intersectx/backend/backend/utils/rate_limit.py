@@ -0,0 +1,384 @@
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, Awaitable, Dict, Iterator, List, Optional, TypeVar
+
+from backend.settings import RateLimitConfig
+from backend.utils.logger import get_logger
+
+LOG = get_logger("RateLimit")
+
+# Rough characters per token, for estimating prompts before they are sent
+CHARS_PER_TOKEN = 4
+
+# Spread of the random delay added to retry-after waits, so the callers a 429
+# paused don't all retry in the same instant
+RETRY_JITTER = 0.25
+
+# How often a blocked sync caller checks back while async callers are queued
+SYNC_POLL_SECONDS = 0.1
+
+
+class Priority(IntEnum):
+    """Lanes for LLM calls; lower values are served first"""
+
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+_priority: ContextVar[Priority] = ContextVar(
+    "llm_priority", default=Priority.INTERACTIVE
+)
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+@contextmanager
+def llm_priority(priority: Priority) -> Iterator[None]:
+    """Run the LLM calls made in this scope (and the tasks it starts) in a lane"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+T = TypeVar("T")
+
+
+class QueueClock:
+    """How long the LLM calls of a scope spent queued for quota or backing off"""
+
+    def __init__(self):
+        self._seconds = 0.0
+        self._waiting = 0
+        self._since = 0.0
+
+    def start(self) -> None:
+        if self._waiting == 0:
+            self._since = time.monotonic()
+        self._waiting += 1
+
+    def stop(self) -> None:
+        self._waiting -= 1
+        if self._waiting == 0:
+            self._seconds += time.monotonic() - self._since
+
+    def seconds(self) -> float:
+        """Queued time so far, a wait still in progress included"""
+        if self._waiting:
+            return self._seconds + time.monotonic() - self._since
+        return self._seconds
+
+
+_queue_clock: ContextVar[Optional[QueueClock]] = ContextVar(
+    "llm_queue_clock", default=None
+)
+
+
+@contextmanager
+def queued() -> Iterator[None]:
+    """Count the time spent in this scope as queued, for `wait_for_unqueued`"""
+    clock = _queue_clock.get()
+    if clock is None:
+        yield
+        return
+    clock.start()
+    try:
+        yield
+    finally:
+        clock.stop()
+
+
+async def wait_for_unqueued(aw: Awaitable[T], timeout: float) -> T:
+    """
+    Like `asyncio.wait_for`, but the time its LLM calls spend queued in a rate
+    limiter (or backing off after a 429) doesn't count against `timeout`, so
+    work is only dropped for being slow, not for waiting its turn.
+    """
+    clock = QueueClock()
+    token = _queue_clock.set(clock)
+    try:
+        task = asyncio.ensure_future(aw)
+    finally:
+        _queue_clock.reset(token)
+
+    started = time.monotonic()
+    try:
+        while not task.done():
+            remaining = timeout - (time.monotonic() - started - clock.seconds())
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+            await asyncio.wait({task}, timeout=remaining)
+        return task.result()
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+def estimate_tokens(text: Any) -> int:
+    return len(str(text or "")) // CHARS_PER_TOKEN + 1
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def jittered(seconds: float) -> float:
+    return seconds * (1 + random.uniform(0, RETRY_JITTER))
+
+
+class TokenBucket:
+    """A bucket of `capacity` units, refilled continuously over a minute"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def consume(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level -= amount
+
+    def refund(self, amount: float) -> None:
+        self.level = min(self.capacity, self.level + amount)
+
+
+class RateLimiter:
+    """
+    Request and token buckets for one provider/deployment. Callers queue by
+    priority lane, then arrival; the head of the queue is admitted as soon as both
+    buckets can cover its estimated tokens. A 429 pauses the whole limiter for the
+    provider's retry-after. Sync callers (from worker threads) take the quota the
+    queued async callers leave, so the buckets are guarded by a lock.
+
+    Futures and timers belong to the loop that made them, so each running event
+    loop queues its callers separately; all of them draw from the same buckets.
+    """
+
+    def __init__(self, name: str, config: RateLimitConfig):
+        self.name = name
+        self.config = config
+        self.requests = TokenBucket(config.requests_per_minute)
+        self.tokens = TokenBucket(config.tokens_per_minute)
+        self.paused_until = 0.0
+        self._waiters: Dict[asyncio.AbstractEventLoop, List[tuple]] = {}
+        self._timers: Dict[asyncio.AbstractEventLoop, asyncio.TimerHandle] = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, float] = {
+            "admitted": 0,
+            "rate_limited": 0,
+            "estimated_tokens": 0,
+            "actual_tokens": 0,
+            "prompt_tokens": 0,
+            "cached_prompt_tokens": 0,
+            "wait_seconds": 0.0,
+        }
+
+    def _wait_time(self, tokens: int, now: float) -> float:
+        return max(
+            self.paused_until - now,
+            self.requests.wait_time(1, now),
+            self.tokens.wait_time(tokens, now),
+        )
+
+    def _admit(self, tokens: int, now: float) -> None:
+        self.requests.consume(1, now)
+        self.tokens.consume(tokens, now)
+
+    def _queued_count(self) -> int:
+        return sum(
+            1
+            for waiters in self._waiters.values()
+            for *_, future in waiters
+            if not future.done()
+        )
+
+    def _drop_closed_loops(self) -> None:
+        for loop in [loop for loop in self._waiters if loop.is_closed()]:
+            del self._waiters[loop]
+            self._timers.pop(loop, None)
+
+    def _dispatch(self) -> None:
+        """Admit the running loop's queued callers that fit in the quota"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._timers.pop(loop, None)
+            waiters = self._waiters.get(loop, [])
+            now = time.monotonic()
+            while waiters:
+                _, _, tokens, future = waiters[0]
+                if future.done():
+                    # The caller was cancelled while queued
+                    heapq.heappop(waiters)
+                    continue
+
+                wait = self._wait_time(tokens, now)
+                if wait > 0:
+                    self._timers[loop] = loop.call_later(wait, self._dispatch)
+                    return
+
+                heapq.heappop(waiters)
+                self._admit(tokens, now)
+                future.set_result(None)
+            self._waiters.pop(loop, None)
+
+    async def acquire(self, tokens: int, priority: Optional[Priority] = None) -> None:
+        """Wait until a call estimated at `tokens` tokens fits in the quota"""
+        priority = current_priority() if priority is None else priority
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            self._drop_closed_loops()
+            heapq.heappush(
+                self._waiters.setdefault(loop, []),
+                (priority, next(self._sequence), tokens, future),
+            )
+            # The new caller may outrank (or need less than) the one the timer waits for
+            timer = self._timers.pop(loop, None)
+        started = time.monotonic()
+        if timer is not None:
+            timer.cancel()
+        self._dispatch()
+        try:
+            with queued():
+                await future
+        finally:
+            if not future.done():
+                future.cancel()
+        self._count_admitted(tokens, started)
+
+    def acquire_blocking(self, tokens: int) -> None:
+        """
+        Block until a sync call estimated at `tokens` tokens fits in the quota.
+        Sync callers don't queue: they wait for the queued async callers to be
+        admitted first, then for the buckets to cover their estimate. Must be
+        called from a worker thread, not an event loop it would block.
+        """
+        if _in_event_loop():
+            raise RuntimeError(
+                f"{self.name}: sync LLM call made on a running event loop; "
+                "use the async API or run it with asyncio.to_thread"
+            )
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                self._drop_closed_loops()
+                now = time.monotonic()
+                wait = self._wait_time(tokens, now)
+                queue_ahead = self._queued_count() > 0
+                if wait <= 0 and not queue_ahead:
+                    self._admit(tokens, now)
+                    break
+            time.sleep(max(wait, SYNC_POLL_SECONDS) if queue_ahead else wait)
+        self._count_admitted(tokens, started)
+
+    def _count_admitted(self, tokens: int, started: float) -> None:
+        with self._lock:
+            self._stats["admitted"] += 1
+            self._stats["estimated_tokens"] += tokens
+            self._stats["wait_seconds"] += time.monotonic() - started
+
+    def release(self, estimated: int) -> None:
+        """Give back the token estimate of a call that failed without using it"""
+        with self._lock:
+            self.tokens.refund(estimated)
+
+    def record_usage(
+        self,
+        estimated: int,
+        actual: Optional[int],
+        prompt_tokens: Optional[int] = None,
+        cached_tokens: Optional[int] = None,
+    ) -> None:
+        """
+        Settle the difference between the estimated and the reported tokens, and
+        count how many prompt tokens the provider served from its prompt cache
+        """
+        if actual is None:
+            return
+        with self._lock:
+            self._stats["actual_tokens"] += actual
+            self._stats["prompt_tokens"] += prompt_tokens or 0
+            self._stats["cached_prompt_tokens"] += cached_tokens or 0
+            if actual > estimated:
+                self.tokens.consume(actual - estimated, time.monotonic())
+            else:
+                self.tokens.refund(estimated - actual)
+
+    def pause(self, retry_after: Optional[float], attempt: int) -> float:
+        """
+        Pause admissions after a 429, for the provider's retry-after or an
+        exponential backoff, plus jitter. Returns how long the caller should wait.
+        """
+        if retry_after is None:
+            retry_after = min(2**attempt, self.config.retry_max_seconds)
+        wait = jittered(min(retry_after, self.config.retry_max_seconds))
+        with self._lock:
+            self._stats["rate_limited"] += 1
+            self.paused_until = max(self.paused_until, time.monotonic() + wait)
+        LOG.warning(f"{self.name} rate limited, pausing for {wait:.1f}s")
+        return wait
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            prompt_tokens = self._stats["prompt_tokens"]
+            return {
+                **{k: round(v, 3) for k, v in self._stats.items()},
+                "cached_prompt_ratio": round(
+                    self._stats["cached_prompt_tokens"] / prompt_tokens, 3
+                )
+                if prompt_tokens
+                else 0.0,
+                "queued": self._queued_count(),
+                "paused_for_seconds": round(max(self.paused_until - now, 0), 3),
+                "requests_available": round(self.requests.level, 1),
+                "tokens_available": round(self.tokens.level, 1),
+            }
+
+
+class LLMGovernor:
+    """Process-wide registry of rate limiters, one per provider/deployment"""
+
+    _limiters: Dict[str, RateLimiter] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def limiter(cls, name: str, config: RateLimitConfig) -> RateLimiter:
+        with cls._lock:
+            limiter = cls._limiters.get(name)
+            if limiter is None:
+                limiter = cls._limiters[name] = RateLimiter(name, config)
+            return limiter
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Dict[str, Any]]:
+        with cls._lock:
+            return {name: lim.get_stats() for name, lim in cls._limiters.items()}
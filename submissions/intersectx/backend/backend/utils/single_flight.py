@@ -0,0 +1,45 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into a single execution.
+
+    The first caller for a key starts the computation as a task; every caller that
+    arrives while it is running awaits that same task. The task is shielded, so a
+    cancelled caller (e.g. a dropped HTTP request) does not cancel the computation
+    for the others.
+
+    Tasks can only be awaited on their own event loop, so calls are coalesced per
+    running loop: an instance shared by a process with several loops stays safe.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(tasks) for tasks in self._inflight.values())
+
+    def _tasks(self) -> Dict[str, asyncio.Task]:
+        return self._inflight.get(asyncio.get_running_loop(), {})
+
+    def is_inflight(self, key: str) -> bool:
+        return key in self._tasks()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks().get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight.setdefault(task.get_loop(), {})[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        loop = task.get_loop()
+        tasks = self._inflight.get(loop, {})
+        if tasks.get(key) is task:
+            del tasks[key]
+            if not tasks:
+                del self._inflight[loop]
@@ -0,0 +1,50 @@
+import json
+from enum import Enum
+from typing import AsyncIterator
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+
+class StreamFormat(str, Enum):
+    SSE = "sse"
+    NDJSON = "ndjson"
+
+
+MEDIA_TYPES = {
+    StreamFormat.SSE: "text/event-stream",
+    StreamFormat.NDJSON: "application/x-ndjson",
+}
+
+
+def encode_event(event: BaseModel, stream_format: StreamFormat) -> str:
+    """One event as an SSE message (named after its `event` field) or NDJSON line"""
+    # Only unset top-level fields are dropped; nulls inside the data are kept
+    payload = json.dumps(
+        {k: v for k, v in event.model_dump(mode="json").items() if v is not None}
+    )
+    if stream_format == StreamFormat.NDJSON:
+        return f"{payload}\n"
+    name = getattr(event, "event", None)
+    return (f"event: {name}\n" if name else "") + f"data: {payload}\n\n"
+
+
+def stream_events(
+    events: AsyncIterator[BaseModel], stream_format: StreamFormat = StreamFormat.SSE
+) -> StreamingResponse:
+    """Stream pydantic events to the client as they are produced"""
+
+    async def body() -> AsyncIterator[str]:
+        async for event in events:
+            yield encode_event(event, stream_format)
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[stream_format],
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            # Keep reverse proxies from buffering the stream
+            "X-Accel-Buffering": "no",
+        },
+    )
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 
 
@@ -64,3 +64,15 @@ def show_time_taken(
         print(f"{message} took {tt} {time_unit.value}")
 
     return tt
+
+
+def prompt_date() -> str:
+    """
+    Today's date (ISO format) for LLM prompts. The day is precise enough for the
+    analyses, and keeping it out of the agents' instructions (which stay the same
+    for every call) lets the provider reuse its cached prompt prefix.
+
+    >>> prompt_date()
+    '2025-05-28'
+    """
+    return date.today().isoformat()
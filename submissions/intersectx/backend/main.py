@@ -1,21 +1,30 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from datetime import timedelta
+
 import uvicorn
 from fastapi import FastAPI
 from scalar_fastapi import get_scalar_api_reference
 
+from backend.api.admin import admin_router
 from backend.api.auth import auth_router
 from backend.api.companies import companies_router
 from backend.api.news import news_router
 from backend.api.chat import chat_router
 from backend.api.files import files_router
 from backend.api.research import research_router
-from backend.dependencies import get_cache_service, get_user
-from backend.middlewares.cache_cleanup import setup_cache_cleanup_middleware
+from backend.container import ServiceContainer
+from backend.dependencies import get_user
+from backend.jobs.worker import ResearchJobWorkerPool
+from backend.middlewares.llm_usage import LLMUsageMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 from backend.models.base.users import User
 from backend.models.base.exceptions import NotFoundException
 from backend.settings import get_app_settings
 from backend.utils.api_helpers import register_routers
+from backend.utils.cache_maintenance import report_cache_expiry
 from backend.utils.exceptions import ServiceException, exception_handler
+from backend.utils.llm_usage import USAGE_HEADERS, tag_llm_usage_scope
 from backend.utils.logger import get_logger
 from dotenv import load_dotenv
 from fastapi.responses import JSONResponse
@@ -34,17 +43,45 @@ load_dotenv()
 LOG = get_logger()
 app_settings = get_app_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Model clients, the knowledge base, Netlify and the cache are shared process-wide
+    services = ServiceContainer(app_settings)
+    app.state.services = services
+    # Expired cache entries are removed by a TTL index; this task only reports on them
+    expiry_reporter = asyncio.create_task(
+        report_cache_expiry(
+            services.cache_service,
+            timedelta(seconds=app_settings.cache_config.expiry_report_interval_seconds),
+        )
+    )
+    usage_flusher = asyncio.create_task(services.llm_usage_service.arun_flusher())
+    job_workers = None
+    if app_settings.jobs_config.run_in_api:
+        job_workers = ResearchJobWorkerPool(
+            services.job_queue, services.research_service, app_settings.jobs_config
+        )
+        job_workers.start()
+    yield
+    if job_workers is not None:
+        await job_workers.stop()
+    for task in (expiry_reporter, usage_flusher):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    # Release the pooled Mongo clients and the LLM models' keep-alive connections
+    await services.aclose()
+
+
 app = FastAPI(
     title="Virtual Insights Backend APIs",
     version="2.0.0",
     description="APIs for Virtual Insights Backend",
     docs_url="/swagger",
+    lifespan=lifespan,
 )
 
-# Setup cache service and middleware
-cache_service = get_cache_service(app_settings)
-setup_cache_cleanup_middleware(app, cache_service)
-
 routers = [
     companies_router,
     news_router,
@@ -58,6 +95,7 @@ routers = [
     regulatory_compliance_router,
     partnership_network_router,
     research_router,
+    admin_router,
 ]
 
 unprotected_routers = [auth_router]
@@ -71,6 +109,7 @@ if app_settings.local:
     """
 
     def get_user_override():
+        tag_llm_usage_scope(user=app_settings.local_user_email)
         return User(
             user_id=app_settings.local_user_email,
         )
@@ -95,12 +134,15 @@ async def not_found_exception_handler(request, exc):
     )
 
 
+app.add_middleware(LLMUsageMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Or specify ["http://localhost:5173"] for more security
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=list(USAGE_HEADERS),
 )
 
 
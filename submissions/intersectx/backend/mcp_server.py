@@ -1,20 +1,12 @@
+import asyncio
+from contextlib import suppress
+from typing import Optional
+
 from fastmcp import FastMCP
 
-from backend.dependencies import (
-    get_finance_service,
-    get_linkedin_team_service,
-    get_market_analysis_service,
-    get_risk_analysis_service,
-    get_customer_sentiment_service,
-    get_regulatory_compliance_service,
-    get_partnership_network_service,
-    get_search_service,
-)
-from backend.services.cache import CacheService
-from backend.services.knowledge import KnowledgeBaseService
+from backend.container import ServiceContainer
 from backend.settings import get_app_settings
 from dotenv import load_dotenv
-from backend.agents.netlify import NetlifyAgent
 from backend.utils.logger import get_logger
 
 # Apply OpenAI client patch to fix AttributeError during garbage collection
@@ -28,46 +20,9 @@ mcp = FastMCP("Venture Insights MCP Server")
 
 # Get app settings
 app_settings = get_app_settings()
-knowledge_base_service = KnowledgeBaseService(
-    db_config=app_settings.db_config,
-    vector_store_config=app_settings.vector_store_config,
-)
-netlify_agent = NetlifyAgent(app_settings.netlify_config)
-# Instantiate services
-finance_service = get_finance_service(
-    app_settings=app_settings,
-    knowledge_base_service=knowledge_base_service,
-    netlify_agent=netlify_agent,
-    cache_service=CacheService(app_settings.db_config),
-)
-linkedin_team_service = get_linkedin_team_service(
-    app_settings=app_settings,
-    netlify_agent=netlify_agent,
-    cache_service=CacheService(app_settings.db_config),
-)
-market_analysis_service = get_market_analysis_service(
-    app_settings=app_settings,
-    netlify_agent=netlify_agent,
-    cache_service=CacheService(app_settings.db_config),
-)
-risk_analysis_service = get_risk_analysis_service(
-    netlify_agent=netlify_agent, cache_service=CacheService(app_settings.db_config)
-)
-customer_sentiment_service = get_customer_sentiment_service(
-    app_settings=app_settings, cache_service=CacheService(app_settings.db_config)
-)
-regulatory_compliance_service = get_regulatory_compliance_service(
-    netlify_agent=netlify_agent, cache_service=CacheService(app_settings.db_config)
-)
-partnership_network_service = get_partnership_network_service(
-    netlify_agent=netlify_agent, cache_service=CacheService(app_settings.db_config)
-)
-search_service = get_search_service(
-    app_settings=app_settings,
-    netlify_agent=netlify_agent,
-    knowledge_base_service=knowledge_base_service,
-    cache_service=CacheService(app_settings.db_config),
-)
+# Built in `main`, on the server's event loop: the pooled Mongo clients and the
+# cache's coalescing state belong to the loop they are first used on
+services: Optional[ServiceContainer] = None
 
 
 # --- Finance ---
@@ -80,7 +35,7 @@ async def revenue_analysis(
     granularity: str | None = "year",
 ):
     LOG.info("MCP tool call for revenue analysis")
-    return await finance_service.get_revenue_analysis(
+    return await services.finance_service.get_revenue_analysis(
         company_name=company_name,
         domain=domain,
         start_date=start_date,
@@ -96,7 +51,7 @@ async def expense_analysis(
     year: int | None = None,
     category: str | None = None,
 ):
-    return await finance_service.get_expense_analysis(
+    return await services.finance_service.get_expense_analysis(
         company_name=company_name,
         domain=domain,
         year=year,
@@ -106,7 +61,7 @@ async def expense_analysis(
 
 @mcp.tool()
 async def profit_margins(company_name: str, domain: str = None, year: int = None):
-    return await finance_service.get_profit_margins(
+    return await services.finance_service.get_profit_margins(
         company_name=company_name,
         domain=domain,
         year=year,
@@ -117,7 +72,7 @@ async def profit_margins(company_name: str, domain: str = None, year: int = None
 async def valuation_estimation(
     company_name: str, domain: str | None = None, as_of_date: str | None = None
 ):
-    return await finance_service.get_valuation_estimation(
+    return await services.finance_service.get_valuation_estimation(
         company_name=company_name,
         domain=domain,
         as_of_date=as_of_date,
@@ -126,7 +81,7 @@ async def valuation_estimation(
 
 @mcp.tool()
 async def funding_history(company_name: str, domain: str = None):
-    return await finance_service.get_funding_history(
+    return await services.finance_service.get_funding_history(
         company_name=company_name,
         domain=domain,
     )
@@ -135,7 +90,7 @@ async def funding_history(company_name: str, domain: str = None):
 # --- LinkedIn Team ---
 @mcp.tool()
 async def team_overview(company_name: str, domain: str = None):
-    return await linkedin_team_service.get_team_overview(
+    return await services.linkedin_team_service.get_team_overview(
         company_name=company_name,
         domain=domain,
     )
@@ -145,7 +100,7 @@ async def team_overview(company_name: str, domain: str = None):
 async def individual_performance(
     company_name: str, domain: str | None = None, individual_name: str | None = None
 ):
-    return await linkedin_team_service.get_individual_performance(
+    return await services.linkedin_team_service.get_individual_performance(
         company_name=company_name,
         domain=domain,
         individual_name=individual_name,
@@ -154,7 +109,7 @@ async def individual_performance(
 
 @mcp.tool()
 async def org_structure(company_name: str, domain: str = None):
-    return await linkedin_team_service.get_org_structure(
+    return await services.linkedin_team_service.get_org_structure(
         company_name=company_name,
         domain=domain,
     )
@@ -167,7 +122,7 @@ async def team_growth(
     start_date: str | None = None,
     end_date: str | None = None,
 ):
-    return await linkedin_team_service.get_team_growth(
+    return await services.linkedin_team_service.get_team_growth(
         company_name=company_name,
         domain=domain,
         start_date=start_date,
@@ -183,7 +138,7 @@ async def market_trends(
     start_date: str | None = None,
     end_date: str | None = None,
 ):
-    return await market_analysis_service.get_market_trends(
+    return await services.market_analysis_service.get_market_trends(
         industry=industry,
         region=region,
         start_date=start_date,
@@ -198,7 +153,7 @@ async def competitive_analysis(
     industry: str | None = None,
     region: str | None = None,
 ):
-    return await market_analysis_service.get_competitive_analysis(
+    return await services.market_analysis_service.get_competitive_analysis(
         company_name=company_name,
         domain=domain,
         industry=industry,
@@ -213,7 +168,7 @@ async def growth_projections(
     start_date: str | None = None,
     end_date: str | None = None,
 ):
-    return await market_analysis_service.get_growth_projections(
+    return await services.market_analysis_service.get_growth_projections(
         industry=industry,
         region=region,
         start_date=start_date,
@@ -225,7 +180,7 @@ async def growth_projections(
 async def regional_trends(
     industry: str, regions: list = None, start_date: str = None, end_date: str = None
 ):
-    return await market_analysis_service.get_regional_trends(
+    return await services.market_analysis_service.get_regional_trends(
         industry=industry,
         regions=regions,
         start_date=start_date,
@@ -241,7 +196,7 @@ async def regulatory_risks(
     industry: str | None = None,
     region: str | None = None,
 ):
-    return await risk_analysis_service.get_regulatory_risks(
+    return await services.risk_analysis_service.get_regulatory_risks(
         company_name=company_name,
         domain=domain,
         industry=industry,
@@ -256,7 +211,7 @@ async def market_risks(
     industry: str | None = None,
     region: str | None = None,
 ):
-    return await risk_analysis_service.get_market_risks(
+    return await services.risk_analysis_service.get_market_risks(
         company_name=company_name,
         domain=domain,
         industry=industry,
@@ -271,7 +226,7 @@ async def operational_risks(
     industry: str | None = None,
     region: str | None = None,
 ):
-    return await risk_analysis_service.get_operational_risks(
+    return await services.risk_analysis_service.get_operational_risks(
         company_name=company_name,
         domain=domain,
         industry=industry,
@@ -286,7 +241,7 @@ async def legal_risks(
     industry: str | None = None,
     region: str | None = None,
 ):
-    return await risk_analysis_service.get_legal_risks(
+    return await services.risk_analysis_service.get_legal_risks(
         company_name=company_name,
         domain=domain,
         industry=industry,
@@ -304,7 +259,7 @@ async def sentiment_summary(
     start_date: str | None = None,
     end_date: str | None = None,
 ):
-    return await customer_sentiment_service.get_sentiment_summary(
+    return await services.customer_sentiment_service.get_sentiment_summary(
         company_name=company_name,
         domain=domain,
         product=product,
@@ -323,7 +278,7 @@ async def customer_feedback(
     start_date: str | None = None,
     end_date: str | None = None,
 ):
-    return await customer_sentiment_service.get_customer_feedback(
+    return await services.customer_sentiment_service.get_customer_feedback(
         company_name=company_name,
         domain=domain,
         product=product,
@@ -341,7 +296,7 @@ async def brand_reputation(
     start_date: str | None = None,
     end_date: str | None = None,
 ):
-    return await customer_sentiment_service.get_brand_reputation(
+    return await services.customer_sentiment_service.get_brand_reputation(
         company_name=company_name,
         domain=domain,
         region=region,
@@ -358,7 +313,7 @@ async def compliance_overview(
     industry: str | None = None,
     region: str | None = None,
 ):
-    return await regulatory_compliance_service.get_compliance_overview(
+    return await services.regulatory_compliance_service.get_compliance_overview(
         company_name=company_name,
         domain=domain,
         industry=industry,
@@ -375,7 +330,7 @@ async def violation_history(
     start_date: str | None = None,
     end_date: str | None = None,
 ):
-    return await regulatory_compliance_service.get_violation_history(
+    return await services.regulatory_compliance_service.get_violation_history(
         company_name=company_name,
         domain=domain,
         industry=industry,
@@ -392,7 +347,7 @@ async def compliance_risk(
     industry: str | None = None,
     region: str | None = None,
 ):
-    return await regulatory_compliance_service.get_compliance_risk(
+    return await services.regulatory_compliance_service.get_compliance_risk(
         company_name=company_name,
         domain=domain,
         industry=industry,
@@ -407,7 +362,7 @@ async def regional_compliance(
     industry: str | None = None,
     regions: list | None = None,
 ):
-    return await regulatory_compliance_service.get_regional_compliance(
+    return await services.regulatory_compliance_service.get_regional_compliance(
         company_name=company_name,
         domain=domain,
         industry=industry,
@@ -423,7 +378,7 @@ async def partner_list(
     industry: str | None = None,
     region: str | None = None,
 ):
-    return await partnership_network_service.get_partner_list(
+    return await services.partnership_network_service.get_partner_list(
         company_name=company_name,
         domain=domain,
         industry=industry,
@@ -438,7 +393,7 @@ async def strategic_alliances(
     industry: str | None = None,
     region: str | None = None,
 ):
-    return await partnership_network_service.get_strategic_alliances(
+    return await services.partnership_network_service.get_strategic_alliances(
         company_name=company_name,
         domain=domain,
         industry=industry,
@@ -453,7 +408,7 @@ async def network_strength(
     industry: str | None = None,
     region: str | None = None,
 ):
-    return await partnership_network_service.get_network_strength(
+    return await services.partnership_network_service.get_network_strength(
         company_name=company_name,
         domain=domain,
         industry=industry,
@@ -470,7 +425,7 @@ async def partnership_trends(
     start_date: str | None = None,
     end_date: str | None = None,
 ):
-    return await partnership_network_service.get_partnership_trends(
+    return await services.partnership_network_service.get_partnership_trends(
         company_name=company_name,
         domain=domain,
         industry=industry,
@@ -484,7 +439,7 @@ async def partnership_trends(
 async def general_search_knowledge(
     query: str,
 ):
-    return await search_service.get_general_search_knowledge(
+    return await services.search_service.get_general_search_knowledge(
         query=query,
     )
 
@@ -535,5 +490,21 @@ async def get_all_resources() -> str:
         return f"Error reading MCP API documentation: {str(e)}"
 
 
+async def main() -> None:
+    global services
+    services = ServiceContainer(app_settings)
+    # The usage of the tools' LLM calls is stored like the API's
+    usage_flusher = asyncio.create_task(services.llm_usage_service.arun_flusher())
+    try:
+        await mcp.run_async(transport="streamable-http", host="0.0.0.0", port=9000)
+    finally:
+        usage_flusher.cancel()
+        with suppress(asyncio.CancelledError):
+            await usage_flusher
+        # Stores the usage counted since the last flush and releases the pooled
+        # Mongo clients and the LLM models' keep-alive connections
+        await services.aclose()
+
+
 if __name__ == "__main__":
-    mcp.run(transport="streamable-http", host="0.0.0.0", port=9000)
+    asyncio.run(main())
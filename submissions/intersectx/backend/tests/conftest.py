@@ -0,0 +1,106 @@
+from typing import Any, Dict, List
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from backend.services.cache import CacheService
+from backend.settings import CacheConfig, MongoConnectionDetails
+from backend.utils.cache_metrics import CacheMetrics
+
+MONGO_CONFIG = MongoConnectionDetails(
+    host="localhost", user="test", password="test", port=27017, dbname="test"
+)
+
+
+def matches(document: dict, query: dict) -> bool:
+    """The subset of the MongoDB query language the cache service uses"""
+    for field, condition in query.items():
+        if field == "$or":
+            if not any(matches(document, clause) for clause in condition):
+                return False
+            continue
+
+        value = document.get(field)
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+            continue
+        for op, operand in condition.items():
+            if op == "$in" and value not in operand:
+                return False
+            if op == "$gt" and not (value is not None and value > operand):
+                return False
+            if op == "$lte" and not (value is not None and value <= operand):
+                return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, documents: List[dict]):
+        self.documents = documents
+
+    async def to_list(self, length=None) -> List[dict]:
+        return list(self.documents)
+
+
+class FakeCollection:
+    """An in-memory collection with a unique `key` index, like `cache_entries`"""
+
+    def __init__(self):
+        self.documents: Dict[str, dict] = {}
+        self.calls: List[tuple] = []
+
+    def find(self, query: dict) -> FakeCursor:
+        self.calls.append(("find", query))
+        return FakeCursor([d for d in self.documents.values() if matches(d, query)])
+
+    async def replace_one(self, query: dict, document: dict, upsert: bool = False):
+        self.calls.append(("replace_one", query))
+        stored = self.documents.get(document["key"])
+        if stored is not None and not matches(stored, query):
+            if upsert:
+                # The upsert would insert a second document with the same key
+                raise DuplicateKeyError("E11000 duplicate key error")
+            return
+        if stored is not None or upsert:
+            self.documents[document["key"]] = dict(document)
+
+    async def bulk_write(self, requests: List[Any], ordered: bool = True):
+        self.calls.append(("bulk_write", len(requests)))
+        for request in requests:
+            await self.replace_one(request._filter, request._doc, request._upsert)
+
+
+class FakeMongoConnector:
+    def __init__(self, collection: FakeCollection):
+        self.collection = collection
+
+    async def aget_collection(self, collection_name: str) -> FakeCollection:
+        return self.collection
+
+    async def aquery(self, collection_name: str, query: dict) -> List[dict]:
+        return await self.collection.find(query).to_list(length=None)
+
+
+@pytest.fixture
+def make_cache_service(monkeypatch):
+    """
+    Build CacheServices backed by a shared FakeCollection, with the process-wide
+    state (memory tier, refreshes, metrics) reset for the test
+    """
+    monkeypatch.setattr(CacheService, "_indexes_ready", True)
+    monkeypatch.setattr(CacheService, "_memory_tier", None)
+    monkeypatch.setattr(CacheService, "_metrics", CacheMetrics())
+    monkeypatch.setattr(CacheService, "_refresh_semaphores", {})
+    monkeypatch.setattr(CacheService, "_refreshing_keys", set())
+    monkeypatch.setattr(CacheService, "_refresh_tasks", set())
+    monkeypatch.setattr(CacheService, "_refresh_failures", {})
+    collection = FakeCollection()
+
+    def make(**config) -> CacheService:
+        service = CacheService(MONGO_CONFIG, CacheConfig(**config))
+        service.mongo_connector = FakeMongoConnector(collection)
+        return service
+
+    make.collection = collection
+    return make
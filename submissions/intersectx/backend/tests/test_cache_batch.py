@@ -0,0 +1,83 @@
+import asyncio
+
+from backend.services.cache import CacheWrite
+from backend.utils.cache_batch import cache_batch
+from backend.utils.cache_decorator import cacheable
+
+
+class SectionService:
+    def __init__(self, cache_service):
+        self.cache_service = cache_service
+        self.calls = 0
+
+    @cacheable()
+    async def get_section(self, company_name: str, section: str):
+        self.calls += 1
+        return {"company": company_name, "section": section}
+
+
+def calls_of(collection, name: str) -> list:
+    return [call for call in collection.calls if call[0] == name]
+
+
+def test_lookups_in_one_iteration_share_one_in_query(make_cache_service):
+    cache = make_cache_service()
+    collection = make_cache_service.collection
+
+    async def run():
+        await cache.aset_many(
+            [CacheWrite("SectionService", "get_section", {"section": "team"}, 1)]
+        )
+        cache.memory_tier.clear()
+        keys = [
+            cache._generate_key("SectionService", "get_section", {"section": s})
+            for s in ("team", "finance", "market")
+        ]
+        async with cache_batch(cache) as batch:
+            entries = await asyncio.gather(*(batch.aget_entry(k) for k in keys))
+        return entries
+
+    entries = asyncio.run(run())
+    assert entries[0]["data"] == 1
+    assert entries[1] is None and entries[2] is None
+    (find,) = calls_of(collection, "find")
+    assert len(find[1]["key"]["$in"]) == 3
+
+
+def test_cacheable_calls_in_a_batch_read_and_write_together(make_cache_service):
+    cache = make_cache_service()
+    collection = make_cache_service.collection
+    service = SectionService(cache)
+    sections = ("team", "finance", "market")
+
+    async def run():
+        async with cache_batch(cache):
+            first = await asyncio.gather(
+                *(service.get_section("Acme", s) for s in sections)
+            )
+            # Served from memory before (or while) the bulk write lands
+            again = await asyncio.gather(
+                *(service.get_section("Acme", s) for s in sections)
+            )
+        return first, again
+
+    first, again = asyncio.run(run())
+    assert first == again
+    assert service.calls == 3
+    assert len(calls_of(collection, "find")) == 1
+    assert calls_of(collection, "bulk_write") == [("bulk_write", 3)]
+    assert len(collection.documents) == 3
+
+
+def test_writes_after_the_scope_closes_go_straight_to_the_cache(make_cache_service):
+    cache = make_cache_service()
+    collection = make_cache_service.collection
+
+    async def run():
+        async with cache_batch(cache) as batch:
+            pass
+        await batch.aset(CacheWrite("SectionService", "get_section", {}, 1))
+
+    asyncio.run(run())
+    assert calls_of(collection, "bulk_write") == [("bulk_write", 1)]
+    assert len(collection.documents) == 1
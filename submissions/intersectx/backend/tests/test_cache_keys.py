@@ -0,0 +1,72 @@
+from datetime import date
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel
+
+from backend.utils.cache_keys import hash_args, normalize_call_args
+
+
+class Granularity(Enum):
+    YEAR = "year"
+
+
+class Filters(BaseModel):
+    region: str
+
+
+class Service:
+    def get_revenue(
+        self,
+        company_name: str,
+        domain: Optional[str] = None,
+        start_date: Optional[date] = None,
+        granularity: str = "year",
+    ):
+        pass
+
+    def search(self, company_name: str, **filters):
+        pass
+
+
+def test_equivalent_calls_normalize_to_the_same_args():
+    positional = normalize_call_args(Service.get_revenue, ("Acme Corp",), {})
+    explicit = normalize_call_args(
+        Service.get_revenue,
+        ("  acme   CORP ", None),
+        {"start_date": None, "granularity": " year "},
+    )
+    assert (
+        positional
+        == explicit
+        == {
+            "company_name": "acme corp",
+            "domain": None,
+            "start_date": None,
+            "granularity": "year",
+        }
+    )
+    assert hash_args(positional) == hash_args(explicit)
+
+
+def test_values_are_normalized_to_json_types():
+    args = normalize_call_args(
+        Service.get_revenue,
+        ("Acme",),
+        {"start_date": date(2024, 1, 31), "granularity": Granularity.YEAR},
+    )
+    assert args["start_date"] == "2024-01-31"
+    assert args["granularity"] == "year"
+
+
+def test_keyword_arguments_are_flattened():
+    args = normalize_call_args(
+        Service.search, ("Acme",), {"filters": Filters(region="EU"), "limit": 5}
+    )
+    assert args == {"company_name": "acme", "filters": {"region": "EU"}, "limit": 5}
+
+
+def test_different_calls_hash_differently():
+    acme = normalize_call_args(Service.get_revenue, ("Acme",), {})
+    globex = normalize_call_args(Service.get_revenue, ("Globex",), {})
+    assert hash_args(acme) != hash_args(globex)
@@ -0,0 +1,100 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from backend.utils.cache_decorator import cacheable
+
+
+def test_refreshes_run_at_most_max_concurrent_at_once(make_cache_service):
+    cache = make_cache_service(max_concurrent_refreshes=2)
+    running = []
+    peak = []
+
+    async def refresh():
+        running.append(1)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.pop()
+
+    async def run():
+        for i in range(5):
+            cache.schedule_refresh(f"key-{i}", refresh)
+        await cache.adrain_refreshes()
+
+    asyncio.run(run())
+    assert len(peak) == 5
+    assert max(peak) == 2
+
+
+def test_a_key_is_refreshed_once_at_a_time(make_cache_service):
+    cache = make_cache_service()
+    calls = []
+
+    async def refresh():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+
+    async def run():
+        cache.schedule_refresh("key", refresh)
+        cache.schedule_refresh("key", refresh)
+        await cache.adrain_refreshes()
+
+    asyncio.run(run())
+    assert len(calls) == 1
+
+
+def test_failed_refreshes_back_off(make_cache_service):
+    cache = make_cache_service(negative_ttl_seconds=60)
+    calls = []
+
+    async def refresh():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("provider down")
+
+    async def schedule():
+        cache.schedule_refresh("key", refresh)
+        await cache.adrain_refreshes()
+
+    asyncio.run(schedule())
+    failures, retry_at = cache._refresh_failures["key"]
+    assert failures == 1
+    assert retry_at - datetime.utcnow() > timedelta(seconds=55)
+
+    # Hits during the backoff don't retry the refresh
+    asyncio.run(schedule())
+    assert len(calls) == 1
+
+    cache._refresh_failures["key"] = (failures, datetime.utcnow())
+    asyncio.run(schedule())
+    assert len(calls) == 2
+    assert "key" not in cache._refresh_failures
+
+
+class ReportService:
+    def __init__(self, cache_service):
+        self.cache_service = cache_service
+        self.calls = 0
+
+    @cacheable(stale_ttl=timedelta(days=1))
+    async def get_report(self, company_name: str):
+        self.calls += 1
+        return {"company": company_name, "version": self.calls}
+
+
+def test_stale_entry_is_served_while_it_is_refreshed(make_cache_service):
+    cache = make_cache_service(memory_max_entries=0)
+    service = ReportService(cache)
+
+    async def run():
+        await service.get_report("Acme")
+        (entry,) = make_cache_service.collection.documents.values()
+        entry["fresh_until"] = datetime.utcnow() - timedelta(seconds=1)
+
+        stale = await service.get_report("Acme")
+        await cache.adrain_refreshes()
+        return stale, await service.get_report("Acme")
+
+    stale, refreshed = asyncio.run(run())
+    assert stale["version"] == 1
+    assert refreshed["version"] == 2
+    assert service.calls == 2
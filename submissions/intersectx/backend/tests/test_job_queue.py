@@ -0,0 +1,165 @@
+import asyncio
+from datetime import timedelta
+
+from backend.jobs.queue import InMemoryJobQueue, ResearchJob
+from backend.models.requests.research import ResearchJobRequest
+from backend.models.response.research import ResearchJobStatus
+from backend.settings import JobsConfig
+
+LEASE = timedelta(minutes=5)
+# A lease that has already run out when it is granted, as if the worker died
+EXPIRED_LEASE = timedelta(seconds=-1)
+
+
+def make_job(company_name: str = "Acme", max_attempts: int = 3, **options):
+    request = ResearchJobRequest(company_name=company_name, **options)
+    return ResearchJob.from_request(request, max_attempts=max_attempts)
+
+
+def make_queue() -> InMemoryJobQueue:
+    return InMemoryJobQueue(JobsConfig(backend="memory"))
+
+
+def test_submit_returns_the_active_job_for_equivalent_requests():
+    async def run():
+        queue = make_queue()
+        first = await queue.submit(make_job("Acme Corp"))
+        second = await queue.submit(make_job("  acme   corp "))
+        other = await queue.submit(make_job("Acme Corp", force=True))
+        return first, second, other
+
+    first, second, other = asyncio.run(run())
+    assert second.job_id == first.job_id
+    assert other.job_id != first.job_id
+
+
+def test_submit_after_a_failed_job_queues_a_new_one():
+    async def run():
+        queue = make_queue()
+        first = await queue.submit(make_job())
+        claimed = await queue.claim("worker-1", LEASE)
+        await queue.finish(
+            claimed.job_id, "worker-1", ResearchJobStatus.FAILED, error="boom"
+        )
+        return first, await queue.submit(make_job())
+
+    first, second = asyncio.run(run())
+    assert second.job_id != first.job_id
+    assert second.status == ResearchJobStatus.QUEUED
+
+
+def test_succeeded_job_answers_resubmissions():
+    async def run():
+        queue = make_queue()
+        first = await queue.submit(make_job())
+        await queue.claim("worker-1", LEASE)
+        await queue.finish(first.job_id, "worker-1", ResearchJobStatus.SUCCEEDED)
+        return first, await queue.submit(make_job())
+
+    first, second = asyncio.run(run())
+    assert second.job_id == first.job_id
+    assert second.status == ResearchJobStatus.SUCCEEDED
+
+
+def test_claim_leases_a_job_to_one_worker():
+    async def run():
+        queue = make_queue()
+        job = await queue.submit(make_job())
+        claimed = await queue.claim("worker-1", LEASE)
+        return job, claimed, await queue.claim("worker-2", LEASE)
+
+    job, claimed, nothing = asyncio.run(run())
+    assert claimed.job_id == job.job_id
+    assert claimed.status == ResearchJobStatus.RUNNING
+    assert claimed.worker_id == "worker-1"
+    assert claimed.attempts == 1
+    assert nothing is None
+
+
+def test_requeued_job_waits_for_its_retry_backoff():
+    async def run():
+        queue = make_queue()
+        job = await queue.submit(make_job())
+        await queue.claim("worker-1", LEASE)
+        await queue.finish(
+            job.job_id,
+            "worker-1",
+            ResearchJobStatus.QUEUED,
+            failed_sections=["finance"],
+            retry_after=timedelta(hours=1),
+        )
+        return await queue.claim("worker-1", LEASE), await queue.get(job.job_id)
+
+    claimed, stored = asyncio.run(run())
+    assert claimed is None
+    assert stored.status == ResearchJobStatus.QUEUED
+    assert stored.failed_sections == ["finance"]
+    assert stored.worker_id is None
+
+
+def test_requeued_job_is_claimed_again():
+    async def run():
+        queue = make_queue()
+        job = await queue.submit(make_job())
+        await queue.claim("worker-1", LEASE)
+        await queue.finish(job.job_id, "worker-1", ResearchJobStatus.QUEUED)
+        return await queue.claim("worker-2", LEASE)
+
+    claimed = asyncio.run(run())
+    assert claimed.worker_id == "worker-2"
+    assert claimed.attempts == 2
+
+
+def test_finish_from_a_worker_that_lost_the_lease_is_ignored():
+    async def run():
+        queue = make_queue()
+        job = await queue.submit(make_job())
+        await queue.claim("worker-1", LEASE)
+        await queue.finish(job.job_id, "worker-2", ResearchJobStatus.SUCCEEDED)
+        return await queue.get(job.job_id)
+
+    stored = asyncio.run(run())
+    assert stored.status == ResearchJobStatus.RUNNING
+    assert stored.worker_id == "worker-1"
+
+
+def test_expired_lease_is_taken_over():
+    async def run():
+        queue = make_queue()
+        job = await queue.submit(make_job(max_attempts=2))
+        await queue.claim("worker-1", EXPIRED_LEASE)
+        return job, await queue.claim("worker-2", LEASE)
+
+    job, claimed = asyncio.run(run())
+    assert claimed.job_id == job.job_id
+    assert claimed.worker_id == "worker-2"
+    assert claimed.attempts == 2
+
+
+def test_expired_lease_on_the_last_attempt_fails_the_job():
+    async def run():
+        queue = make_queue()
+        job = await queue.submit(make_job(max_attempts=1))
+        await queue.claim("worker-1", EXPIRED_LEASE)
+        claimed = await queue.claim("worker-2", LEASE)
+        return claimed, await queue.get(job.job_id), await queue.get_stats()
+
+    claimed, stored, stats = asyncio.run(run())
+    assert claimed is None
+    assert stored.status == ResearchJobStatus.FAILED
+    assert stored.attempts == 1
+    assert stored.finished_at is not None
+    assert stored.lease_until is None
+    assert "Abandoned" in stored.error
+    assert stats[ResearchJobStatus.FAILED.value] == 1
+
+
+def test_claim_takes_the_job_due_first():
+    async def run():
+        queue = make_queue()
+        first = await queue.submit(make_job("Acme"))
+        await queue.submit(make_job("Globex"))
+        return first, await queue.claim("worker-1", LEASE)
+
+    first, claimed = asyncio.run(run())
+    assert claimed.job_id == first.job_id
@@ -0,0 +1,119 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.models.base.exceptions import NotFoundException, Status
+from backend.utils.cache_decorator import cacheable
+from backend.utils.exceptions import ServiceException
+
+# Memory tier off, so every lookup reads the (fake) collection
+CONFIG = dict(
+    memory_max_entries=0, negative_ttl_seconds=60, negative_max_ttl_seconds=150
+)
+
+
+class FlakyService:
+    def __init__(self, cache_service, error: Exception):
+        self.cache_service = cache_service
+        self.error = error
+        self.calls = 0
+
+    @cacheable()
+    async def get_report(self, company_name: str):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return {"company": company_name}
+
+
+def only_entry(collection) -> dict:
+    (entry,) = collection.documents.values()
+    return entry
+
+
+def end_backoff(entry: dict) -> None:
+    entry["fresh_until"] = datetime.utcnow() - timedelta(seconds=1)
+
+
+def test_negative_backoff_doubles_up_to_the_max(make_cache_service):
+    cache = make_cache_service(**CONFIG)
+    assert [cache.negative_backoff(n).total_seconds() for n in range(1, 5)] == [
+        60,
+        120,
+        150,
+        150,
+    ]
+
+
+def test_repeated_failures_back_off_longer(make_cache_service):
+    cache = make_cache_service(**CONFIG)
+    service = FlakyService(cache, RuntimeError("provider down"))
+
+    async def run():
+        backoffs = []
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                await service.get_report("Acme")
+            entry = only_entry(make_cache_service.collection)
+            backoffs.append((entry["fresh_until"] - entry["refreshed_at"]).seconds)
+            end_backoff(entry)
+        return backoffs
+
+    assert asyncio.run(run()) == [60, 120, 150]
+    assert only_entry(make_cache_service.collection)["failures"] == 3
+
+
+def test_negative_hit_raises_with_retry_after(make_cache_service):
+    cache = make_cache_service(**CONFIG)
+    service = FlakyService(cache, RuntimeError("provider down"))
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await service.get_report("Acme")
+        with pytest.raises(ServiceException) as raised:
+            await service.get_report("Acme")
+        return raised.value
+
+    error = asyncio.run(run())
+    assert service.calls == 1
+    assert error.status == Status.EXECUTION_ERROR
+    assert error.details["failures"] == 1
+    assert 0 < error.details["retry_after_seconds"] <= 60
+
+
+def test_client_errors_are_not_cached(make_cache_service):
+    cache = make_cache_service(**CONFIG)
+    service = FlakyService(cache, NotFoundException("No such company"))
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(NotFoundException):
+                await service.get_report("Acme")
+
+    asyncio.run(run())
+    assert service.calls == 2
+    assert make_cache_service.collection.documents == {}
+
+
+def test_failure_keeps_an_unexpired_positive_entry(make_cache_service):
+    cache = make_cache_service(**CONFIG)
+    service = FlakyService(cache, None)
+
+    async def run():
+        await service.get_report("Acme")
+        entry = only_entry(make_cache_service.collection)
+        stored = await cache.aset_negative(
+            "FlakyService",
+            "get_report",
+            entry["args"],
+            {"status": Status.EXECUTION_ERROR.value, "message": "boom"},
+            failures=1,
+        )
+        return stored, await service.get_report("Acme")
+
+    stored, result = asyncio.run(run())
+    assert stored is None
+    assert result == {"company": "Acme"}
+    assert "negative" not in only_entry(make_cache_service.collection)
+    assert service.calls == 1
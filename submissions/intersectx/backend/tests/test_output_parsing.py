@@ -0,0 +1,70 @@
+import json
+
+from backend.utils.output_parsing import (
+    STRUCTURED_OUTPUT_INSTRUCTION,
+    TEXT_OUTPUT_INSTRUCTION,
+    extract_json_candidates,
+    repair_json,
+    with_output_instruction,
+)
+
+
+def test_extract_json_candidates_prefers_fenced_blocks():
+    text = 'Here you go:\n```json\n{"a": 1}\n```\nand more {"b": 2}'
+    candidates = extract_json_candidates(text)
+    assert candidates[0] == '{"a": 1}'
+    assert json.loads(candidates[0]) == {"a": 1}
+
+
+def test_extract_json_candidates_finds_bare_json():
+    assert extract_json_candidates("Result: [1, 2, 3] done") == ["[1, 2, 3]"]
+
+
+def test_extract_json_candidates_keeps_truncated_json():
+    assert extract_json_candidates('Result: {"a": [1, 2') == ['{"a": [1, 2']
+
+
+def test_extract_json_candidates_without_json():
+    assert extract_json_candidates("no structured output here") == []
+
+
+def test_repair_json_fixes_python_style_output():
+    text = "{'name': 'Acme', active: True, 'parent': None, 'tags': ['a', 'b',],}"
+    assert json.loads(repair_json(text)) == {
+        "name": "Acme",
+        "active": True,
+        "parent": None,
+        "tags": ["a", "b"],
+    }
+
+
+def test_repair_json_fixes_smart_quotes_and_raw_newlines():
+    text = "{“summary”: “line one\nline two”}"
+    assert json.loads(repair_json(text)) == {"summary": "line one\nline two"}
+
+
+def test_repair_json_escapes_double_quotes_inside_single_quoted_strings():
+    text = """{'quote': 'they said "hi"'}"""
+    assert json.loads(repair_json(text)) == {"quote": 'they said "hi"'}
+
+
+def test_repair_json_closes_truncated_output():
+    text = '{"company": "Acme", "revenue": [{"year": 2024, "value": 10}, {"year":'
+    assert json.loads(repair_json(text)) == {
+        "company": "Acme",
+        "revenue": [{"year": 2024, "value": 10}, {}],
+    }
+
+
+def test_repair_json_drops_stray_closing_brackets():
+    assert json.loads(repair_json('{"a": 1}}]')) == {"a": 1}
+
+
+def test_with_output_instruction_follows_the_structured_output_flag():
+    instructions = "You are an analyst.\n        "
+    assert with_output_instruction(instructions, False) == (
+        f"You are an analyst.\n{TEXT_OUTPUT_INSTRUCTION}"
+    )
+    assert with_output_instruction(instructions, True) == (
+        f"You are an analyst.\n{STRUCTURED_OUTPUT_INSTRUCTION}"
+    )
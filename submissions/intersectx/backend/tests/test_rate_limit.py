@@ -0,0 +1,133 @@
+import asyncio
+import threading
+
+import pytest
+
+from backend.settings import RateLimitConfig
+from backend.utils.rate_limit import (
+    Priority,
+    RateLimiter,
+    TokenBucket,
+    queued,
+    wait_for_unqueued,
+)
+
+# 100 tokens a second, so the tests wait tenths of a second for quota
+CONFIG = RateLimitConfig(requests_per_minute=6000, tokens_per_minute=6000)
+
+
+def test_token_bucket_wait_time():
+    bucket = TokenBucket(per_minute=60)
+    now = bucket.updated
+    assert bucket.wait_time(60, now) == 0.0
+
+    bucket.consume(60, now)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+    # A bucket never holds more than its capacity, so larger amounts wait for a full one
+    assert bucket.wait_time(120, now) == pytest.approx(60.0)
+    assert bucket.wait_time(1, now + 1) == 0.0
+
+
+def test_token_bucket_refund_is_capped_at_capacity():
+    bucket = TokenBucket(per_minute=60)
+    bucket.consume(10, bucket.updated)
+    bucket.refund(100)
+    assert bucket.level == 60
+
+
+def test_interactive_callers_are_admitted_before_batch_callers():
+    async def run():
+        limiter = RateLimiter("test", CONFIG)
+        limiter.tokens.level = 0
+        admitted = []
+
+        async def call(name, priority):
+            await limiter.acquire(10, priority)
+            admitted.append(name)
+
+        await asyncio.gather(
+            call("batch-1", Priority.BATCH),
+            call("batch-2", Priority.BATCH),
+            call("interactive", Priority.INTERACTIVE),
+        )
+        return admitted, limiter.get_stats()
+
+    admitted, stats = asyncio.run(run())
+    assert admitted == ["interactive", "batch-1", "batch-2"]
+    assert stats["admitted"] == 3
+    assert stats["estimated_tokens"] == 30
+
+
+def test_record_usage_settles_the_estimate():
+    limiter = RateLimiter("test", CONFIG)
+    limiter.acquire_blocking(100)
+    level = limiter.tokens.level
+
+    limiter.record_usage(100, 40, prompt_tokens=30, cached_tokens=10)
+    assert limiter.tokens.level == pytest.approx(level + 60, abs=1)
+    assert limiter.get_stats()["cached_prompt_ratio"] == pytest.approx(1 / 3, abs=1e-3)
+
+
+def test_release_gives_back_a_failed_call_estimate():
+    limiter = RateLimiter("test", CONFIG)
+    limiter.acquire_blocking(1000)
+    level = limiter.tokens.level
+
+    limiter.release(1000)
+    assert limiter.tokens.level == pytest.approx(level + 1000, abs=1)
+
+
+def test_pause_holds_back_admissions():
+    limiter = RateLimiter("test", CONFIG.model_copy(update={"retry_max_seconds": 0.2}))
+    wait = limiter.pause(retry_after=10, attempt=0)
+    assert 0.2 <= wait <= 0.25
+    assert limiter.get_stats()["rate_limited"] == 1
+    assert limiter.get_stats()["paused_for_seconds"] > 0
+
+
+def test_wait_for_unqueued_does_not_count_queued_time():
+    async def slow_to_admit():
+        with queued():
+            await asyncio.sleep(0.2)
+        return "done"
+
+    async def slow_to_run():
+        await asyncio.sleep(0.2)
+
+    async def run():
+        assert await wait_for_unqueued(slow_to_admit(), timeout=0.1) == "done"
+        with pytest.raises(asyncio.TimeoutError):
+            await wait_for_unqueued(slow_to_run(), timeout=0.1)
+
+    asyncio.run(run())
+
+
+def test_acquire_blocking_refuses_to_block_a_running_loop():
+    async def run():
+        limiter = RateLimiter("test", CONFIG)
+        with pytest.raises(RuntimeError):
+            limiter.acquire_blocking(10)
+        await asyncio.to_thread(limiter.acquire_blocking, 10)
+        return limiter.get_stats()
+
+    assert asyncio.run(run())["admitted"] == 1
+
+
+def test_callers_on_different_loops_share_the_buckets():
+    limiter = RateLimiter("test", CONFIG)
+    limiter.tokens.level = 0
+
+    async def call():
+        await asyncio.gather(*(limiter.acquire(10) for _ in range(2)))
+
+    # Each thread runs its own event loop
+    threads = [threading.Thread(target=asyncio.run, args=(call(),)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    stats = limiter.get_stats()
+    assert stats["admitted"] == 4
+    assert stats["queued"] == 0
+    assert stats["estimated_tokens"] == 40
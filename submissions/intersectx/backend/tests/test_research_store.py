@@ -0,0 +1,137 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from backend.services.research_store import ResearchStore
+from backend.settings import MongoConnectionDetails, ResearchConfig
+
+NOW = datetime(2025, 6, 1, 12, 0)
+FINGERPRINT = "docs-v1"
+FIELDS = [("finance", "revenue"), ("market_analysis", "trends")]
+CONFIG = ResearchConfig(default_max_age_hours=24, section_max_age_hours={"finance": 1})
+
+
+def make_document(computed_at: datetime, fingerprint: str = FINGERPRINT) -> dict:
+    meta = {"computed_at": computed_at, "source_fingerprint": fingerprint}
+    return {
+        "research_meta": {
+            "finance": {"revenue": meta},
+            "market_analysis": {"trends": meta},
+        }
+    }
+
+
+def stale_fields(document, **kwargs):
+    return ResearchStore.stale_fields(
+        document, FIELDS, FINGERPRINT, CONFIG, now=NOW, **kwargs
+    )
+
+
+def test_every_field_is_stale_without_a_document():
+    assert stale_fields(None) == FIELDS
+
+
+def test_fields_missing_from_the_document_are_stale():
+    document = make_document(NOW)
+    del document["research_meta"]["market_analysis"]
+    assert stale_fields(document) == [("market_analysis", "trends")]
+
+
+def test_fresh_fields_are_kept():
+    assert stale_fields(make_document(NOW - timedelta(minutes=30))) == []
+
+
+def test_fields_older_than_their_section_max_age_are_stale():
+    document = make_document(NOW - timedelta(hours=2))
+    assert stale_fields(document) == [("finance", "revenue")]
+
+
+def test_fields_computed_from_other_source_documents_are_stale():
+    document = make_document(NOW, fingerprint="docs-v0")
+    assert stale_fields(document) == FIELDS
+
+
+def test_fields_computed_before_refreshed_since_are_stale():
+    document = make_document(NOW - timedelta(minutes=30))
+    document["research_meta"]["market_analysis"]["trends"] = {
+        "computed_at": NOW - timedelta(minutes=5),
+        "source_fingerprint": FINGERPRINT,
+    }
+    refreshed_since = NOW - timedelta(minutes=10)
+    assert stale_fields(document, refreshed_since=refreshed_since) == [
+        ("finance", "revenue")
+    ]
+
+
+class FakeResearchConnector:
+    """Stores company_info documents for `afind_one` and `aupdate_one`"""
+
+    def __init__(self):
+        self.documents = []
+
+    @staticmethod
+    def _matches(document: dict, query: dict) -> bool:
+        if "$or" in query:
+            return any(
+                FakeResearchConnector._matches(document, clause)
+                for clause in query["$or"]
+            )
+        return all(document.get(k) == v for k, v in query.items())
+
+    async def afind_one(self, collection_name, query, sort=None):
+        found = [d for d in self.documents if self._matches(d, query)]
+        return found[-1] if found else None
+
+    async def aupdate_one(self, collection_name, query, update, upsert=False):
+        document = await self.afind_one(collection_name, query)
+        if document is None:
+            document = {"_id": len(self.documents), **query, **update["$setOnInsert"]}
+            self.documents.append(document)
+        for path, value in update["$set"].items():
+            target = document
+            *parents, leaf = path.split(".")
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[leaf] = value
+
+
+def make_store(monkeypatch) -> ResearchStore:
+    monkeypatch.setattr(ResearchStore, "_indexes_ready", True)
+    store = ResearchStore(
+        MongoConnectionDetails(host="h", user="u", password="p", port=1, dbname="d")
+    )
+    store.mongo_connector = FakeResearchConnector()
+    return store
+
+
+def test_spellings_of_a_company_share_one_document(monkeypatch):
+    store = make_store(monkeypatch)
+
+    async def run():
+        await store.asave_fields(
+            "Acme Corp", {("finance", "revenue"): {"total": 1}}, FINGERPRINT
+        )
+        await store.asave_fields(
+            "  acme   CORP", {("finance", "margin"): {"total": 2}}, FINGERPRINT
+        )
+        return await store.aget("ACME corp")
+
+    document = asyncio.run(run())
+    assert len(store.mongo_connector.documents) == 1
+    assert document["company_key"] == "acme corp"
+    assert document["company_name"] == "Acme Corp"
+    assert set(document["finance"]) == {"revenue", "margin"}
+
+
+def test_legacy_document_is_found_by_its_exact_name(monkeypatch):
+    store = make_store(monkeypatch)
+    store.mongo_connector.documents.append({"_id": 0, "company_name": "Acme Corp"})
+
+    async def run():
+        await store.asave_fields(
+            "Acme Corp", {("finance", "revenue"): {"total": 1}}, FINGERPRINT
+        )
+        return await store.aget("acme corp")
+
+    document = asyncio.run(run())
+    assert len(store.mongo_connector.documents) == 1
+    assert document["company_key"] == "acme corp"
@@ -0,0 +1,91 @@
+import asyncio
+
+from backend.utils.cache_decorator import cacheable
+from backend.utils.single_flight import SingleFlight
+
+
+def test_concurrent_calls_for_a_key_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key.upper()
+
+    async def run():
+        results = await asyncio.gather(
+            flight.do("a", lambda: compute("a")),
+            flight.do("a", lambda: compute("a")),
+            flight.do("b", lambda: compute("b")),
+        )
+        return results, len(flight)
+
+    results, inflight = asyncio.run(run())
+    assert results == ["A", "A", "B"]
+    assert sorted(calls) == ["a", "b"]
+    assert inflight == 0
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_execution():
+    flight = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flight.do("a", compute))
+        second = asyncio.ensure_future(flight.do("a", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_failure_reaches_every_waiter_and_is_not_remembered():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def run():
+        results = await asyncio.gather(
+            flight.do("a", compute), flight.do("a", compute), return_exceptions=True
+        )
+        # A later call starts a new execution
+        retried = await asyncio.gather(flight.do("a", compute), return_exceptions=True)
+        return results + retried
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(calls) == 2
+
+
+class SlowService:
+    def __init__(self, cache_service):
+        self.cache_service = cache_service
+        self.calls = 0
+
+    @cacheable()
+    async def get_report(self, company_name: str):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {"company": company_name}
+
+
+def test_concurrent_cacheable_misses_compute_once(make_cache_service):
+    service = SlowService(make_cache_service(memory_max_entries=0))
+
+    async def run():
+        return await asyncio.gather(
+            service.get_report("Acme"), service.get_report(" acme ")
+        )
+
+    results = asyncio.run(run())
+    assert results[0] == results[1] == {"company": "Acme"}
+    assert service.calls == 1